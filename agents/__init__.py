@@ -1,40 +1,111 @@
-from .common import (
-    client,
-    MODEL_NAME_1,
-    MODEL_NAME_2,
-    MODEL_NAME_3,
-    ollama_client,
-)
-from .database_manager import (
-    influx_list_buckets,
-    influx_list_measurements,
-    influx_list_fields,
-    influx_query,
-    influx_write_point,
-    influx_delete_data,
-    get_current_time,
-    influx_query_store,
-    influxDB_agent,
-)
-from .data_specialist_agent import (
-    list_data_fields,
-    filter_data,
-    visualize_data,
-    head_cached_data,
-    data_specialist_agent,
-)
-from .clarifying_agent import ask_user, clarifying_agent
-from .data_store import (
-    store_cached_data,
-    get_cached_data,
-)
-from .triage_agent import (
-    triage_agent,
-    transfer_back_to_triage,
-    transfer_to_database_manager,
-    transfer_to_data_specialist,
-    transfer_to_clarifying_agent,
-)
+"""Agents for managing and analysing InfluxDB data.
+
+The names below are resolved on first access (PEP 562), so ``import agents``
+does not load pandas, matplotlib, influxdb_client, swarm or openai. Each
+name is imported from its module the first time it is used; the model
+clients in ``agents.common`` are likewise created on first use.
+"""
+
+import sys
+import types
+from importlib import import_module
+
+_EXPORTS = {
+    "common": [
+        "client",
+        "MODEL_NAME_1",
+        "MODEL_NAME_2",
+        "MODEL_NAME_3",
+        "ollama_client",
+        "model_for",
+        "model_stats",
+    ],
+    "database_manager": [
+        "influx_list_buckets",
+        "influx_list_measurements",
+        "influx_list_fields",
+        "influx_list_tags",
+        "influx_field_types",
+        "prefetch_schema",
+        "influx_query",
+        "influx_write_point",
+        "influx_write_points",
+        "influx_delete_data",
+        "get_current_time",
+        "influx_query_store",
+        "influxDB_agent",
+    ],
+    "data_specialist_agent": [
+        "list_data_fields",
+        "describe_data",
+        "filter_data",
+        "resample_data",
+        "rolling_data",
+        "rate_data",
+        "detect_anomalies",
+        "correlate_series",
+        "aggregate_by_tag",
+        "visualize_data",
+        "head_cached_data",
+        "data_specialist_agent",
+    ],
+    "render_pool": ["plot_status", "wait_for_plot", "render_stats"],
+    "prompt": ["ask_user", "use_answers"],
+    "clarifying_agent": ["clarifying_agent"],
+    "influx_client": ["close_clients", "client_stats"],
+    "query_cache": ["query_cache_stats"],
+    "schema_catalog": ["schema_cache_stats"],
+    "data_store": [
+        "store_cached_data",
+        "get_cached_data",
+        "list_cached_data",
+        "drop_cached_data",
+        "data_store_stats",
+    ],
+    "triage_agent": [
+        "triage_agent",
+        "transfer_back_to_triage",
+        "transfer_to_database_manager",
+        "transfer_to_data_specialist",
+        "transfer_to_clarifying_agent",
+    ],
+    "router": ["run_turn", "router_stats"],
+    "sessions": ["SessionManager"],
+    "metrics": ["metrics_text", "metrics_snapshot"],
+}
+
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+
+def __getattr__(name):
+    module = _MODULE_OF.get(name)
+    if module is None:
+        try:
+            return import_module(f"{__name__}.{name}")
+        except ModuleNotFoundError as exc:
+            if exc.name != f"{__name__}.{name}":
+                raise
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *__all__})
+
+
+class _Package(types.ModuleType):
+    def __setattr__(self, name, value):
+        # ``triage_agent`` and friends name both a submodule and the agent it
+        # defines; importing the submodule must not replace the agent.
+        if name in _MODULE_OF and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
+
 
 __all__ = [
     "client",
@@ -42,21 +113,45 @@ __all__ = [
     "MODEL_NAME_2",
     "MODEL_NAME_3",
     "ollama_client",
+    "model_for",
+    "model_stats",
     "influx_list_buckets",
     "influx_list_measurements",
     "influx_list_fields",
+    "influx_list_tags",
+    "influx_field_types",
+    "prefetch_schema",
     "influx_query",
     "influx_query_store",
     "influx_write_point",
+    "influx_write_points",
     "influx_delete_data",
     "get_current_time",
     "list_data_fields",
+    "describe_data",
     "filter_data",
+    "resample_data",
+    "rolling_data",
+    "rate_data",
+    "detect_anomalies",
+    "correlate_series",
+    "aggregate_by_tag",
     "visualize_data",
     "head_cached_data",
+    "plot_status",
+    "wait_for_plot",
+    "render_stats",
     "ask_user",
+    "use_answers",
+    "close_clients",
+    "client_stats",
+    "query_cache_stats",
+    "schema_cache_stats",
     "store_cached_data",
     "get_cached_data",
+    "list_cached_data",
+    "drop_cached_data",
+    "data_store_stats",
     "influxDB_agent",
     "data_specialist_agent",
     "clarifying_agent",
@@ -65,4 +160,9 @@ __all__ = [
     "transfer_to_database_manager",
     "transfer_to_data_specialist",
     "transfer_to_clarifying_agent",
+    "run_turn",
+    "router_stats",
+    "SessionManager",
+    "metrics_text",
+    "metrics_snapshot",
 ]
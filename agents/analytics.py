@@ -0,0 +1,243 @@
+"""Vectorized time-series analysis of stored datasets.
+
+Every function takes a DataFrame as stored by ``influx_query_store``, either
+long (``_time``, ``_value`` and the ``_field``/tag columns, plus the
+``time``/``value`` copies of records results, which are ignored) or wide (a
+column per field), and returns a new DataFrame. Series are identified by
+their non-numeric columns (see ``incremental.series_keys``) and each is
+computed on its own: operations run per group with pandas' grouped
+kernels, never row by row in Python. Durations use Flux syntax (``"5m"``,
+``"1h30m"``).
+"""
+
+import numpy as np
+import pandas as pd
+
+from . import flux
+from .incremental import series_keys
+
+AGGREGATES = ("mean", "min", "max", "sum", "count", "median", "first", "last", "std")
+CORRELATIONS = ("pearson", "spearman", "kendall")
+ANOMALY_METHODS = {"zscore": 3.0, "iqr": 1.5}
+
+_TIME_COLUMNS = ("_time", "time")
+_META_COLUMNS = {"result", "table"}
+# Records results repeat ``_value`` and ``_time`` under these names.
+_ALIASES = {"value": "_value", "time": "_time"}
+
+
+def _without_aliases(df: pd.DataFrame, keep=()) -> pd.DataFrame:
+    """Drop the ``value``/``time`` copies of ``_value``/``_time``, so they are not analysed twice."""
+    aliases = [a for a, column in _ALIASES.items() if a in df.columns and column in df.columns and a not in keep]
+    return df.drop(columns=aliases) if aliases else df
+
+
+def _time_column(df: pd.DataFrame, required: bool = True) -> str | None:
+    column = next((c for c in _TIME_COLUMNS if c in df.columns), None)
+    if column is None and required:
+        raise ValueError("The dataset has no _time column.")
+    return column
+
+
+def _value_columns(df: pd.DataFrame, keys: list) -> list:
+    values = [
+        c for c in df.columns
+        if c not in _META_COLUMNS and c not in keys and pd.api.types.is_numeric_dtype(df[c].dtype)
+        and not pd.api.types.is_bool_dtype(df[c].dtype)
+    ]
+    if not values:
+        raise ValueError("The dataset has no numeric columns.")
+    return values
+
+
+def _duration(text: str) -> pd.Timedelta:
+    return pd.Timedelta(abs(flux.parse_duration(text)), unit="ns")
+
+
+def _check(name: str, value: str, allowed) -> None:
+    if value not in allowed:
+        raise ValueError(f"Unsupported {name} '{value}'; use one of {', '.join(allowed)}.")
+
+
+def _ordered(df: pd.DataFrame, keys: list, time: str | None) -> pd.DataFrame:
+    """Return ``df`` sorted by series and time, as rolling windows and differences need."""
+    by = [*keys, time] if time else keys
+    return df.sort_values(by, kind="stable", ignore_index=True) if by else df.reset_index(drop=True)
+
+
+def _groups(df: pd.DataFrame, keys: list):
+    return df.groupby(keys, observed=True, sort=False) if keys else None
+
+
+def resample(df: pd.DataFrame, every: str, fn: str = "mean") -> pd.DataFrame:
+    """Aggregate each series into ``every``-long windows, labelled by their start."""
+    df = _without_aliases(df)
+    _check("aggregate", fn, AGGREGATES)
+    time = _time_column(df)
+    keys = series_keys(df)
+    values = _value_columns(df, keys)
+    window = df[time].dt.floor(_duration(every)).rename(time)
+    grouped = df[values].groupby([*(df[k] for k in keys), window], observed=True, sort=True)
+    return grouped.agg(fn).reset_index()
+
+
+def rolling(df: pd.DataFrame, window: str | int, fn: str = "mean") -> pd.DataFrame:
+    """Replace each value by ``fn`` over a rolling window of its series.
+
+    ``window`` is a number of rows or a duration such as ``"10m"``.
+    """
+    df = _without_aliases(df)
+    _check("aggregate", fn, [a for a in AGGREGATES if a not in ("first", "last")])
+    keys = series_keys(df)
+    values = _value_columns(df, keys)
+    by_rows = isinstance(window, int) or str(window).isdigit()
+    time = _time_column(df, required=not by_rows)
+    out = _ordered(df, keys, time)
+    size = int(window) if by_rows else _duration(window)
+    frame = out[values] if by_rows else out[values].set_axis(pd.DatetimeIndex(out[time]))
+
+    def roll(part):
+        return part.rolling(size, min_periods=1).agg(fn)
+
+    if keys:
+        series = out.groupby(keys, observed=True, sort=False).ngroup().to_numpy()
+        rolled = frame.groupby(series, sort=False).transform(roll)
+    else:
+        rolled = roll(frame)
+    out[values] = rolled.to_numpy()
+    return out
+
+
+def rate(df: pd.DataFrame, unit: str = "1s", non_negative: bool = False) -> pd.DataFrame:
+    """Return the per-``unit`` rate of change of each series (like Flux ``derivative``).
+
+    The first point of every series has no rate and is dropped; with
+    ``non_negative`` negative rates (counter resets) become NaN.
+    """
+    df = _without_aliases(df)
+    time = _time_column(df)
+    keys = series_keys(df)
+    values = _value_columns(df, keys)
+    out = _ordered(df, keys, time)
+    groups = _groups(out, keys)
+    deltas = (out[values] if groups is None else groups[values]).diff()
+    elapsed = (out[time] if groups is None else groups[time]).diff().dt.total_seconds()
+    rates = deltas.div(elapsed / _duration(unit).total_seconds(), axis=0)
+    if non_negative:
+        rates = rates.where(rates >= 0)
+    out[values] = rates.astype("float64")
+    return out[elapsed.notna().to_numpy()].reset_index(drop=True)
+
+
+def anomalies(df: pd.DataFrame, method: str = "zscore", threshold: float | None = None) -> pd.DataFrame:
+    """Score every value against its series and flag outliers.
+
+    ``zscore`` scores the distance from the series mean in standard
+    deviations (flagged above 3 by default); ``iqr`` scores the distance
+    outside the quartiles in interquartile ranges (flagged above 1.5). Adds
+    a ``<column>_score`` column per value column and a boolean ``anomaly``.
+    """
+    df = _without_aliases(df)
+    _check("method", method, ANOMALY_METHODS)
+    threshold = ANOMALY_METHODS[method] if threshold is None else float(threshold)
+    keys = series_keys(df)
+    values = _value_columns(df, keys)
+    out = df.reset_index(drop=True)
+    data = out[values].astype("float64")
+    grouped = data.groupby([out[k] for k in keys], observed=True, sort=False) if keys else None
+    if method == "zscore":
+        mean = data.mean() if grouped is None else grouped.transform("mean")
+        std = data.std() if grouped is None else grouped.transform("std")
+        scores = ((data - mean) / std.replace(0, np.nan)).abs()
+    else:
+        q1 = data.quantile(0.25) if grouped is None else grouped.transform("quantile", 0.25)
+        q3 = data.quantile(0.75) if grouped is None else grouped.transform("quantile", 0.75)
+        spread = (q3 - q1).replace(0, np.nan)
+        scores = np.maximum(data - q3, q1 - data).clip(lower=0) / spread
+    flagged = (scores > threshold).any(axis=1)
+    for column in values:
+        out[f"{column}_score"] = scores[column].to_numpy()
+    out["anomaly"] = flagged.to_numpy()
+    return out
+
+
+def correlate(df: pd.DataFrame, method: str = "pearson", every: str | None = None) -> pd.DataFrame:
+    """Return the correlation matrix between all series (and value columns).
+
+    Series are aligned on their timestamps, or on ``every``-long windows when
+    their points do not line up.
+    """
+    df = _without_aliases(df)
+    _check("method", method, CORRELATIONS)
+    time = _time_column(df)
+    keys = series_keys(df)
+    values = _value_columns(df, keys)
+    stamps = df[time].dt.floor(_duration(every)) if every else df[time]
+    # Lay the series side by side on a (timestamp x series) grid; points that
+    # share a cell are averaged.
+    rows, stamp_values = pd.factorize(stamps, sort=True)
+    if keys:
+        grouped = df.groupby(keys, observed=True, sort=False)
+        series, names = grouped.ngroup().to_numpy(), grouped.size().index
+        names = [n if isinstance(n, tuple) else (n,) for n in names]
+    else:
+        series, names = np.zeros(len(df), dtype=np.int64), [()]
+    cell = rows * len(names) + series
+    cells = len(stamp_values) * len(names)
+    columns, labels = [], []
+    for column in values:
+        data = df[column].to_numpy(dtype="float64", na_value=np.nan)
+        present = ~np.isnan(data)
+        counts = np.bincount(cell[present], minlength=cells)
+        sums = np.bincount(cell[present], weights=data[present], minlength=cells)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            columns.append((sums / counts).reshape(len(stamp_values), len(names)))
+        for name in names:
+            parts = ([] if len(values) == 1 and keys else [str(column)]) + [f"{k}={v}" for k, v in zip(keys, name)]
+            labels.append(",".join(parts))
+    wide = pd.DataFrame(np.hstack(columns), columns=labels)
+    matrix = wide.corr(method=method, min_periods=2)
+    matrix.index.name = "series"
+    return matrix.reset_index()
+
+
+def strongest_pairs(matrix: pd.DataFrame, n: int = 5) -> list:
+    """Return the ``n`` most strongly correlated pairs of a ``correlate`` result."""
+    labels = matrix["series"].tolist()
+    values = matrix.drop(columns="series").to_numpy(dtype="float64")
+    rows, cols = np.triu_indices(len(labels), 1)
+    r = values[rows, cols]
+    keep = ~np.isnan(r)
+    rows, cols, r = rows[keep], cols[keep], r[keep]
+    order = np.argsort(-np.abs(r), kind="stable")[:n]
+    return [{"a": labels[rows[i]], "b": labels[cols[i]], "r": round(float(r[i]), 4)} for i in order]
+
+
+def aggregate(df: pd.DataFrame, by, fns=("count", "mean", "min", "max")) -> pd.DataFrame:
+    """Aggregate the value columns per distinct combination of the ``by`` columns."""
+    by = [by] if isinstance(by, str) else list(by)
+    df = _without_aliases(df, keep=by)
+    missing = [c for c in by if c not in df.columns]
+    if missing:
+        raise ValueError(f"Unknown columns: {', '.join(missing)}.")
+    fns = [fns] if isinstance(fns, str) else list(fns)
+    for fn in fns:
+        _check("aggregate", fn, AGGREGATES)
+    values = [c for c in _value_columns(df, by) if c not in by]
+    out = df.groupby(by, observed=True)[values].agg(fns)
+    out.columns = [f"{column}_{fn}" for column, fn in out.columns]
+    return out.reset_index()
+
+
+__all__ = [
+    "AGGREGATES",
+    "CORRELATIONS",
+    "ANOMALY_METHODS",
+    "resample",
+    "rolling",
+    "rate",
+    "anomalies",
+    "correlate",
+    "strongest_pairs",
+    "aggregate",
+]
@@ -0,0 +1,89 @@
+"""Batched, asynchronous writes of many line-protocol records."""
+
+import os
+import threading
+import time
+
+from .influx_client import INFLUX_RETRIES, INFLUX_RETRY_BACKOFF
+
+try:
+    from config import WRITE_BATCH_SIZE, WRITE_BATCH_BYTES, WRITE_FLUSH_INTERVAL_MS
+except ImportError:  # pragma: no cover - fallback for runtime usage
+    WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "5000"))
+    WRITE_BATCH_BYTES = int(os.getenv("WRITE_BATCH_BYTES", str(1024 * 1024)))
+    WRITE_FLUSH_INTERVAL_MS = int(os.getenv("WRITE_FLUSH_INTERVAL_MS", "1000"))
+
+
+def _line_count(data) -> int:
+    if not data:
+        return 0
+    newline = b"\n" if isinstance(data, bytes) else "\n"
+    return data.count(newline) + 1
+
+
+def batch_size_for(lines: list, batch_size: int = WRITE_BATCH_SIZE, batch_bytes: int = WRITE_BATCH_BYTES) -> int:
+    """Return a line count per batch that keeps batches under ``batch_bytes``."""
+    if not lines:
+        return batch_size
+    sample = lines[:: max(1, len(lines) // 1000)]
+    average = sum(len(line) + 1 for line in sample) / len(sample)
+    return max(1, min(batch_size, int(batch_bytes // average)))
+
+
+def write_lines(client, bucket: str, org: str, lines: list) -> dict:
+    """Send ``lines`` through the client's batching write API and wait for the flush.
+
+    Batches are written in the background by the client, compressed when
+    the client has gzip enabled and retried with exponential backoff. Lines
+    rejected by the server are counted from the error callback.
+    """
+    from influxdb_client.client.write_api import WriteOptions, WriteType
+
+    report = {"batches": 0, "retries": 0, "server_rejected": 0, "errors": []}
+    lock = threading.Lock()
+
+    def on_success(conf, data):
+        with lock:
+            report["batches"] += 1
+
+    def on_error(conf, data, exception):
+        with lock:
+            report["server_rejected"] += _line_count(data)
+            if len(report["errors"]) < 5:
+                report["errors"].append(str(exception))
+
+    def on_retry(conf, data, exception):
+        with lock:
+            report["retries"] += 1
+
+    options = WriteOptions(
+        write_type=WriteType.batching,
+        batch_size=batch_size_for(lines),
+        flush_interval=WRITE_FLUSH_INTERVAL_MS,
+        max_retries=INFLUX_RETRIES,
+        retry_interval=int(INFLUX_RETRY_BACKOFF * 1000),
+        exponential_base=2,
+    )
+    started = time.perf_counter()
+    write_api = client.write_api(
+        write_options=options,
+        success_callback=on_success,
+        error_callback=on_error,
+        retry_callback=on_retry,
+    )
+    try:
+        write_api.write(bucket=bucket, org=org, record=lines)
+    finally:
+        # close() flushes every pending batch before returning.
+        write_api.close()
+    elapsed = time.perf_counter() - started
+    written = len(lines) - report["server_rejected"]
+    return {
+        **report,
+        "points": written,
+        "seconds": round(elapsed, 3),
+        "points_per_second": round(written / elapsed, 1) if elapsed else None,
+    }
+
+
+__all__ = ["write_lines", "batch_size_for"]
@@ -1,10 +1,6 @@
 from swarm import Agent
-from .common import MODEL_NAME_1
-
-
-def ask_user(question: str) -> str:
-    """Prompt the user for additional information."""
-    return input(f"{question}\n> ")
+from .common import model_for
+from .prompt import ask_user, use_answers  # noqa: F401  (use_answers re-exported)
 
 
 clarifying_agent = Agent(
@@ -14,5 +10,5 @@ clarifying_agent = Agent(
         "Whenever more information is needed or a conversation ends, call the ask_user function to interact with the user."
     ),
     functions=[ask_user],
-    model=MODEL_NAME_1,
+    model=model_for("clarifying"),
 )
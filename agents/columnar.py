@@ -0,0 +1,155 @@
+"""Streaming decoder for annotated CSV query results.
+
+Rows are consumed incrementally from the client's CSV iterator and buffered
+for at most ``chunk_size`` rows before being transposed and converted to typed
+NumPy arrays, so no per-row dicts are ever built. Timestamps become
+``datetime64[ns]`` arrays (int64 epoch nanoseconds in memory), doubles
+``float64``, longs ``int64`` and strings dictionary-encoded categoricals.
+"""
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 50_000
+
+_NAT = np.iinfo(np.int64).min
+
+
+def _kind(datatype: str) -> str:
+    if datatype.startswith("dateTime"):
+        return "time"
+    if datatype in ("double", "long", "unsignedLong", "boolean"):
+        return datatype
+    return "string"
+
+
+def _convert(values: list, kind: str, lookup: dict):
+    """Convert one chunk of CSV strings to a typed array."""
+    if kind == "time":
+        parsed = pd.to_datetime(values, utc=True, format="ISO8601")
+        return parsed.tz_convert(None).values.astype("datetime64[ns]")
+    if kind == "boolean":
+        return np.asarray(values) == "true"
+    if kind == "string":
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+        remap = np.array(
+            [lookup.setdefault(v, len(lookup)) for v in uniques], dtype=np.int32
+        )
+        return remap[codes] if len(remap) else codes.astype(np.int32)
+    try:
+        numbers = np.asarray(values, dtype=np.float64)
+    except ValueError:
+        numbers = pd.to_numeric(np.asarray(values, dtype=object), errors="coerce")
+    if kind == "double" or np.isnan(numbers).any():
+        return np.asarray(numbers, dtype=np.float64)
+    return np.asarray(numbers, dtype=np.uint64 if kind == "unsignedLong" else np.int64)
+
+
+class _Column:
+    __slots__ = ("kind", "chunks", "lookup")
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.chunks = []
+        self.lookup = {}
+
+    def append(self, offset: int, values: list, kind: str) -> None:
+        if kind != self.kind:
+            self.kind = "mixed"
+        self.chunks.append((offset, kind, _convert(values, kind, self.lookup)))
+
+    def _decoded(self, kind: str, array):
+        if kind == "string":
+            return np.asarray(list(self.lookup), dtype=object)[array]
+        return array.astype(object)
+
+    def finish(self, total: int):
+        """Assemble the chunks into one array of ``total`` rows."""
+        contiguous = sum(len(a) for _, _, a in self.chunks) == total
+        if self.kind == "string":
+            codes = np.full(total, -1, dtype=np.int32)
+            for offset, _, array in self.chunks:
+                codes[offset:offset + len(array)] = array
+            return pd.Categorical.from_codes(codes, categories=list(self.lookup))
+        if contiguous and self.kind != "mixed":
+            return np.concatenate([a for _, _, a in self.chunks])
+        if self.kind == "time":
+            out = np.full(total, _NAT, dtype=np.int64).view("datetime64[ns]")
+        elif self.kind in ("double", "long", "unsignedLong"):
+            out = np.full(total, np.nan, dtype=np.float64)
+        else:
+            out = np.full(total, None, dtype=object)
+        for offset, kind, array in self.chunks:
+            if out.dtype == object:
+                array = self._decoded(kind, array)
+            out[offset:offset + len(array)] = array
+        return out
+
+
+def read_columns(rows, chunk_size: int = CHUNK_ROWS) -> dict:
+    """Decode an annotated CSV row iterator into a dict of typed columns.
+
+    Tables with differing schemas are merged into one set of columns; cells
+    of columns absent from a table are filled with NaN/NaT/missing.
+    """
+    columns = {}
+    total = 0
+    datatypes = defaults = header = None
+    pending = []
+
+    def flush():
+        nonlocal total
+        if not pending:
+            return
+        size = len(pending)
+        transposed = zip(*pending)
+        next(transposed)
+        for i, (name, values) in enumerate(zip(header, transposed)):
+            default = defaults[i] if defaults else ""
+            if default:
+                values = [v or default for v in values]
+            kind = _kind(datatypes[i]) if datatypes else "string"
+            column = columns.get(name)
+            if column is None:
+                column = columns[name] = _Column(kind)
+            column.append(total, values, kind)
+        total += size
+        pending.clear()
+
+    for row in rows:
+        if header is not None and len(row) > 1 and not row[0]:
+            pending.append(row)
+            if len(pending) >= chunk_size:
+                flush()
+            continue
+        if not row or row == [""]:
+            flush()
+            header = None
+            continue
+        if row[0].startswith("#"):
+            flush()
+            header = None
+            if row[0] == "#datatype":
+                datatypes = row[1:]
+            elif row[0] == "#default":
+                defaults = row[1:]
+            continue
+        header = row[1:]
+    flush()
+
+    result = {}
+    for name in list(columns):
+        result[name] = columns.pop(name).finish(total)
+    return result
+
+
+def columns_to_frame(columns: dict) -> pd.DataFrame:
+    """Build a DataFrame from decoded columns with UTC-aware timestamps."""
+    df = pd.DataFrame(columns, copy=False)
+    for name, values in columns.items():
+        if isinstance(values, np.ndarray) and values.dtype.kind == "M":
+            df[name] = df[name].dt.tz_localize("UTC")
+    return df
+
+
+__all__ = ["read_columns", "columns_to_frame", "CHUNK_ROWS"]
@@ -1,6 +1,12 @@
+"""Model configuration and the shared model clients.
+
+The OpenAI clients and the ``TieredSwarm`` client are created on first
+access of ``client``, ``llm_client``, ``ollama_client`` or ``openai_client``,
+so importing this module does not load openai or swarm.
+"""
+
 import os
-from swarm import Swarm
-from openai import OpenAI
+import threading
 
 try:
     from config import (
@@ -25,17 +31,88 @@ except ImportError:  # pragma: no cover - fallback for runtime usage
     OLLAMA_MODEL_NAME_2 = os.getenv("OLLAMA_MODEL_NAME_2", OLLAMA_MODEL_NAME_1)
     OLLAMA_MODEL_NAME_3 = os.getenv("OLLAMA_MODEL_NAME_3", OLLAMA_MODEL_NAME_1)
 
-ollama_client = OpenAI(base_url=OLLAMA_BASE_URL, api_key="ollama")
-openai_client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+try:
+    from config import AGENT_MODEL_TIERS, ESCALATION_TIER
+except ImportError:  # pragma: no cover - fallback for runtime usage
+    # e.g. "triage=fast,clarifying=fast,database=standard,data_specialist=standard"
+    AGENT_MODEL_TIERS = dict(
+        item.split("=", 1) for item in os.getenv("AGENT_MODEL_TIERS", "").split(",") if "=" in item
+    )
+    ESCALATION_TIER = os.getenv("ESCALATION_TIER", "heavy")
+
+try:
+    from config import LLM_MAX_CONCURRENT
+except ImportError:  # pragma: no cover - fallback for runtime usage
+    LLM_MAX_CONCURRENT = int(os.getenv("LLM_MAX_CONCURRENT", "4"))
+
+# Small, fast models route and clarify; the standard model writes Flux and
+# analyses data; the heavy model takes over after a failed tool call.
+DEFAULT_AGENT_TIERS = {
+    "triage": "fast",
+    "clarifying": "fast",
+    "database": "standard",
+    "data_specialist": "standard",
+}
 
 provider = (LLM_PROVIDER or "").lower()
 if provider == "openai":
-    client = Swarm(openai_client)
     MODEL_NAME_1 = OPENAI_MODEL_NAME_1
     MODEL_NAME_2 = OPENAI_MODEL_NAME_2
     MODEL_NAME_3 = OPENAI_MODEL_NAME_3
 else:
-    client = Swarm(ollama_client)
     MODEL_NAME_1 = OLLAMA_MODEL_NAME_1
     MODEL_NAME_2 = OLLAMA_MODEL_NAME_2
     MODEL_NAME_3 = OLLAMA_MODEL_NAME_3
+
+MODEL_TIERS = {"standard": MODEL_NAME_1, "fast": MODEL_NAME_2, "heavy": MODEL_NAME_3}
+
+
+def model_for(agent: str) -> str:
+    """Return the model name for ``agent`` according to its configured tier."""
+    tier = AGENT_MODEL_TIERS.get(agent) or DEFAULT_AGENT_TIERS.get(agent, "standard")
+    return MODEL_TIERS.get(tier, tier)
+
+
+_clients = {}
+# Reentrant: building ``client`` or ``llm_client`` gets the client it wraps.
+_clients_lock = threading.RLock()
+
+
+def _build(name: str):
+    if name == "ollama_client":
+        from openai import OpenAI
+
+        return OpenAI(base_url=OLLAMA_BASE_URL, api_key="ollama")
+    if name == "openai_client":
+        from openai import OpenAI
+
+        return OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+    if name == "llm_client":
+        return _get("openai_client" if provider == "openai" else "ollama_client")
+    from .tiering import TieredSwarm
+
+    return TieredSwarm(
+        _get("llm_client"),
+        escalation_model=MODEL_TIERS.get(ESCALATION_TIER, ESCALATION_TIER),
+        max_concurrent=LLM_MAX_CONCURRENT,
+    )
+
+
+def _get(name: str):
+    with _clients_lock:
+        if name not in _clients:
+            _clients[name] = _build(name)
+        return _clients[name]
+
+
+def __getattr__(name):
+    if name in ("client", "llm_client", "ollama_client", "openai_client"):
+        return _get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def model_stats() -> dict:
+    """Return per-agent, per-model completion counts and latency and the escalations."""
+    if "client" not in _clients:
+        return {"calls": [], "escalations": 0}
+    return _get("client").stats()
@@ -0,0 +1,60 @@
+"""Compact columnar form for stored datasets.
+
+Lists of dicts hold a Python object per cell: every timestamp is a
+``datetime`` and every tag value a separate ``str``. ``compact_frame``
+converts a dataset once into a DataFrame with typed columns instead:
+timestamps become ``datetime64[ns]`` (int64 epoch nanoseconds), repetitive
+strings become categoricals and numbers are downcast where no value changes.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# String columns with at most this share of distinct values become categorical.
+CATEGORY_RATIO = 0.5
+
+
+def _compact_column(values: pd.Series) -> pd.Series:
+    kind = values.dtype.kind
+    if kind == "M":
+        return values.dt.as_unit("ns")
+    if kind == "i":
+        return pd.to_numeric(values, downcast="integer")
+    if kind == "f":
+        narrow = values.astype(np.float32)
+        if np.array_equal(narrow.to_numpy(np.float64), values.to_numpy(), equal_nan=True):
+            return narrow
+        return values
+    if kind != "O" or values.empty:
+        return values
+    sample = values.dropna()
+    if sample.empty:
+        return values
+    first = sample.iloc[0]
+    if isinstance(first, datetime):
+        try:
+            return pd.to_datetime(values, utc=True).dt.as_unit("ns")
+        except (TypeError, ValueError):
+            return values
+    if isinstance(first, str) and sample.map(type).eq(str).all():
+        if values.nunique() <= CATEGORY_RATIO * len(values):
+            return values.astype("category")
+    return values
+
+
+def compact_frame(data) -> pd.DataFrame | None:
+    """Return ``data`` (records, a dict of columns or a DataFrame) as a compact
+    DataFrame, or ``None`` if it is not tabular."""
+    if isinstance(data, pd.DataFrame):
+        frame = data
+    else:
+        try:
+            frame = pd.DataFrame(data)
+        except (TypeError, ValueError):
+            return None
+    return pd.DataFrame({column: _compact_column(values) for column, values in frame.items()}, index=frame.index)
+
+
+__all__ = ["compact_frame", "CATEGORY_RATIO"]
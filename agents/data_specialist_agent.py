@@ -1,101 +1,251 @@
+import json
 import os
 import pandas as pd
-import matplotlib.pyplot as plt
 from swarm import Agent
-from .common import MODEL_NAME_1
-from .data_store import head_cached_data
+from .common import model_for
+from . import analytics, flux
+from .filter_engine import apply_filters, compile_filters, pushdown
+from .metrics import instrument
+from .data_store import (
+    DEFAULT_HANDLE,
+    get_dataframe,
+    get_store,
+    head_cached_data,
+    list_cached_data,
+    store_cached_data,
+)
+from .plotting import PLOT_DIR, infer_plot_type, render
+from .render_pool import RENDER_BACKGROUND, plot_status, render_pool, wait_for_plot
+
+
+def _frame(handle: str) -> pd.DataFrame:
+    """Return the stored DataFrame for ``handle`` or raise if it is missing."""
+    df = get_dataframe(handle)
+    if df is None:
+        raise ValueError(f"No dataset stored under handle '{handle}'.")
+    return df
+
+
+def _summary(df: pd.DataFrame, handle: str) -> dict:
+    """Return a compact description of ``df`` for the model."""
+    return {
+        "handle": handle,
+        "rows": len(df),
+        "columns": len(df.columns),
+        "dtypes": {str(c): str(t) for c, t in df.dtypes.items()},
+    }
+
+
+@instrument
+def list_data_fields(handle: str = DEFAULT_HANDLE) -> list:
+    """List all available fields in the dataset stored under ``handle``."""
+    return list(_frame(handle).columns)
+
+
+@instrument
+def describe_data(handle: str = DEFAULT_HANDLE) -> dict:
+    """Summarize the dataset stored under ``handle`` with per-column statistics."""
+    df = _frame(handle)
+    summary = _summary(df, handle)
+    numeric = df.select_dtypes(include="number")
+    if not numeric.empty:
+        stats = numeric.agg(["min", "max", "mean"]).T
+        summary["stats"] = {
+            str(c): {k: float(v) for k, v in row.items()} for c, row in stats.iterrows()
+        }
+    return summary
+
+
+@instrument
+def filter_data(
+    filters: dict,
+    handle: str = DEFAULT_HANDLE,
+    result_handle: str | None = None,
+    pushdown_to_server: bool = True,
+) -> dict:
+    """Filter the dataset stored under ``handle`` and store the result.
+
+    ``filters`` maps field names to pandas-style conditions (``"num >= 7"``), a
+    value to match or a list of allowed values. All conditions are combined
+    into one mask. For datasets stored by ``influx_query_store``, time ranges,
+    tag equality and ``_value`` thresholds are pushed into the originating
+    Flux query so the server returns only matching rows. The filtered rows are
+    stored under ``result_handle`` (``<handle>_filtered`` by default) and
+    only a summary is returned.
+    """
+    df = _frame(handle)
+    conditions = compile_filters(filters)
+    store = get_store()
+    query = store.meta(handle).get("query")
+    meta, pushed = None, []
+    if pushdown_to_server and query:
+        pushed_query, pushed = pushdown(query, conditions, df)
+        if pushed:
+            from .compact import compact_frame
+            from .database_manager import influx_query
+
+            # Fetch in the stored shape: records also carry ``value`` and ``time``.
+            output = {"records": "records", "columns": "columns"}.get(store.shape(handle), "dataframe")
+            data = influx_query(pushed_query, output=output)
+            df = compact_frame(data) if len(data) else df.iloc[:0]
+            if len(pushed) == len(conditions):
+                meta = {"query": flux.normalize(pushed_query)}
+    df = apply_filters(df, conditions)
+    result_handle = result_handle or f"{handle}_filtered"
+    store_cached_data(df, result_handle, meta=meta)
+    summary = _summary(df, result_handle)
+    if pushed:
+        summary["pushed_down"] = [f"{c.column} {c.op} {c.value!r}" for c in pushed]
+    return summary
+
+
+def _records(df: pd.DataFrame) -> list:
+    """Return the rows of a small ``df`` as JSON-compatible dicts."""
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
 
+def _store_result(df: pd.DataFrame, handle: str, result_handle: str | None, suffix: str) -> dict:
+    """Store an analysis result and return its summary."""
+    result_handle = result_handle or f"{handle}_{suffix}"
+    store_cached_data(df, result_handle)
+    return _summary(df, result_handle)
 
-def list_data_fields(data: dict) -> list:
-    """List all available fields in the provided dataset."""
-    df = pd.DataFrame(data)
-    return list(df.columns)
 
+@instrument
+def resample_data(
+    every: str,
+    fn: str = "mean",
+    handle: str = DEFAULT_HANDLE,
+    result_handle: str | None = None,
+) -> dict:
+    """Aggregate each series of ``handle`` into ``every``-long windows (e.g. ``"5m"``) with ``fn``.
 
-def filter_data(data: dict, filters: dict) -> dict:
-    """Filter the dataset based on provided criteria."""
-    df = pd.DataFrame(data)
-    for field, condition in filters.items():
-        df = df.query(condition)
-    return df.to_dict(orient="list")
+    ``fn`` is one of mean, min, max, sum, count, median, first, last or std.
+    The result is stored under ``result_handle`` (``<handle>_resampled`` by
+    default) and only a summary is returned.
+    """
+    return _store_result(analytics.resample(_frame(handle), every, fn), handle, result_handle, "resampled")
 
 
-def visualize_data(data: dict, plot_type: str | None = None, filename: str | None = None) -> str:
-    """Generate a plot from the data and save it to a file."""
-    df = pd.DataFrame(data)
+@instrument
+def rolling_data(
+    window: str,
+    fn: str = "mean",
+    handle: str = DEFAULT_HANDLE,
+    result_handle: str | None = None,
+) -> dict:
+    """Smooth each series of ``handle`` with ``fn`` over a rolling ``window``.
 
-    numeric_cols = df.select_dtypes(include="number").columns.tolist()
-    categorical_cols = df.select_dtypes(include=["object", "category"]).columns.tolist()
+    ``window`` is a duration such as ``"10m"`` or a number of points such as
+    ``"12"``. Stored under ``<handle>_rolling`` by default.
+    """
+    return _store_result(analytics.rolling(_frame(handle), window, fn), handle, result_handle, "rolling")
 
-    if not plot_type:
-        if len(numeric_cols) >= 2:
-            plot_type = "scatter"
-        elif numeric_cols:
-            plot_type = "hist"
-        else:
-            plot_type = "bar"
+
+@instrument
+def rate_data(
+    unit: str = "1s",
+    non_negative: bool = False,
+    handle: str = DEFAULT_HANDLE,
+    result_handle: str | None = None,
+) -> dict:
+    """Compute the rate of change per ``unit`` of each series of ``handle``.
+
+    Use ``non_negative`` for counters, so that resets do not show up as large
+    negative rates. Stored under ``<handle>_rate`` by default.
+    """
+    return _store_result(analytics.rate(_frame(handle), unit, non_negative), handle, result_handle, "rate")
+
+
+@instrument
+def detect_anomalies(
+    method: str = "zscore",
+    threshold: float | None = None,
+    handle: str = DEFAULT_HANDLE,
+    result_handle: str | None = None,
+) -> dict:
+    """Flag outliers in each series of ``handle`` by z-score (``"zscore"``) or interquartile range (``"iqr"``).
+
+    The full data with a score per value column and an ``anomaly`` flag is
+    stored under ``<handle>_anomalies`` by default; the summary reports the
+    number of anomalies and the strongest few.
+    """
+    df = analytics.anomalies(_frame(handle), method, threshold)
+    summary = _store_result(df, handle, result_handle, "anomalies")
+    flagged = df[df["anomaly"].to_numpy()]
+    scores = [c for c in df.columns if str(c).endswith("_score")]
+    top = flagged.loc[flagged[scores].max(axis=1).nlargest(5).index]
+    summary["anomalies"] = len(flagged)
+    summary["strongest"] = _records(top)
+    return summary
+
+
+@instrument
+def correlate_series(
+    method: str = "pearson",
+    every: str | None = None,
+    handle: str = DEFAULT_HANDLE,
+    result_handle: str | None = None,
+) -> dict:
+    """Correlate every pair of series of ``handle`` (``pearson``, ``spearman`` or ``kendall``).
+
+    Series are matched on timestamps, or on ``every``-long windows if their
+    points do not line up. The matrix is stored under
+    ``<handle>_correlation`` by default; the summary lists the strongest pairs.
+    """
+    matrix = analytics.correlate(_frame(handle), method, every)
+    summary = _store_result(matrix, handle, result_handle, "correlation")
+    summary["strongest_pairs"] = analytics.strongest_pairs(matrix)
+    return summary
+
+
+@instrument
+def aggregate_by_tag(
+    by: list,
+    fns: list | None = None,
+    handle: str = DEFAULT_HANDLE,
+    result_handle: str | None = None,
+) -> dict:
+    """Aggregate the values of ``handle`` per distinct value of the tag columns ``by``.
+
+    ``fns`` defaults to count, mean, min and max. The table is stored under
+    ``<handle>_by_tag`` by default and returned in the summary when it has
+    at most 20 rows.
+    """
+    table = analytics.aggregate(_frame(handle), by, fns or ("count", "mean", "min", "max"))
+    summary = _store_result(table, handle, result_handle, "by_tag")
+    if len(table) <= 20:
+        summary["table"] = _records(table)
+    return summary
+
+
+@instrument
+def visualize_data(
+    handle: str = DEFAULT_HANDLE,
+    plot_type: str | None = None,
+    filename: str | None = None,
+    decimation: str = "lttb",
+    background: bool | None = None,
+) -> str:
+    """Generate a plot from the dataset stored under ``handle`` and save it to a file.
+
+    Line plots are reduced to the figure's pixel width beforehand with
+    ``decimation`` (``"lttb"``, ``"minmax"`` envelopes or ``"none"``), and dense
+    scatter plots are rasterized. With ``background`` (``RENDER_BACKGROUND``
+    by default) the plot renders in a worker process and the returned path is
+    a handle for ``plot_status`` and ``wait_for_plot``; the file exists once
+    rendering is done.
+    """
+    df = _frame(handle)
+    plot_type = plot_type or infer_plot_type(df)
+    if RENDER_BACKGROUND if background is None else background:
+        return render_pool.submit(df, plot_type, filename, decimation)
 
     if not filename:
-        timestamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
+        # Microseconds keep plots of concurrent sessions from overwriting each other.
+        timestamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S_%f")
         filename = f"plot_{plot_type}_{timestamp}.png"
-
-    plt.figure()
-    if plot_type == "scatter":
-        x, y = numeric_cols[:2]
-        plt.scatter(df[x], df[y])
-        plt.xlabel(x)
-        plt.ylabel(y)
-        plt.title(f"Scatter plot of {y} vs {x}")
-    elif plot_type == "line":
-        if len(numeric_cols) >= 2:
-            x, y = numeric_cols[:2]
-            plt.plot(df[x], df[y])
-            plt.xlabel(x)
-            plt.ylabel(y)
-            plt.title(f"Line plot of {y} vs {x}")
-        else:
-            col = numeric_cols[0]
-            plt.plot(df[col])
-            plt.xlabel("index")
-            plt.ylabel(col)
-            plt.title(f"Line plot of {col}")
-    elif plot_type == "bar":
-        if categorical_cols and numeric_cols:
-            x = categorical_cols[0]
-            y = numeric_cols[0]
-            plt.bar(df[x], df[y])
-            plt.xlabel(x)
-            plt.ylabel(y)
-            plt.title(f"Bar chart of {y} by {x}")
-        else:
-            df.plot(kind="bar")
-            plt.title("Bar chart of dataset")
-    elif plot_type == "hist":
-        col = numeric_cols[0]
-        plt.hist(df[col], bins=10)
-        plt.xlabel(col)
-        plt.title(f"Histogram of {col}")
-    elif plot_type == "pie":
-        if categorical_cols and numeric_cols:
-            labels = df[categorical_cols[0]]
-            sizes = df[numeric_cols[0]]
-            plt.pie(sizes, labels=labels, autopct="%1.1f%%")
-            plt.title(f"Pie chart of {numeric_cols[0]} by {categorical_cols[0]}")
-        else:
-            raise ValueError(
-                "Pie chart requires at least one categorical and one numeric column."
-            )
-    else:
-        df.plot()
-        plt.title("Default plot of dataset")
-
-    plt.tight_layout()
-    output_dir = "plots"
-    os.makedirs(output_dir, exist_ok=True)
-    filepath = os.path.join(output_dir, filename)
-    plt.savefig(filepath)
-    plt.close()
-    return filepath
+    return render(df, plot_type, os.path.join(PLOT_DIR, filename), decimation)
 
 
 data_specialist_agent = Agent(
@@ -104,15 +254,35 @@ data_specialist_agent = Agent(
         "You are a data specialist agent. You can list data fields, filter datasets based on criteria, "
         "and autonomously decide which data to visualize. You generate plot files when requested, "
         "supporting scatter, line, bar, histogram and pie charts. "
-        "Retrieved data is cached globally. Use head_cached_data to inspect the first rows. "
+        "visualize_data returns a plot handle at once and renders in the background, so several charts "
+        "can be requested in a row; use plot_status or wait_for_plot before reporting a plot as finished. "
+        "Retrieved data is cached in a shared data store under named handles. "
+        "Use list_cached_data to see the available handles and head_cached_data to inspect the first rows. "
+        "All tools take the handle of a stored dataset instead of the data itself; never copy raw data "
+        "into tool arguments. filter_data stores its result under a new handle and returns only a summary; "
+        "its conditions look like \"num >= 7\" or \"host == 'a' and _value > 3\", and for datasets "
+        "fetched from InfluxDB, time ranges, tag equality and _value thresholds are applied by the server. "
+        "For analysis use resample_data, rolling_data, rate_data, detect_anomalies, correlate_series and "
+        "aggregate_by_tag rather than reading raw values: each works on every series of a stored dataset, "
+        "stores its result under a new handle that can be plotted or analysed further, and returns a summary. "
         "Start your analysis only when an actual dataset is provided. If no data is available, "
         "ask that it be retrieved via the database manager first."
     ),
     functions=[
         list_data_fields,
+        describe_data,
         filter_data,
+        resample_data,
+        rolling_data,
+        rate_data,
+        detect_anomalies,
+        correlate_series,
+        aggregate_by_tag,
         visualize_data,
+        plot_status,
+        wait_for_plot,
         head_cached_data,
+        list_cached_data,
     ],
-    model=MODEL_NAME_1,
+    model=model_for("data_specialist"),
 )
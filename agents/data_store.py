@@ -1,27 +1,380 @@
-cached_data = None
+"""Named, memory-bounded store for datasets shared between agents.
 
+Datasets are kept under string handles in least-recently-used order. When the
+total estimated size exceeds the byte budget the oldest entries are evicted,
+optionally spilling them to a local directory from which they are reloaded
+transparently on the next access. The unnamed slot used by older callers is
+the ``"default"`` handle.
 
-def store_cached_data(data):
-    """Store data in the global cache and return a status message."""
-    global cached_data
-    cached_data = data
-    length = len(data) if hasattr(data, "__len__") else 0
-    return {"status": "stored", "records": length}
+The application's store keeps tabular datasets in the compact columnar form
+of ``agents/compact.py``, built once on insert; ``get`` converts back to the
+shape that was stored, while the tools read the compact frame directly.
+"""
 
+import contextvars
+import os
+import pickle
+import re
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 
-def get_cached_data():
-    """Return the cached dataset."""
-    return cached_data
+from .metrics import instrument
 
+try:
+    from config import DATA_STORE_MAX_BYTES, DATA_STORE_SPILL_DIR
+except ImportError:  # pragma: no cover - fallback for runtime usage
+    DATA_STORE_MAX_BYTES = int(os.getenv("DATA_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
+    DATA_STORE_SPILL_DIR = os.getenv("DATA_STORE_SPILL_DIR", "")
 
-def head_cached_data(n: int = 10):
-    """Return the first ``n`` rows from the cached dataset."""
-    if cached_data is None:
+try:
+    from config import DATA_STORE_COMPACT
+except ImportError:  # pragma: no cover - fallback for runtime usage
+    DATA_STORE_COMPACT = os.getenv("DATA_STORE_COMPACT", "true").lower() == "true"
+
+DEFAULT_HANDLE = "default"
+
+_SIZE_SAMPLE = 100
+
+
+def _record_size(record) -> int:
+    if isinstance(record, dict):
+        return sys.getsizeof(record) + sum(
+            sys.getsizeof(k) + sys.getsizeof(v) for k, v in record.items()
+        )
+    return sys.getsizeof(record)
+
+
+def estimate_size(data) -> int:
+    """Estimate the in-memory size of ``data`` in bytes."""
+    if data is None:
+        return 0
+    memory_usage = getattr(data, "memory_usage", None)
+    if callable(memory_usage) and hasattr(data, "columns"):
+        return int(memory_usage(deep=True).sum())
+    if hasattr(data, "nbytes"):
+        return int(data.nbytes)
+    if isinstance(data, dict):
+        return sys.getsizeof(data) + sum(estimate_size(v) for v in data.values())
+    if isinstance(data, (list, tuple)):
+        if not data:
+            return sys.getsizeof(data)
+        step = max(1, len(data) // _SIZE_SAMPLE)
+        sample = data[::step]
+        per_record = sum(_record_size(r) for r in sample) / len(sample)
+        return sys.getsizeof(data) + int(per_record * len(data))
+    return sys.getsizeof(data)
+
+
+def _length(data) -> int:
+    return len(data) if hasattr(data, "__len__") else 0
+
+
+def _kind(data) -> str:
+    """Return the shape ``data`` was stored in: records, columns or frame."""
+    if isinstance(data, dict):
+        return "columns"
+    if isinstance(data, (list, tuple)):
+        return "records"
+    return "frame"
+
+
+class _Entry:
+    __slots__ = ("data", "size", "frame", "meta", "kind", "raw_size")
+
+    def __init__(self, data, size: int, meta: dict | None = None, kind: str | None = None, raw_size: int | None = None):
+        self.data = data
+        self.size = size
+        self.frame = None
+        self.meta = meta or {}
+        # Set for compacted entries: ``data`` is then the compact frame.
+        self.kind = kind
+        self.raw_size = size if raw_size is None else raw_size
+
+    def export(self):
+        """Return the dataset in the shape it was stored in."""
+        if self.kind == "records":
+            return self.data.to_dict(orient="records")
+        if self.kind == "columns":
+            return self.data.to_dict(orient="list")
+        return self.data
+
+
+class DataStore:
+    """LRU dataset store with a byte budget and optional spill directory.
+
+    With ``compact`` tabular datasets are converted to a compact DataFrame on
+    insert and their memory savings are reported.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DATA_STORE_MAX_BYTES,
+        spill_dir: str = DATA_STORE_SPILL_DIR,
+        compact: bool = False,
+    ):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.compact = compact
+        self._entries = OrderedDict()
+        self._spilled = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "spills": 0, "reloads": 0}
+
+    def put(self, handle: str, data, meta: dict | None = None, compact: bool = True) -> dict:
+        """Store ``data`` under ``handle`` and evict older entries if needed.
+
+        ``meta`` holds information about the dataset's origin, such as the
+        query that produced it. With ``compact=False`` a DataFrame that is
+        already compact (such as one reloaded from the dataset cache) is
+        stored as is instead of being copied into a new compact frame.
+        """
+        entry = self._make_entry(data, meta, compact)
+        with self._lock:
+            self._insert(handle, entry)
+        return self._status(handle, entry)
+
+    def _make_entry(self, data, meta: dict | None, compact: bool = True) -> _Entry:
+        if self.compact and data is not None:
+            import pandas as pd
+
+            from .compact import compact_frame
+
+            frame = data if not compact and isinstance(data, pd.DataFrame) else compact_frame(data)
+            if frame is not None:
+                entry = _Entry(frame, estimate_size(frame), meta, _kind(data), estimate_size(data))
+                entry.frame = frame
+                return entry
+        return _Entry(data, estimate_size(data), meta)
+
+    def _insert(self, handle: str, entry: _Entry) -> None:
+        self._discard(handle)
+        self._entries[handle] = entry
+        self._bytes += entry.size
+        self._enforce_budget()
+
+    @staticmethod
+    def _status(handle: str, entry: _Entry) -> dict:
+        status = {"status": "stored", "handle": handle, "records": _length(entry.data), "bytes": entry.size}
+        if entry.kind is not None:
+            status["saved_bytes"] = max(entry.raw_size - entry.size, 0)
+        return status
+
+    def _entry(self, handle: str) -> _Entry | None:
+        """Return the entry for ``handle``, reloading it from disk if it was spilled."""
+        entry = self._entries.get(handle)
+        if entry is not None:
+            self._entries.move_to_end(handle)
+            self._counters["hits"] += 1
+            return entry
+        path = self._spilled.pop(handle, None)
+        if path is None:
+            self._counters["misses"] += 1
+            return None
+        with open(path, "rb") as fh:
+            entry = pickle.load(fh)
+        os.remove(path)
+        self._counters["reloads"] += 1
+        self._counters["hits"] += 1
+        self._insert(handle, entry)
+        return entry
+
+    def get(self, handle: str):
+        """Return the dataset stored under ``handle`` or ``None``."""
+        with self._lock:
+            entry = self._entry(handle)
+            return None if entry is None else entry.export()
+
+    def meta(self, handle: str) -> dict:
+        """Return the metadata stored with ``handle`` (empty if unknown)."""
+        with self._lock:
+            entry = self._entry(handle)
+            return {} if entry is None else entry.meta
+
+    def shape(self, handle: str) -> str | None:
+        """Return the shape ``handle`` was stored in (records, columns or frame), or ``None``."""
+        with self._lock:
+            entry = self._entry(handle)
+            if entry is None:
+                return None
+            return entry.kind or _kind(entry.data)
+
+    def frame(self, handle: str):
+        """Return the dataset under ``handle`` as a DataFrame, converting it once."""
+        with self._lock:
+            entry = self._entry(handle)
+            if entry is None:
+                return None
+            if entry.frame is None:
+                import pandas as pd
+
+                if isinstance(entry.data, pd.DataFrame):
+                    entry.frame = entry.data
+                else:
+                    entry.frame = pd.DataFrame(entry.data)
+                    extra = estimate_size(entry.frame)
+                    entry.size += extra
+                    self._bytes += extra
+                    self._enforce_budget()
+            return entry.frame
+
+    def head(self, handle: str, n: int = 10):
+        """Return the first ``n`` rows under ``handle`` as a DataFrame slice."""
+        frame = self.frame(handle)
+        return None if frame is None else frame.head(n)
+
+    def drop(self, handle: str) -> bool:
+        """Remove ``handle`` from memory and the spill directory."""
+        with self._lock:
+            return self._discard(handle)
+
+    def handles(self) -> list:
+        """Return the stored handles, least recently used first."""
+        with self._lock:
+            return list(self._entries) + list(self._spilled)
+
+    def describe(self) -> list:
+        """Return handle, record count and size for every in-memory dataset.
+
+        Compacted datasets also report ``saved_bytes``, the estimated size of
+        the data as inserted minus the size of its compact form.
+        """
+        with self._lock:
+            return [
+                {k: v for k, v in self._status(h, e).items() if k != "status"}
+                for h, e in self._entries.items()
+            ] + [{"handle": h, "spilled": True} for h in self._spilled]
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counters and current memory usage."""
+        with self._lock:
+            return {
+                **self._counters,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "entries": len(self._entries),
+                "spilled_entries": len(self._spilled),
+            }
+
+    def clear(self) -> None:
+        """Drop every dataset."""
+        with self._lock:
+            for handle in self.handles():
+                self._discard(handle)
+
+    def _discard(self, handle: str) -> bool:
+        entry = self._entries.pop(handle, None)
+        if entry is not None:
+            self._bytes -= entry.size
+        path = self._spilled.pop(handle, None)
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+        return entry is not None or path is not None
+
+    def _enforce_budget(self) -> None:
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            handle, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self._counters["evictions"] += 1
+            if self.spill_dir:
+                self._spill(handle, entry)
+
+    def _spill(self, handle: str, entry: _Entry) -> None:
+        os.makedirs(self.spill_dir, exist_ok=True)
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", handle)
+        path = os.path.join(self.spill_dir, f"{name}-{id(entry):x}.pkl")
+        if entry.frame is not entry.data:
+            # A frame converted from records is rebuilt on demand after reloading.
+            entry.size -= estimate_size(entry.frame) if entry.frame is not None else 0
+            entry.frame = None
+        with open(path, "wb") as fh:
+            pickle.dump(entry, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        self._spilled[handle] = path
+        self._counters["spills"] += 1
+
+
+_store = DataStore(compact=DATA_STORE_COMPACT)
+# Set while a session's turn runs so that its tools see only its datasets.
+_session_store = contextvars.ContextVar("session_store", default=None)
+
+
+def get_store() -> DataStore:
+    """Return the active dataset store: the current session's, else the process-wide one."""
+    return _session_store.get() or _store
+
+
+@contextmanager
+def use_store(store: DataStore):
+    """Make ``store`` the active dataset store within the block (per thread/task)."""
+    token = _session_store.set(store)
+    try:
+        yield store
+    finally:
+        _session_store.reset(token)
+
+
+def store_cached_data(data, handle: str | None = None, meta: dict | None = None, compact: bool = True):
+    """Store data under ``handle`` (the default slot if omitted) and return a status message."""
+    return get_store().put(handle or DEFAULT_HANDLE, data, meta, compact)
+
+
+def get_cached_data(handle: str | None = None):
+    """Return the dataset stored under ``handle``."""
+    return get_store().get(handle or DEFAULT_HANDLE)
+
+
+def get_dataframe(handle: str | None = None):
+    """Return the dataset stored under ``handle`` as a DataFrame (shared, not copied)."""
+    return get_store().frame(handle or DEFAULT_HANDLE)
+
+
+@instrument
+def head_cached_data(n: int = 10, handle: str | None = None):
+    """Return the first ``n`` rows from the dataset stored under ``handle``."""
+    head = get_store().head(handle or DEFAULT_HANDLE, n)
+    if head is None:
         return None
-    import pandas as pd
+    return head.to_dict(orient="list")
+
+
+@instrument
+def list_cached_data() -> list:
+    """List the stored dataset handles with their record counts and sizes."""
+    return get_store().describe()
+
+
+def drop_cached_data(handle: str) -> dict:
+    """Remove the dataset stored under ``handle``."""
+    dropped = get_store().drop(handle)
+    return {"status": "dropped" if dropped else "missing", "handle": handle}
+
+
+def data_store_stats() -> dict:
+    """Return hit, miss, eviction and memory statistics of the dataset store."""
+    return get_store().stats()
+
 
-    df = pd.DataFrame(cached_data)
-    return df.head(n).to_dict(orient="list")
+def __getattr__(name):
+    # ``cached_data`` used to be a module global holding the single dataset.
+    if name == "cached_data":
+        return get_store().get(DEFAULT_HANDLE)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-__all__ = ["store_cached_data", "get_cached_data", "head_cached_data", "cached_data"]
+__all__ = [
+    "DataStore",
+    "DEFAULT_HANDLE",
+    "estimate_size",
+    "get_store",
+    "use_store",
+    "store_cached_data",
+    "get_cached_data",
+    "get_dataframe",
+    "head_cached_data",
+    "list_cached_data",
+    "drop_cached_data",
+    "data_store_stats",
+    "cached_data",
+]
@@ -1,10 +1,23 @@
 import os
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from influxdb_client import InfluxDBClient
 from datetime import datetime, timezone
 from swarm import Agent
-from .common import MODEL_NAME_1
-from .data_store import store_cached_data
+from .common import model_for
+from .data_store import DEFAULT_HANDLE, estimate_size, get_dataframe, get_store, store_cached_data
+from .influx_client import get_client, query_slot
+from .columnar import read_columns, columns_to_frame
+from .query_cache import query_cache
+from .incremental import series_keys, series_max_times, delta_start, merge_delta
+from .line_protocol import encode_frame, encode_points, read_lines
+from .bulk_write import write_lines
+from .schema_catalog import schema_catalog
+from .dataset_cache import dataset_cache
+from . import flux
+from .metrics import instrument, record_cache_hit, record_conversion, record_query
 
 try:
     from config import (
@@ -21,30 +34,47 @@ except ImportError:  # pragma: no cover - fallback for runtime usage
     INFLUX_BUCKET = os.getenv("INFLUX_BUCKET", "")
     MEASUREMENT = os.getenv("MEASUREMENT", "")
 
+try:
+    from config import INCREMENTAL_OVERLAP
+except ImportError:  # pragma: no cover - fallback for runtime usage
+    INCREMENTAL_OVERLAP = os.getenv("INCREMENTAL_OVERLAP", "1m")
+
+try:
+    from config import SCHEMA_LOOKBACK
+except ImportError:  # pragma: no cover - fallback for runtime usage
+    SCHEMA_LOOKBACK = os.getenv("SCHEMA_LOOKBACK", "30d")
+
 
+def _client():
+    """Return the shared, pooled client for the configured InfluxDB server."""
+    return get_client(INFLUX_URL, INFLUX_TOKEN, INFLUX_ORG, client_cls=InfluxDBClient)
+
+
+@instrument
 def influx_list_buckets():
     """List all buckets in the InfluxDB instance."""
-    client = InfluxDBClient(
-        url=INFLUX_URL, token=INFLUX_TOKEN, org=INFLUX_ORG
-    )
-    buckets = client.buckets_api().find_buckets().buckets
-    return [b.name for b in buckets]
+    def load():
+        return [b.name for b in _client().buckets_api().find_buckets().buckets]
 
+    return schema_catalog.get(("buckets", None, None), load)
+
+
+def _schema_values(query: str) -> list:
+    result = _client().query_api().query(org=INFLUX_ORG, query=query)
+    return [record.get_value() for table in result for record in table.records]
 
+
+@instrument
 def influx_list_measurements():
     """List all measurements in the predetermined bucket."""
     query = f"""
 import \"influxdata/influxdb/schema\"
 schema.measurements(bucket: \"{INFLUX_BUCKET}\")
 """
-    client = InfluxDBClient(
-        url=INFLUX_URL, token=INFLUX_TOKEN, org=INFLUX_ORG
-    )
-    query_api = client.query_api()
-    result = query_api.query(org=INFLUX_ORG, query=query)
-    return [record.get_value() for table in result for record in table.records]
+    return schema_catalog.get(("measurements", INFLUX_BUCKET, None), lambda: _schema_values(query))
 
 
+@instrument
 def influx_list_fields(measurement: str | None = None):
     """List all field keys for a given measurement in the bucket."""
     measurement = measurement or MEASUREMENT
@@ -55,19 +85,85 @@ schema.fieldKeys(
   predicate: (r) => r._measurement == \"{measurement}\"
 )
 """
-    client = InfluxDBClient(
-        url=INFLUX_URL, token=INFLUX_TOKEN, org=INFLUX_ORG
+    return schema_catalog.get(("fields", INFLUX_BUCKET, measurement), lambda: _schema_values(query))
+
+
+@instrument
+def influx_list_tags(measurement: str | None = None):
+    """List the tag keys of a measurement in the bucket."""
+    measurement = measurement or MEASUREMENT
+    query = f"""
+import \"influxdata/influxdb/schema\"
+schema.tagKeys(
+  bucket: \"{INFLUX_BUCKET}\",
+  predicate: (r) => r._measurement == \"{measurement}\"
+)
+"""
+
+    def load():
+        return [key for key in _schema_values(query) if not key.startswith("_")]
+
+    return schema_catalog.get(("tags", INFLUX_BUCKET, measurement), load)
+
+
+_FIELD_TYPES = {bool: "boolean", int: "integer", float: "float", str: "string"}
+
+
+@instrument
+def influx_field_types(measurement: str | None = None):
+    """Return ``{field: type}`` for a measurement, from the latest point of each field
+    within ``SCHEMA_LOOKBACK``."""
+    measurement = measurement or MEASUREMENT
+    query = (
+        f'from(bucket: "{INFLUX_BUCKET}") |> range(start: -{SCHEMA_LOOKBACK}) '
+        f'|> filter(fn: (r) => r._measurement == "{measurement}") '
+        '|> group(columns: ["_field"]) |> last() |> keep(columns: ["_field", "_value"])'
     )
-    query_api = client.query_api()
-    result = query_api.query(org=INFLUX_ORG, query=query)
-    return [record.get_value() for table in result for record in table.records]
 
+    def load():
+        result = _client().query_api().query(org=INFLUX_ORG, query=query)
+        return [
+            (record.values.get("_field"), _FIELD_TYPES.get(type(record.get_value()), "unknown"))
+            for table in result for record in table.records
+        ]
+
+    return dict(schema_catalog.get(("field_types", INFLUX_BUCKET, measurement), load))
+
+
+def prefetch_schema(measurement: str | None = None) -> threading.Thread:
+    """Load measurements and the default measurement's fields and tags in the background."""
+    def load():
+        lookups = (influx_list_measurements, lambda: influx_list_fields(measurement),
+                   lambda: influx_list_tags(measurement))
+        for lookup in lookups:
+            try:
+                lookup()
+            except Exception:  # pragma: no cover - prefetching is best effort
+                pass
 
+    thread = threading.Thread(target=load, name="schema-prefetch", daemon=True)
+    thread.start()
+    return thread
 
 
+def _note_written(measurement: str | None, fields, tags=()) -> None:
+    """Invalidate schema entries that a write of ``fields``/``tags`` may have extended."""
+    if measurement is None:
+        schema_catalog.invalidate(INFLUX_BUCKET)
+        return
+    known = schema_catalog.peek(("measurements", INFLUX_BUCKET, None))
+    if known is not None and measurement not in known:
+        schema_catalog.invalidate(INFLUX_BUCKET, kinds=("measurements",))
+    known = schema_catalog.peek(("fields", INFLUX_BUCKET, measurement))
+    if known is not None and not set(fields) <= set(known):
+        schema_catalog.invalidate(INFLUX_BUCKET, measurement, kinds=("fields", "field_types"))
+    known = schema_catalog.peek(("tags", INFLUX_BUCKET, measurement))
+    if known is not None and not set(tags) <= set(known):
+        schema_catalog.invalidate(INFLUX_BUCKET, measurement, kinds=("tags",))
 
-def influx_query(flux_query: str, measurement: str | None = None):
-    """Execute an arbitrary Flux query against the bucket and measurement."""
+
+def _prepare_query(flux_query: str, measurement: str | None = None) -> str:
+    """Inject the configured bucket and measurement into ``flux_query``."""
     measurement = measurement or MEASUREMENT
     if "from(bucket:" not in flux_query:
         cleaned = flux_query.lstrip()
@@ -98,28 +194,273 @@ def influx_query(flux_query: str, measurement: str | None = None):
             count=1,
         )
 
-    client = InfluxDBClient(
-        url=INFLUX_URL, token=INFLUX_TOKEN, org=INFLUX_ORG
+    return flux_query
+
+
+# Annotation columns that carry no data once fields are pivoted into columns.
+_WIDE_DROPPED = ("result", "table")
+
+
+def _fetch(flux_query: str, output: str):
+    """Send ``flux_query`` to the server and decode the result.
+
+    Results of pivoted queries have no ``_value``: records are returned as is
+    and the ``result``/``table`` annotation columns are dropped.
+    """
+    wide = flux.is_wide(flux_query)
+    query_api = _client().query_api()
+    with query_slot():
+        if output != "records":
+            columns = read_columns(query_api.query_csv(flux_query, org=INFLUX_ORG))
+            if wide:
+                for name in _WIDE_DROPPED:
+                    columns.pop(name, None)
+            return columns
+        result = query_api.query(org=INFLUX_ORG, query=flux_query)
+        if wide:
+            return [
+                {k: v for k, v in record.values.items() if k not in _WIDE_DROPPED}
+                for table in result for record in table.records
+            ]
+        return [
+            {**record.values, "value": record.get_value(), "time": record.get_time()}
+            for table in result for record in table.records
+        ]
+
+
+def _merge_parts(parts: list, output: str):
+    """Concatenate sub-range results in the order of the unsplit query: by series, then time."""
+    if output == "records":
+        first, keyed = {}, []
+        for record in (record for part in parts for record in part):
+            series = tuple((k, v) for k, v in record.items() if k != "result" and isinstance(v, str))
+            keyed.append((first.setdefault(series, len(first)), record))
+        keyed.sort(key=lambda item: (item[0], item[1].get("_time") is None, item[1].get("_time")))
+        return [record for _, record in keyed]
+    import numpy as np
+    import pandas as pd
+    from pandas.api.types import union_categoricals
+
+    parts = [part for part in parts if part]
+    names = list(dict.fromkeys(name for part in parts for name in part))
+    merged = {}
+    for name in names:
+        pieces = [part.get(name) for part in parts]
+        if any(piece is None for piece in pieces):
+            frame = pd.concat([pd.DataFrame(part) for part in parts], ignore_index=True)
+            return _in_series_order({
+                column: values.array if isinstance(values.dtype, pd.CategoricalDtype) else values.to_numpy()
+                for column, values in frame.items()
+            })
+        if isinstance(pieces[0], pd.Categorical):
+            merged[name] = union_categoricals(pieces)
+        else:
+            merged[name] = np.concatenate(pieces)
+    return _in_series_order(merged)
+
+
+def _in_series_order(columns: dict) -> dict:
+    """Reorder merged columns by series (in order of appearance), then ``_time``."""
+    import pandas as pd
+
+    frame = pd.DataFrame(columns, copy=False)
+    keys = series_keys(frame)
+    by = (["_series"] if keys else []) + (["_time"] if "_time" in frame.columns else [])
+    if frame.empty or not by:
+        return columns
+    if keys:
+        frame = frame.assign(_series=frame.groupby(keys, observed=True, sort=False, dropna=False).ngroup())
+    order = frame.sort_values(by, kind="stable").index.to_numpy()
+    return {name: values[order] for name, values in columns.items()}
+
+
+def _run_query(flux_query: str, output: str = "records", use_cache: bool = True, parallel: int = 1):
+    """Run an already prepared Flux query and return its result in ``output`` shape.
+
+    With ``parallel`` > 1 a splittable query is divided into that many
+    sub-ranges which run concurrently, bounded by the shared query slots.
+    """
+    if output not in ("records", "columns", "dataframe"):
+        raise ValueError(f"Unsupported output: {output}")
+    key = query_cache.key(flux_query, INFLUX_URL, INFLUX_ORG, output)
+    if use_cache:
+        cached = query_cache.get(key)
+        if cached is not None:
+            record_cache_hit()
+            return cached
+    fetch_output = "records" if output == "records" else "columns"
+    queries = flux.split_range(flux_query, parallel) if parallel > 1 and flux.can_split(flux_query) else [flux_query]
+    started = time.perf_counter()
+    if len(queries) == 1:
+        data = _fetch(flux_query, fetch_output)
+    else:
+        with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+            data = _merge_parts(list(pool.map(lambda q: _fetch(q, fetch_output), queries)), fetch_output)
+    rows = len(data) if fetch_output == "records" else len(next(iter(data.values()), ()))
+    record_query(time.perf_counter() - started, rows, estimate_size(data), output, parts=len(queries))
+    if output == "dataframe":
+        started = time.perf_counter()
+        data = columns_to_frame(data)
+        record_conversion(time.perf_counter() - started, rows)
+    query_cache.put(key, flux_query, data)
+    return data
+
+
+def _downsampled(flux_query: str, max_points: int | None, plot_width: int | None, fn: str):
+    """Apply the downsampling stage when a point budget or plot width is given."""
+    budget = max_points or plot_width
+    if not budget:
+        return flux_query, None
+    return flux.downsample(flux_query, budget, fn)
+
+
+def _shaped(flux_query: str, shape: str) -> str:
+    """Apply the ``shape`` option (``"long"`` or ``"wide"``) to a prepared query."""
+    if shape == "long":
+        return flux_query
+    if shape == "wide":
+        return flux.pivot_fields(flux_query)
+    raise ValueError(f"Unsupported shape: {shape}")
+
+
+@instrument
+def influx_query(
+    flux_query: str,
+    measurement: str | None = None,
+    output: str = "records",
+    use_cache: bool = True,
+    max_points: int | None = None,
+    plot_width: int | None = None,
+    fn: str = "mean",
+    parallel: int = 1,
+    shape: str = "long",
+):
+    """Execute an arbitrary Flux query against the bucket and measurement.
+
+    ``output`` selects the result shape: ``"records"`` returns a list of
+    dicts, ``"columns"`` streams the result into a dict of typed column
+    arrays and ``"dataframe"`` wraps those columns in a DataFrame. Results
+    are served from the query cache unless ``use_cache`` is false.
+
+    Given ``max_points`` (or the ``plot_width`` in pixels) the query is
+    downsampled on the server with ``aggregateWindow(fn: fn)`` unless it
+    already aggregates; the result is then returned as
+    ``{"downsampling": ..., "result": ...}`` describing the chosen window.
+
+    ``parallel`` > 1 splits the query's ``range()`` into that many sub-ranges
+    that run concurrently; their results are concatenated in time order.
+
+    ``shape="wide"`` pivots the fields into columns on the server, returning
+    one row per timestamp and series instead of one row per field, without
+    the ``_start``/``_stop``/``result``/``table`` columns.
+    """
+    flux_query = _prepare_query(flux_query, measurement)
+    flux_query, downsampling = _downsampled(flux_query, max_points, plot_width, fn)
+    flux_query = _shaped(flux_query, shape)
+    data = _run_query(flux_query, output, use_cache, parallel)
+    if downsampling is None:
+        return data
+    return {"downsampling": downsampling, "result": data}
+
+
+@instrument
+def influx_query_store(
+    flux_query: str,
+    measurement: str | None = None,
+    handle: str | None = None,
+    incremental: bool = False,
+    overlap: str | None = None,
+    max_points: int | None = None,
+    plot_width: int | None = None,
+    fn: str = "mean",
+    parallel: int = 1,
+    shape: str = "long",
+    persist: bool = False,
+):
+    """Run a query and store the result in the data store under ``handle``.
+
+    With ``incremental`` a dataset stored earlier under ``handle`` by the same
+    query is refreshed by fetching only the rows newer than the latest cached
+    point of each series (reaching back ``overlap`` for late-arriving points),
+    appending them and trimming rows that fell out of a relative window.
+    ``max_points``, ``plot_width``, ``fn``, ``parallel`` and ``shape`` work as
+    in ``influx_query``.
+
+    With ``persist`` the dataset is also written to the on-disk dataset
+    cache. A later call with the same query reloads it from there: a range
+    in the past is used as is, a relative range is refreshed incrementally.
+    """
+    prepared = _prepare_query(flux_query, measurement)
+    prepared, downsampling = _downsampled(prepared, max_points, plot_width, fn)
+    prepared = _shaped(prepared, shape)
+    restored = None
+    if persist and get_store().meta(handle or DEFAULT_HANDLE).get("query") != flux.normalize(prepared):
+        restored = _restore_dataset(prepared, handle or DEFAULT_HANDLE)
+    if restored is not None and not flux.query_range(prepared)[2]:
+        status = restored
+    elif incremental or restored is not None:
+        status = _refresh_dataset(prepared, handle or DEFAULT_HANDLE, overlap or INCREMENTAL_OVERLAP)
+    else:
+        data = _run_query(prepared, parallel=parallel)
+        status = store_cached_data(data, handle, meta={"query": flux.normalize(prepared)})
+    if persist and status.get("mode") != "disk":
+        handle = handle or DEFAULT_HANDLE
+        status = {**status, "persisted": dataset_cache.save(prepared, get_dataframe(handle), get_store().meta(handle))}
+    if downsampling is not None:
+        status = {**status, "downsampling": downsampling}
+    return status
+
+
+def _restore_dataset(prepared: str, handle: str) -> dict | None:
+    """Load the persisted copy of ``prepared`` into the store under ``handle``."""
+    loaded = dataset_cache.load(prepared)
+    if loaded is None:
+        return None
+    frame, info = loaded
+    # The file holds the compact frame, so the memory-mapped columns are kept as they are.
+    status = store_cached_data(
+        frame,
+        handle,
+        meta={"query": info["query"], "series_max_time": series_max_times(frame, series_keys(frame))},
+        compact=False,
     )
-    query_api = client.query_api()
-    result = query_api.query(org=INFLUX_ORG, query=flux_query)
-    return [
-        {**record.values, "value": record.get_value(), "time": record.get_time()}
-        for table in result for record in table.records
-    ]
+    return {**status, "mode": "disk", "new_rows": 0, "trimmed_rows": 0}
 
 
-def influx_query_store(flux_query: str, measurement: str | None = None):
-    """Run a query and store the result in the global cache."""
-    data = influx_query(flux_query, measurement)
-    return store_cached_data(data)
+def _refresh_dataset(prepared: str, handle: str, overlap: str) -> dict:
+    """Fetch the delta for the dataset under ``handle`` and merge it in."""
+    store = get_store()
+    normalized = flux.normalize(prepared)
+    meta = store.meta(handle)
+    start, _, relative = flux.query_range(prepared)
+    cached = None
+    if relative and meta.get("query") == normalized and meta.get("series_max_time"):
+        cached = store.frame(handle)
 
+    if cached is None:
+        frame = _run_query(prepared, "dataframe", use_cache=False)
+        mode, added, trimmed = "full", len(frame), 0
+    else:
+        since = delta_start(meta["series_max_time"], abs(flux.parse_duration(overlap)))
+        stop = flux.find_range(prepared).group("stop")
+        delta_query = flux.replace_range(prepared, flux.format_time(since), stop)
+        delta = _run_query(delta_query, "dataframe", use_cache=False)
+        frame, added, trimmed = merge_delta(cached, delta, series_keys(cached), start)
+        mode = "incremental"
+
+    status = store_cached_data(
+        frame,
+        handle,
+        meta={"query": normalized, "series_max_time": series_max_times(frame, series_keys(frame))},
+    )
+    return {**status, "mode": mode, "new_rows": added, "trimmed_rows": trimmed}
+
+
+@instrument
 def influx_write_point(fields: dict, measurement: str | None = None, tags: dict | None = None, time=None):
     """Write a single point to the bucket."""
     measurement = measurement or MEASUREMENT
-    client = InfluxDBClient(
-        url=INFLUX_URL, token=INFLUX_TOKEN, org=INFLUX_ORG
-    )
+    client = _client()
     write_api = client.write_api()
     point = {
         "measurement": measurement,
@@ -128,43 +469,127 @@ def influx_write_point(fields: dict, measurement: str | None = None, tags: dict
         "time": time,
     }
     write_api.write(bucket=INFLUX_BUCKET, org=INFLUX_ORG, record=point)
+    point_time = flux.time_to_ns(time)
+    query_cache.invalidate(INFLUX_BUCKET, point_time, point_time)
+    _note_written(measurement, fields, tags or {})
     return {"status": "success", "point": point}
 
 
+@instrument
+def influx_write_points(
+    points: list | None = None,
+    handle: str | None = None,
+    path: str | None = None,
+    measurement: str | None = None,
+    tag_columns: list | None = None,
+):
+    """Write many points at once in batched, gzip-compressed requests.
+
+    Provide exactly one source: ``points`` (dicts shaped like the arguments of
+    ``influx_write_point``), the ``handle`` of a stored dataset or the ``path``
+    of a line-protocol file. Returns points/sec and the rejected lines.
+    """
+    if sum(source is not None for source in (points, handle, path)) != 1:
+        raise ValueError("Provide exactly one of points, handle or path.")
+    measurement = measurement or MEASUREMENT
+    if points is not None:
+        lines, rejected = encode_points(points, measurement)
+    elif handle is not None:
+        df = get_dataframe(handle)
+        if df is None:
+            raise ValueError(f"No dataset stored under handle '{handle}'.")
+        if "_measurement" in df.columns:
+            measurement = None
+        lines, rejected = encode_frame(df, measurement=measurement, tag_columns=tag_columns)
+    else:
+        lines, rejected = read_lines(path)
+
+    report = {"points": 0, "batches": 0, "retries": 0, "server_rejected": 0, "errors": []}
+    if lines:
+        report = write_lines(_client(), INFLUX_BUCKET, INFLUX_ORG, lines)
+        query_cache.invalidate(INFLUX_BUCKET)
+        schema_catalog.invalidate(INFLUX_BUCKET)
+    return {
+        "status": "written",
+        **report,
+        "rejected": len(rejected) + report["server_rejected"],
+        "rejected_samples": [str(r) for r in rejected[:5]],
+    }
+
+
+@instrument
 def influx_delete_data(start: str, stop: str, predicate: str = ""):
     """Delete data in a time range with optional predicate."""
-    client = InfluxDBClient(
-        url=INFLUX_URL, token=INFLUX_TOKEN, org=INFLUX_ORG
-    )
+    client = _client()
     delete_api = client.delete_api()
     delete_api.delete(start, stop, predicate, bucket=INFLUX_BUCKET, org=INFLUX_ORG)
+    query_cache.invalidate(INFLUX_BUCKET, flux.resolve_time(start), flux.resolve_time(stop))
+    schema_catalog.invalidate(INFLUX_BUCKET)
     return {"status": "deleted", "start": start, "stop": stop, "predicate": predicate}
 
 
+@instrument
 def get_current_time() -> str:
     """Return the current UTC time in ISO 8601 format."""
     return datetime.now(timezone.utc).isoformat()
 
 
-influxDB_agent = Agent(
-    name="InfluxDB Management Agent",
-    instructions=(
+def _schema_summary() -> str:
+    """Describe the schema already in the catalog, without querying the server."""
+    measurements = schema_catalog.peek(("measurements", INFLUX_BUCKET, None))
+    fields = schema_catalog.peek(("fields", INFLUX_BUCKET, MEASUREMENT))
+    tags = schema_catalog.peek(("tags", INFLUX_BUCKET, MEASUREMENT))
+    parts = []
+    if measurements:
+        parts.append(f"Known measurements: {', '.join(measurements[:50])}. ")
+    if fields:
+        parts.append(f"Fields of {MEASUREMENT}: {', '.join(fields[:100])}. ")
+    if tags:
+        parts.append(f"Tags of {MEASUREMENT}: {', '.join(tags[:50])}. ")
+    return "".join(parts)
+
+
+def influx_instructions(context_variables: dict | None = None) -> str:
+    """Build the agent instructions, including any schema already catalogued."""
+    return (
         "You are an IT specialist agent capable of managing and querying an InfluxDB database. "
         f"The server runs at {INFLUX_URL} with organisation {INFLUX_ORG}, bucket {INFLUX_BUCKET} "
         f"and default measurement {MEASUREMENT}. "
         "Authenticate using the token stored in the INFLUX_TOKEN environment variable. "
-        "You can list buckets, measurements, fields, execute arbitrary Flux queries, write points, delete data, "
-        "cache query results for other agents using influx_query_store, and provide the current UTC time."
-    ),
+        "You can list buckets, measurements, fields, tags and field types, execute arbitrary Flux queries, "
+        "write points, delete data, "
+        "bulk-write many points, a stored dataset or a line-protocol file with influx_write_points, "
+        "cache query results for other agents using influx_query_store, and provide the current UTC time. "
+        "Pass a handle name to influx_query_store to keep several datasets side by side, and set "
+        "incremental=True to refresh a stored dataset by fetching only the newly arrived rows. "
+        "Set persist=True for history that will be needed again in later sessions; it is then "
+        "reloaded from disk instead of being downloaded again. "
+        "For long ranges or data meant for plotting pass max_points (or plot_width) so the server "
+        "downsamples with aggregateWindow; the response reports the chosen window, explain it to the user. "
+        "Pass shape=\"wide\" to get one row per timestamp with a column per field, which is smaller "
+        "and usually what analysis needs. "
+        "Large results come back as a summary (row count, time span, per-field statistics and sample "
+        "rows) with the handle of the full data in the data store; hand that handle to the data "
+        "specialist instead of querying again. "
+        + _schema_summary()
+    )
+
+
+influxDB_agent = Agent(
+    name="InfluxDB Management Agent",
+    instructions=influx_instructions,
     functions=[
         influx_list_buckets,
         influx_list_measurements,
         influx_list_fields,
+        influx_list_tags,
+        influx_field_types,
         influx_query,
         influx_query_store,
         influx_write_point,
+        influx_write_points,
         influx_delete_data,
         get_current_time,
     ],
-    model=MODEL_NAME_1,
+    model=model_for("database"),
 )
@@ -0,0 +1,135 @@
+"""On-disk cache of stored datasets in the Arrow IPC file format.
+
+``influx_query_store(..., persist=True)`` writes the dataset to
+``DATASET_CACHE_DIR`` so that a later session can reload it instead of
+downloading the same history again. Files are named after the normalized
+query and carry the query, its time range and the origin metadata in the
+Arrow schema metadata. They are written uncompressed so they can be memory
+mapped back without copying the column buffers. The directory is kept under
+``DATASET_CACHE_MAX_BYTES`` by deleting the least recently used files.
+
+Nothing is read at import or startup; ``pyarrow`` is imported on first use.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from . import flux
+
+try:
+    from config import DATASET_CACHE_DIR, DATASET_CACHE_MAX_BYTES
+except ImportError:  # pragma: no cover - fallback for runtime usage
+    DATASET_CACHE_DIR = os.getenv("DATASET_CACHE_DIR", ".dataset_cache")
+    DATASET_CACHE_MAX_BYTES = int(os.getenv("DATASET_CACHE_MAX_BYTES", str(2 * 1024**3)))
+
+_META_KEY = b"agents.dataset"
+_SUFFIX = ".arrow"
+
+
+def _arrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("Persisting datasets requires pyarrow (pip install pyarrow).") from exc
+    return pyarrow
+
+
+class DatasetCache:
+    """Size-capped directory of Arrow IPC files keyed by normalized query."""
+
+    def __init__(self, directory: str = DATASET_CACHE_DIR, max_bytes: int = DATASET_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def path_for(self, query: str) -> str:
+        digest = hashlib.sha256(flux.normalize(query).encode()).hexdigest()[:24]
+        return os.path.join(self.directory, digest + _SUFFIX)
+
+    def save(self, query: str, frame, meta: dict | None = None) -> dict:
+        """Write ``frame`` for ``query`` and trim the directory to its byte cap."""
+        pa = _arrow()
+        normalized = flux.normalize(query)
+        start, stop, relative = flux.query_range(normalized)
+        info = {
+            "query": normalized,
+            "start": start,
+            "stop": None if relative else stop,
+            "rows": len(frame),
+            "meta": {k: v for k, v in (meta or {}).items() if _is_json(v)},
+        }
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), _META_KEY: json.dumps(info)})
+        path = self.path_for(normalized)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, path)
+            self._trim(keep=path)
+        return {"path": path, "bytes": os.path.getsize(path)}
+
+    def load(self, query: str):
+        """Return ``(frame, info)`` for ``query`` memory mapped from disk, or ``None``."""
+        path = self.path_for(query)
+        if not os.path.exists(path):
+            return None
+        pa = _arrow()
+        try:
+            table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        except (OSError, pa.ArrowInvalid):
+            return None
+        info = json.loads((table.schema.metadata or {}).get(_META_KEY, b"{}"))
+        if info.get("query") != flux.normalize(query):
+            return None
+        os.utime(path)  # marks the file as recently used
+        frame = table.to_pandas(split_blocks=True)
+        return frame, info
+
+    def entries(self) -> list:
+        """Return path, size and last use of every cached file, least recent first."""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append({"path": path, "bytes": stat.st_size, "used": stat.st_mtime})
+        return sorted(entries, key=lambda e: e["used"])
+
+    def _trim(self, keep: str) -> None:
+        entries = self.entries()
+        total = sum(e["bytes"] for e in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry["path"] == keep:
+                continue
+            try:
+                os.remove(entry["path"])
+            except FileNotFoundError:
+                pass
+            total -= entry["bytes"]
+
+
+def _is_json(value) -> bool:
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+dataset_cache = DatasetCache()
+
+
+__all__ = ["DatasetCache", "dataset_cache"]
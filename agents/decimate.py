@@ -0,0 +1,85 @@
+"""Shape-preserving decimation of dense series before plotting.
+
+Both methods return sorted row indices so that any set of columns can be
+selected from the original data. Rendering more points than the output has
+pixels only costs time, so plots are reduced to roughly one point (LTTB) or
+one min/max pair per horizontal pixel.
+"""
+
+import numpy as np
+
+
+def _as_float(values) -> np.ndarray:
+    values = np.asarray(values)
+    if values.dtype.kind == "M":
+        return values.astype("datetime64[ns]").view("int64").astype(np.float64)
+    return values.astype(np.float64, copy=False)
+
+
+def lttb(x, y, threshold: int) -> np.ndarray:
+    """Return the indices chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the previously
+    selected point and the average of the next bucket.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y = _as_float(y)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    # Mean of every bucket, used as the third triangle vertex.
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])[1:]
+    avg_y = np.append(sums_y / counts, y[-1])[1:]
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx = x[lo:hi]
+        by = y[lo:hi]
+        area = np.abs((x[a] - avg_x[i]) * (by - y[a]) - (x[a] - bx) * (avg_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax(y, buckets: int) -> np.ndarray:
+    """Return the indices of the minimum and maximum of each of ``buckets`` buckets."""
+    n = len(y)
+    if buckets * 2 >= n or buckets < 1:
+        return np.arange(n)
+    y = _as_float(y)
+    starts = (np.arange(buckets, dtype=np.int64) * n) // buckets
+    counts = np.diff(np.append(starts, n))
+    index = np.arange(n)
+    lows = np.repeat(np.minimum.reduceat(y, starts), counts)
+    highs = np.repeat(np.maximum.reduceat(y, starts), counts)
+    argmin = np.minimum.reduceat(np.where(y == lows, index, n), starts)
+    argmax = np.minimum.reduceat(np.where(y == highs, index, n), starts)
+    picked = np.concatenate(([0], argmin, argmax, [n - 1]))
+    return np.unique(picked[picked < n])
+
+
+def decimate(x, y, max_points: int, method: str = "lttb") -> np.ndarray:
+    """Return the indices to plot for ``method`` (``"lttb"``, ``"minmax"`` or ``"none"``)."""
+    y_values = np.asarray(y)
+    valid = np.flatnonzero(~np.isnan(_as_float(y_values)))
+    if method == "none" or len(valid) <= max_points:
+        return valid
+    if method == "lttb":
+        picked = lttb(np.asarray(x)[valid], y_values[valid], max_points)
+    elif method == "minmax":
+        picked = minmax(y_values[valid], max(max_points // 2, 1))
+    else:
+        raise ValueError(f"Unsupported decimation method: {method}")
+    return valid[picked]
+
+
+__all__ = ["lttb", "minmax", "decimate"]
@@ -0,0 +1,234 @@
+"""Compile ``filter_data`` conditions into one NumPy mask and Flux predicates.
+
+Conditions are written like pandas query expressions (``"num >= 7"``,
+``"host == 'a' and _value > 3"``, ``"2 < x <= 5"``, ``"host in ['a', 'b']"``).
+They are parsed once into simple ``column op value`` comparisons that are
+evaluated directly on the column arrays and combined into a single boolean
+mask, so no intermediate frames are built. Categorical columns are compared
+by their integer codes. Expressions outside that grammar fall back to
+``DataFrame.eval`` and are still and-ed into the same mask.
+
+For datasets stored from a Flux query, comparisons on the time column, tag
+equality and ``_value`` thresholds can be translated back into the query so
+the server returns only the matching rows.
+"""
+
+import ast
+import operator
+
+import numpy as np
+import pandas as pd
+
+from . import flux
+
+_OPS = {
+    ast.Eq: "==",
+    ast.NotEq: "!=",
+    ast.Lt: "<",
+    ast.LtE: "<=",
+    ast.Gt: ">",
+    ast.GtE: ">=",
+    ast.In: "in",
+    ast.NotIn: "not in",
+}
+_MIRROR = {"<": ">", "<=": ">=", ">": "<", ">=": "<=", "==": "==", "!=": "!="}
+_COMPARE = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+_TIME_COLUMNS = ("_time", "time")
+_VALUE_COLUMNS = ("_value", "value")
+# Columns added by Flux that never carry a tag value.
+_NON_TAG_COLUMNS = {"result", "table", "_start", "_stop", *_TIME_COLUMNS, *_VALUE_COLUMNS}
+
+
+class Condition:
+    """A single comparison, or an arbitrary expression when ``op`` is ``"eval"``."""
+
+    __slots__ = ("column", "op", "value")
+
+    def __init__(self, column: str | None, op: str, value):
+        self.column = column
+        self.op = op
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f"Condition({self.column!r}, {self.op!r}, {self.value!r})"
+
+
+def _parse(node, conditions: list) -> bool:
+    """Append the comparisons of ``node`` to ``conditions``; return ``False`` if unsupported."""
+    if isinstance(node, ast.BoolOp) and isinstance(node.op, ast.And):
+        return all(_parse(value, conditions) for value in node.values)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitAnd):
+        return _parse(node.left, conditions) and _parse(node.right, conditions)
+    if not isinstance(node, ast.Compare):
+        return False
+    operands = [node.left, *node.comparators]
+    for left, op, right in zip(operands, node.ops, operands[1:]):
+        op = _OPS.get(type(op))
+        if op is None:
+            return False
+        try:
+            if isinstance(left, ast.Name):
+                conditions.append(Condition(left.id, op, ast.literal_eval(right)))
+            elif isinstance(right, ast.Name) and op in _MIRROR:
+                conditions.append(Condition(right.id, _MIRROR[op], ast.literal_eval(left)))
+            else:
+                return False
+        except ValueError:
+            return False
+    return True
+
+
+def compile_filters(filters) -> list:
+    """Parse ``filters`` (a mapping of field to condition, or a list of conditions).
+
+    Non-string conditions are shorthand: a list means ``field in [...]`` and
+    any other value means ``field == value``.
+    """
+    items = filters.items() if isinstance(filters, dict) else ((None, f) for f in filters)
+    conditions = []
+    for field, condition in items:
+        if not isinstance(condition, str):
+            op = "in" if isinstance(condition, (list, tuple, set)) else "=="
+            conditions.append(Condition(field, op, list(condition) if op == "in" else condition))
+            continue
+        parsed = []
+        try:
+            tree = ast.parse(condition.strip(), mode="eval").body
+            supported = _parse(tree, parsed)
+        except SyntaxError:
+            supported = False
+        conditions.extend(parsed if supported else [Condition(None, "eval", condition)])
+    return conditions
+
+
+def _utc(value) -> pd.Timestamp:
+    """Return ``value`` as a UTC timestamp; naive times are taken as UTC."""
+    stamp = pd.Timestamp(value)
+    return stamp.tz_localize("UTC") if stamp.tzinfo is None else stamp.tz_convert("UTC")
+
+
+def _time_value(value) -> np.datetime64:
+    return _utc(value).tz_localize(None).to_datetime64()
+
+
+def _mask(df: pd.DataFrame, condition: Condition) -> np.ndarray:
+    if condition.op == "eval":
+        return np.asarray(df.eval(condition.value), dtype=bool)
+    if condition.column not in df.columns:
+        raise ValueError(f"Unknown column in filter: {condition.column}")
+    values = df[condition.column]
+    op, target = condition.op, condition.value
+    members = op in ("in", "not in")
+    if isinstance(values.dtype, pd.CategoricalDtype) and (members or op in ("==", "!=")):
+        targets = list(target) if members else [target]
+        wanted = np.flatnonzero(values.cat.categories.isin(targets))
+        mask = np.isin(values.cat.codes.to_numpy(), wanted)
+        return ~mask if op in ("!=", "not in") else mask
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        if values.dt.tz is not None:
+            values = values.dt.tz_convert("UTC").dt.tz_localize(None)
+        array = values.to_numpy()
+        target = [_time_value(t) for t in target] if members else _time_value(target)
+    else:
+        array = values.to_numpy()
+    if members:
+        mask = np.isin(array, list(target))
+        return ~mask if op == "not in" else mask
+    return np.asarray(_COMPARE[op](array, target), dtype=bool)
+
+
+def apply_filters(df: pd.DataFrame, conditions: list) -> pd.DataFrame:
+    """Return the rows of ``df`` matching every condition, selected with one mask."""
+    if not conditions:
+        return df
+    mask = np.logical_and.reduce([_mask(df, condition) for condition in conditions])
+    if mask.all():
+        return df
+    return df.iloc[np.flatnonzero(mask)].reset_index(drop=True)
+
+
+def _flux_literal(value) -> str | None:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)) and np.isfinite(value):
+        return repr(value)
+    if isinstance(value, str):
+        return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return None
+
+
+def _tag_predicate(condition: Condition) -> str | None:
+    column = f'r["{condition.column}"]'
+    if condition.op in ("==", "!="):
+        if not isinstance(condition.value, str):
+            return None
+        return f"{column} {condition.op} {_flux_literal(condition.value)}"
+    if condition.op in ("in", "not in") and condition.value and all(isinstance(v, str) for v in condition.value):
+        op, joiner = ("==", " or ") if condition.op == "in" else ("!=", " and ")
+        return "(" + joiner.join(f"{column} {op} {_flux_literal(v)}" for v in condition.value) + ")"
+    return None
+
+
+def pushdown(query: str, conditions: list, df: pd.DataFrame, now: int | None = None) -> tuple:
+    """Fold eligible ``conditions`` into ``query``.
+
+    Time comparisons narrow ``range()``, equality on string (tag) columns and
+    thresholds on ``_value`` become a ``filter()`` after the existing
+    range/filter stages. Time and value comparisons are only pushed when the
+    query does not aggregate, since they would change its windows, and
+    pivoted queries are left alone because their columns no longer map to
+    tags. Returns ``(query, pushed)`` where ``pushed`` lists
+    the conditions the new query already applies.
+    """
+    if flux.is_wide(query):
+        return query, []
+    start, stop, _ = flux.query_range(query, now)
+    if start is None:
+        return query, []
+    stop = stop if stop is not None else (now if now is not None else flux.now_ns())
+    aggregated = flux.aggregates(query)
+    predicates, pushed = [], []
+    new_start, new_stop = start, stop
+    for condition in conditions:
+        column, op, value = condition.column, condition.op, condition.value
+        if column in _TIME_COLUMNS and op in ("<", "<=", ">", ">=") and not aggregated:
+            try:
+                ns = _utc(value).value
+            except (TypeError, ValueError):
+                continue
+            if op in (">", ">="):
+                new_start = max(new_start, ns + (op == ">"))
+            else:
+                new_stop = min(new_stop, ns + (op == "<="))
+            pushed.append(condition)
+        elif column in _VALUE_COLUMNS and op in _COMPARE and not aggregated:
+            literal = _flux_literal(value)
+            if literal is not None and not isinstance(value, (str, bool)):
+                predicates.append(f"r._value {op} {literal}")
+                pushed.append(condition)
+        elif (
+            column is not None and column in df.columns and column not in _NON_TAG_COLUMNS
+            and not pd.api.types.is_numeric_dtype(df[column].dtype)
+            and not pd.api.types.is_datetime64_any_dtype(df[column].dtype)
+        ):
+            predicate = _tag_predicate(condition)
+            if predicate is not None:
+                predicates.append(predicate)
+                pushed.append(condition)
+    if (new_start, new_stop) != (start, stop):
+        if new_stop <= new_start:
+            new_stop = new_start + 1
+        query = flux.replace_range(query, flux.format_time(new_start), flux.format_time(new_stop))
+    if predicates:
+        query = flux.insert_after_filters(query, f"filter(fn: (r) => {' and '.join(predicates)})")
+    return query, pushed
+
+
+__all__ = ["Condition", "compile_filters", "apply_filters", "pushdown"]
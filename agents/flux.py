@@ -0,0 +1,387 @@
+"""Small helpers for inspecting and rewriting Flux query text."""
+
+import math
+import re
+import time
+from datetime import datetime, timezone
+
+_NS = {
+    "ns": 1,
+    "us": 10**3,
+    "µs": 10**3,
+    "ms": 10**6,
+    "s": 10**9,
+    "m": 60 * 10**9,
+    "h": 3600 * 10**9,
+    "d": 86400 * 10**9,
+    "w": 7 * 86400 * 10**9,
+    "mo": 30 * 86400 * 10**9,
+    "y": 365 * 86400 * 10**9,
+}
+
+_DURATION_PART = re.compile(r"(\d+)(ns|us|µs|ms|mo|s|m|h|d|w|y)")
+_DURATION = re.compile(r"^-?(?:\d+(?:ns|us|µs|ms|mo|s|m|h|d|w|y))+$")
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"')
+_RANGE_CALL = re.compile(r"\brange\s*\(")
+_RFC3339 = re.compile(
+    r"^(?P<base>\d{4}-\d\d-\d\d(?:T\d\d:\d\d(?::\d\d)?)?)(?:\.(?P<frac>\d+))?(?P<tz>Z|[+-]\d\d:\d\d)?$"
+)
+_BUCKET = re.compile(r'from\(\s*bucket\s*:\s*"([^"]*)"\s*\)')
+_AGGREGATE = re.compile(
+    r"\|>\s*(?:aggregateWindow|window|mean|median|sum|count|min|max|first|last|spread|stddev|"
+    r"quantile|integral|histogram|reduce|distinct|unique|sample|movingAverage|timedMovingAverage)\s*\("
+)
+_STAGE = re.compile(r"\|>\s*(range|filter)\s*\(")
+_PIPE_CALL = re.compile(r"\|>\s*([\w.]+)\s*\(")
+_WIDE = re.compile(r"\|>\s*(?:pivot|schema\.fieldsAsCols|fieldsAsCols)\s*\(")
+_FROM = re.compile(r"\bfrom\s*\(")
+_COMBINE = re.compile(r"\b(?:join|union)\b[\w.]*\s*\(")
+_EVERY = re.compile(r"aggregateWindow\(\s*every\s*:\s*([^,)\s]+)")
+# Stages whose output for a time range is the union of their output for its parts.
+_SPLITTABLE_STAGES = {
+    "range", "filter", "map", "keep", "drop", "rename", "pivot", "group", "yield",
+    "aggregateWindow", "schema.fieldsAsCols", "fieldsAsCols", "set", "duplicate",
+    "toFloat", "toInt", "toUInt", "toString", "toBool",
+}
+
+DOWNSAMPLE_FUNCTIONS = ("mean", "median", "min", "max", "first", "last", "sum", "count")
+
+_S = 10**9
+_NICE_WINDOWS = [
+    10**6, 10 * 10**6, 100 * 10**6,
+    _S, 2 * _S, 5 * _S, 10 * _S, 15 * _S, 30 * _S,
+    60 * _S, 2 * 60 * _S, 5 * 60 * _S, 10 * 60 * _S, 15 * 60 * _S, 30 * 60 * _S,
+    3600 * _S, 2 * 3600 * _S, 3 * 3600 * _S, 6 * 3600 * _S, 12 * 3600 * _S,
+    86400 * _S, 2 * 86400 * _S, 7 * 86400 * _S, 30 * 86400 * _S,
+]
+
+
+def normalize(query: str) -> str:
+    """Collapse whitespace outside string literals so equivalent queries compare equal."""
+    def squeeze(code: str) -> str:
+        code = re.sub(r"\s+", " ", code)
+        return re.sub(r" ?([(),:|>=]) ?", r"\1", code)
+
+    parts = []
+    last = 0
+    for match in _STRING.finditer(query):
+        parts.append(squeeze(query[last:match.start()]))
+        parts.append(match.group(0))
+        last = match.end()
+    parts.append(squeeze(query[last:]))
+    return "".join(parts).strip()
+
+
+def is_duration(text: str) -> bool:
+    """Return whether ``text`` is a Flux duration literal such as ``-1h30m``."""
+    return bool(_DURATION.match(text.strip()))
+
+
+def parse_duration(text: str) -> int:
+    """Return the Flux duration ``text`` in nanoseconds (negative for ``-1h``)."""
+    text = text.strip()
+    total = sum(int(n) * _NS[unit] for n, unit in _DURATION_PART.findall(text))
+    return -total if text.startswith("-") else total
+
+
+def format_duration(ns: int) -> str:
+    """Format a positive nanosecond count as a compact Flux duration."""
+    for unit in ("d", "h", "m", "s", "ms", "us"):
+        if ns >= _NS[unit] and ns % _NS[unit] == 0:
+            return f"{ns // _NS[unit]}{unit}"
+    return f"{ns}ns"
+
+
+def now_ns() -> int:
+    """Return the current UTC time in nanoseconds since the epoch."""
+    return time.time_ns()
+
+
+def resolve_time(expr: str | None, now: int | None = None) -> int | None:
+    """Resolve a Flux time expression (duration, ``now()``, RFC3339, epoch) to ns."""
+    if expr is None:
+        return None
+    now = now_ns() if now is None else now
+    expr = expr.strip()
+    if expr == "now()":
+        return now
+    if is_duration(expr):
+        return now + parse_duration(expr)
+    if expr.lstrip("-").isdigit():
+        return int(expr) * 10**9
+    match = _RFC3339.match(expr.strip('"'))
+    if match is None:
+        return None
+    tz = match.group("tz") or "Z"
+    parsed = datetime.fromisoformat(match.group("base") + ("+00:00" if tz == "Z" else tz))
+    fraction = (match.group("frac") or "").ljust(9, "0")[:9]
+    return int(parsed.timestamp()) * 10**9 + int(fraction)
+
+
+def time_to_ns(value, now: int | None = None) -> int:
+    """Convert a point time (``None``, epoch ns, datetime or string) to ns."""
+    if value is None:
+        return now_ns() if now is None else now
+    if isinstance(value, int):
+        return value
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp()) * 10**9 + value.microsecond * 1000
+    return resolve_time(str(value), now)
+
+
+def format_time(ns: int) -> str:
+    """Format nanoseconds since the epoch as an RFC3339 literal."""
+    seconds, rest = divmod(ns, 10**9)
+    stamp = datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+    return f"{stamp}.{rest:09d}Z" if rest else f"{stamp}Z"
+
+
+class RangeCall:
+    """The first ``range()`` call of a query, with the same accessors as a regex match."""
+
+    __slots__ = ("_span", "_text", "_args")
+
+    def __init__(self, span: tuple, text: str, args: dict):
+        self._span = span
+        self._text = text
+        self._args = args
+
+    def group(self, name=0):
+        return self._text if name == 0 else self._args.get(name)
+
+    def start(self) -> int:
+        return self._span[0]
+
+    def end(self) -> int:
+        return self._span[1]
+
+
+def _split_args(text: str) -> dict:
+    """Split ``name: value`` call arguments at top-level commas."""
+    pieces, depth, last, i = [], 0, 0, 0
+    while i < len(text):
+        char = text[i]
+        if char == '"':
+            string = _STRING.match(text, i)
+            i = string.end() if string else len(text)
+            continue
+        if char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+        elif char == "," and depth == 0:
+            pieces.append(text[last:i])
+            last = i + 1
+        i += 1
+    pieces.append(text[last:])
+    args = {}
+    for piece in pieces:
+        name, sep, value = piece.partition(":")
+        if sep and name.strip().isidentifier():
+            args[name.strip()] = value.strip()
+    return args
+
+
+def find_range(query: str) -> RangeCall | None:
+    """Return the first ``range()`` call that has a ``start`` argument, or ``None``.
+
+    Arguments may themselves be calls such as ``now()``; the call is matched
+    up to its balancing parenthesis.
+    """
+    blanked = _STRING.sub(lambda m: '"' + " " * (len(m.group(0)) - 2) + '"', query)
+    for match in _RANGE_CALL.finditer(blanked):
+        open_paren = match.end() - 1
+        end = _call_end(query, open_paren)
+        if query[end - 1:end] != ")":
+            return None
+        args = _split_args(query[open_paren + 1:end - 1])
+        if args.get("start"):
+            return RangeCall((match.start(), end), query[match.start():end], args)
+    return None
+
+
+def query_range(query: str, now: int | None = None):
+    """Return ``(start_ns, stop_ns, relative)`` for the query's ``range()``.
+
+    ``relative`` is true when the range is anchored to the current time. Any
+    bound that cannot be resolved is returned as ``None``.
+    """
+    match = find_range(query)
+    if match is None:
+        return None, None, False
+    now = now_ns() if now is None else now
+    start, stop = match.group("start"), match.group("stop")
+    relative = stop is None or stop.strip() == "now()" or is_duration(stop)
+    return resolve_time(start, now), resolve_time(stop, now) if stop else now, relative
+
+
+def replace_range(query: str, start: str, stop: str | None = None) -> str:
+    """Replace the bounds of the first ``range()`` call in ``query``."""
+    match = find_range(query)
+    if match is None:
+        return query
+    args = f"start: {start}" + (f", stop: {stop}" if stop else "")
+    return f"{query[:match.start()]}range({args}){query[match.end():]}"
+
+
+def _call_end(query: str, open_paren: int) -> int:
+    """Return the index just past the parenthesis closing ``open_paren``."""
+    depth = 0
+    i = open_paren
+    while i < len(query):
+        char = query[i]
+        if char == '"':
+            string = _STRING.match(query, i)
+            i = string.end() if string else len(query)
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return len(query)
+
+
+def aggregates(query: str) -> bool:
+    """Return whether ``query`` already aggregates or windows its data."""
+    return bool(_AGGREGATE.search(_STRING.sub('""', query)))
+
+
+def window_for(span_ns: int, max_points: int) -> int:
+    """Return the smallest "nice" window that keeps ``span_ns`` under ``max_points``."""
+    target = math.ceil(span_ns / max(max_points, 1))
+    for window in _NICE_WINDOWS:
+        if window >= target:
+            return window
+    return math.ceil(target / (86400 * _S)) * 86400 * _S
+
+
+def insert_after_filters(query: str, stage: str) -> str:
+    """Insert ``stage`` after the last ``range()``/``filter()`` of the pipeline."""
+    end = None
+    for match in _STAGE.finditer(query):
+        end = _call_end(query, match.end() - 1)
+    if end is None:
+        return f"{query}\n  |> {stage}"
+    return f"{query[:end]}\n  |> {stage}{query[end:]}"
+
+
+def downsample(query: str, max_points: int, fn: str = "mean", now: int | None = None) -> tuple:
+    """Push an ``aggregateWindow`` into ``query`` so it returns ~``max_points`` per series.
+
+    Returns the (possibly rewritten) query and a dict describing the choice.
+    """
+    if fn not in DOWNSAMPLE_FUNCTIONS:
+        raise ValueError(f"Unsupported downsampling function: {fn}")
+    info = {"applied": False, "max_points": max_points, "fn": fn}
+    if aggregates(query):
+        return query, {**info, "reason": "query already aggregates"}
+    start, stop, _ = query_range(query, now)
+    if start is None or stop is None or stop <= start:
+        return query, {**info, "reason": "range could not be resolved"}
+    span = stop - start
+    window = window_for(span, max_points)
+    if span // window < max_points and window == _NICE_WINDOWS[0]:
+        return query, {**info, "reason": "range fits in the point budget"}
+    every = format_duration(window)
+    stage = f"aggregateWindow(every: {every}, fn: {fn}, createEmpty: false)"
+    return insert_after_filters(query, stage), {
+        **info,
+        "applied": True,
+        "every": every,
+        "range": format_duration(span),
+    }
+
+
+def can_split(query: str) -> bool:
+    """Return whether ``query`` may be run as several sub-ranges and concatenated.
+
+    Only a single ``from() |> range()`` pipeline qualifies: ``split_range``
+    rewrites one ``range()``, so a query joining or combining several streams
+    would re-read the others in full for every sub-range.
+    """
+    text = _STRING.sub('""', query)
+    stages = _PIPE_CALL.findall(text)
+    if len(_RANGE_CALL.findall(text)) != 1 or len(_FROM.findall(text)) > 1 or _COMBINE.search(text):
+        return False
+    return "range" in stages and all(stage in _SPLITTABLE_STAGES for stage in stages)
+
+
+def split_range(query: str, parts: int, now: int | None = None) -> list:
+    """Split the query's ``range()`` into up to ``parts`` consecutive absolute sub-ranges.
+
+    Boundaries are aligned to the ``aggregateWindow`` period, if any, so no
+    window straddles two sub-ranges. Returns ``[query]`` when the range cannot
+    be resolved or split.
+    """
+    start, stop, _ = query_range(query, now)
+    if parts < 2 or start is None or stop is None or stop <= start:
+        return [query]
+    match = _EVERY.search(query)
+    align = parse_duration(match.group(1)) if match and is_duration(match.group(1)) else 1
+    bounds = [start]
+    for i in range(1, parts):
+        edge = start + (stop - start) * i // parts
+        edge -= edge % align
+        if bounds[-1] < edge < stop:
+            bounds.append(edge)
+    bounds.append(stop)
+    return [
+        replace_range(query, format_time(lo), format_time(hi))
+        for lo, hi in zip(bounds, bounds[1:])
+    ]
+
+
+def is_wide(query: str) -> bool:
+    """Return whether ``query`` pivots fields into columns."""
+    return bool(_WIDE.search(_STRING.sub('""', query)))
+
+
+def pivot_fields(query: str) -> str:
+    """Return ``query`` reshaped to one row per timestamp and one column per field.
+
+    ``_start`` and ``_stop`` are dropped as well; they only repeat the range on
+    every row. Queries that already pivot are returned unchanged.
+    """
+    if is_wide(query):
+        return query
+    return (
+        f"{query.rstrip()}\n"
+        '  |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")\n'
+        '  |> drop(columns: ["_start", "_stop"])'
+    )
+
+
+def query_bucket(query: str) -> str | None:
+    """Return the bucket named in ``from(bucket: ...)`` or ``None``."""
+    match = _BUCKET.search(query)
+    return match.group(1) if match else None
+
+
+__all__ = [
+    "normalize",
+    "is_duration",
+    "parse_duration",
+    "format_duration",
+    "now_ns",
+    "resolve_time",
+    "time_to_ns",
+    "format_time",
+    "find_range",
+    "query_range",
+    "replace_range",
+    "query_bucket",
+    "aggregates",
+    "window_for",
+    "insert_after_filters",
+    "downsample",
+    "DOWNSAMPLE_FUNCTIONS",
+    "can_split",
+    "split_range",
+    "is_wide",
+    "pivot_fields",
+]
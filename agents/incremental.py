@@ -0,0 +1,67 @@
+"""Helpers for refreshing cached time series with only the newly arrived rows."""
+
+import pandas as pd
+
+# Columns that describe the query rather than identify a series.
+_NON_KEY_COLUMNS = {"result", "table", "_start", "_stop", "_time", "_value", "time", "value"}
+
+
+def series_keys(df: pd.DataFrame) -> list:
+    """Return the columns identifying a series (measurement, field and tags)."""
+    return [
+        c for c in df.columns
+        if c not in _NON_KEY_COLUMNS
+        and not pd.api.types.is_numeric_dtype(df[c].dtype)
+        and not pd.api.types.is_datetime64_any_dtype(df[c].dtype)
+    ]
+
+
+def series_max_times(df: pd.DataFrame, keys: list) -> dict:
+    """Return the latest ``_time`` of every series in epoch nanoseconds."""
+    if df.empty or "_time" not in df.columns:
+        return {}
+    times = df["_time"]
+    if not keys:
+        return {(): int(times.max().value)}
+    latest = times.groupby([df[k] for k in keys], observed=True).max()
+    return {
+        (k if isinstance(k, tuple) else (k,)): int(v.value) for k, v in latest.items()
+    }
+
+
+def delta_start(max_times: dict, overlap: int) -> int:
+    """Return the epoch nanosecond the delta query of a refresh starts at.
+
+    That is ``overlap`` before the latest point of the series that lags most,
+    leaving out stalled series: those whose latest point is more than
+    ``overlap`` older than the newest series'. A stalled series would hold
+    every refresh back to its last point; if it resumes, its new points fall
+    after the start anyway.
+    """
+    latest = max(max_times.values())
+    return min(t for t in max_times.values() if t >= latest - overlap) - overlap
+
+
+def merge_delta(cached: pd.DataFrame, delta: pd.DataFrame, keys: list, window_start: int | None) -> tuple:
+    """Append ``delta`` to ``cached``, dropping overlap duplicates and expired rows.
+
+    Returns the merged frame, the number of new rows and the number of rows
+    trimmed because they fell out of the window starting at ``window_start``.
+    """
+    categorical = [c for c in cached.columns if isinstance(cached[c].dtype, pd.CategoricalDtype)]
+    merged = pd.concat([cached] if delta.empty else [cached, delta], ignore_index=True)
+    merged = merged.drop_duplicates(subset=[*keys, "_time"], keep="last")
+    added = len(merged) - len(cached)
+    trimmed = 0
+    if window_start is not None:
+        keep = merged["_time"] >= pd.Timestamp(window_start, tz="UTC")
+        trimmed = int((~keep).sum())
+        merged = merged[keep]
+    merged = merged.reset_index(drop=True)
+    for column in categorical:
+        if column in merged.columns and not isinstance(merged[column].dtype, pd.CategoricalDtype):
+            merged[column] = merged[column].astype("category")
+    return merged, max(added, 0), trimmed
+
+
+__all__ = ["series_keys", "series_max_times", "delta_start", "merge_delta"]
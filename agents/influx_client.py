@@ -0,0 +1,107 @@
+"""Shared, pooled InfluxDB clients.
+
+Creating an ``InfluxDBClient`` per tool call pays a fresh TCP/TLS handshake
+every time and leaks the client's connection pool. This module keeps one
+lazily created, keep-alive client per (url, org, token) for the lifetime of
+the process and closes them explicitly on shutdown.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    from config import (
+        INFLUX_POOL_SIZE,
+        INFLUX_TIMEOUT_MS,
+        INFLUX_RETRIES,
+        INFLUX_RETRY_BACKOFF,
+    )
+except ImportError:  # pragma: no cover - fallback for runtime usage
+    INFLUX_POOL_SIZE = int(os.getenv("INFLUX_POOL_SIZE", "10"))
+    INFLUX_TIMEOUT_MS = int(os.getenv("INFLUX_TIMEOUT_MS", "30000"))
+    INFLUX_RETRIES = int(os.getenv("INFLUX_RETRIES", "3"))
+    INFLUX_RETRY_BACKOFF = float(os.getenv("INFLUX_RETRY_BACKOFF", "0.5"))
+
+try:
+    from config import INFLUX_ENABLE_GZIP
+except ImportError:  # pragma: no cover - fallback for runtime usage
+    INFLUX_ENABLE_GZIP = os.getenv("INFLUX_ENABLE_GZIP", "true").lower() == "true"
+
+try:
+    from config import INFLUX_MAX_CONCURRENT_QUERIES
+except ImportError:  # pragma: no cover - fallback for runtime usage
+    INFLUX_MAX_CONCURRENT_QUERIES = int(os.getenv("INFLUX_MAX_CONCURRENT_QUERIES", "4"))
+
+_clients = {}
+_lock = threading.Lock()
+_stats = {"created": 0, "reused": 0, "closed": 0}
+_query_slots = threading.BoundedSemaphore(INFLUX_MAX_CONCURRENT_QUERIES)
+
+
+def _retry_policy():
+    """Return the urllib3 retry policy used for every pooled client."""
+    from urllib3 import Retry
+
+    return Retry(
+        total=INFLUX_RETRIES,
+        backoff_factor=INFLUX_RETRY_BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=None,
+        raise_on_status=False,
+    )
+
+
+def get_client(url: str, token: str, org: str, client_cls=None):
+    """Return the shared client for ``url``/``org``/``token``, creating it once.
+
+    ``client_cls`` defaults to ``influxdb_client.InfluxDBClient``; callers pass
+    their own reference so that patching it in tests yields a separate client.
+    """
+    if client_cls is None:
+        from influxdb_client import InfluxDBClient as client_cls
+
+    key = (client_cls, url, org, token)
+    with _lock:
+        client = _clients.get(key)
+        if client is not None:
+            _stats["reused"] += 1
+            return client
+        client = client_cls(
+            url=url,
+            token=token,
+            org=org,
+            timeout=INFLUX_TIMEOUT_MS,
+            connection_pool_maxsize=INFLUX_POOL_SIZE,
+            retries=_retry_policy(),
+            enable_gzip=INFLUX_ENABLE_GZIP,
+        )
+        _clients[key] = client
+        _stats["created"] += 1
+        return client
+
+
+@contextmanager
+def query_slot():
+    """Hold one of the ``INFLUX_MAX_CONCURRENT_QUERIES`` slots while querying."""
+    with _query_slots:
+        yield
+
+
+def close_clients() -> None:
+    """Close every pooled client and forget it."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        _stats["closed"] += len(clients)
+    for client in clients:
+        client.close()
+
+
+def client_stats() -> dict:
+    """Return connection reuse counters for the pooled clients."""
+    with _lock:
+        return {**_stats, "open": len(_clients)}
+
+
+__all__ = ["get_client", "query_slot", "close_clients", "client_stats"]
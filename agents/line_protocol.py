@@ -0,0 +1,170 @@
+"""Vectorized encoding of tabular data to InfluxDB line protocol."""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# Columns added by Flux that are never written back as tags.
+_META_COLUMNS = {"result", "table", "_start", "_stop", "time", "value"}
+
+_FIELD = r'(?:[^ ,=\\]|\\.)+=(?:"(?:[^"\\]|\\.)*"|[^ ,"\\]+)'
+_VALID_LINE = re.compile(
+    r"^(?:[^ ,\\]|\\.)+(?:,(?:[^ \\]|\\.)+)* " + _FIELD + "(?:," + _FIELD + r")*(?: -?\d+)?$"
+)
+
+
+def _escape(values: pd.Series, chars: str) -> pd.Series:
+    values = values.astype(str)
+    for char in "\\" + chars:
+        values = values.str.replace(char, "\\" + char, regex=False)
+    return values
+
+
+def _field_values(values: pd.Series) -> pd.Series:
+    """Format field values; missing values become empty strings."""
+    missing = values.isna()
+    if pd.api.types.is_bool_dtype(values):
+        text = values.map({True: "true", False: "false"})
+    elif pd.api.types.is_integer_dtype(values):
+        text = values.fillna(0).astype("int64").astype(str) + "i"
+    elif pd.api.types.is_float_dtype(values):
+        # Via float64 so downcast float32 columns keep their exact value.
+        text = values.astype("float64").astype(str)
+        missing = missing | ~np.isfinite(values.fillna(0).to_numpy())
+    else:
+        text = '"' + values.astype(str).str.replace("\\", "\\\\", regex=False).str.replace('"', '\\"', regex=False) + '"'
+    return text.where(~missing, "")
+
+
+def _join(parts: list, sep: str) -> pd.Series:
+    """Join string series element-wise, skipping empty parts."""
+    result = parts[0]
+    for part in parts[1:]:
+        both = (result != "") & (part != "")
+        result = result.where(part == "", result.where(~both, result + sep) + part)
+    return result
+
+
+def _timestamps(values: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(values):
+        if getattr(values.dt, "tz", None) is not None:
+            values = values.dt.tz_convert("UTC").dt.tz_localize(None)
+        ns = values.astype("datetime64[ns]").astype("int64")
+        return ns.astype(str).where(values.notna(), "")
+    return values.astype("Int64").astype(str).where(values.notna(), "")
+
+
+def encode_frame(
+    df: pd.DataFrame,
+    measurement: str | None = None,
+    tag_columns: list | None = None,
+    field_columns: list | None = None,
+    time_column: str | None = None,
+) -> tuple:
+    """Encode ``df`` to line protocol.
+
+    Long-format query results (``_field``/``_value`` columns) are written with
+    one field per row. Otherwise numeric and boolean columns become fields
+    and the remaining string columns tags, unless given explicitly. The
+    measurement comes from ``measurement`` or a ``_measurement`` column.
+
+    Returns ``(lines, rejected)`` where ``rejected`` holds the indices of rows
+    that have no field value and therefore cannot be written.
+    """
+    if df.empty:
+        return [], []
+    if time_column is None:
+        time_column = next((c for c in ("_time", "time") if c in df.columns), None)
+    long_format = "_field" in df.columns and "_value" in df.columns and field_columns is None
+    reserved = _META_COLUMNS | {time_column, "_measurement", "_field", "_value"}
+
+    if field_columns is None and not long_format:
+        field_columns = [
+            c for c in df.columns
+            if c not in reserved and (pd.api.types.is_numeric_dtype(df[c]) or pd.api.types.is_bool_dtype(df[c]))
+        ]
+    if tag_columns is None:
+        tag_columns = [
+            c for c in df.columns
+            if c not in reserved and c not in (field_columns or [])
+            and not pd.api.types.is_numeric_dtype(df[c])
+            and not pd.api.types.is_datetime64_any_dtype(df[c])
+        ]
+
+    if measurement:
+        key = pd.Series(_escape(pd.Series([measurement]), ", ").iloc[0], index=df.index)
+    elif "_measurement" in df.columns:
+        key = _escape(df["_measurement"], ", ")
+    else:
+        raise ValueError("A measurement name or a _measurement column is required.")
+
+    for tag in sorted(tag_columns):
+        values = df[tag]
+        text = _escape(pd.Series([tag]), ",= ").iloc[0] + "=" + _escape(values, ",= ")
+        key = _join([key, text.where(values.notna() & (values.astype(str) != ""), "")], ",")
+
+    if long_format:
+        values = _field_values(df["_value"])
+        fields = (_escape(df["_field"], ",= ") + "=" + values).where(values != "", "")
+    else:
+        parts = []
+        for column in field_columns:
+            values = _field_values(df[column])
+            name = _escape(pd.Series([column]), ",= ").iloc[0]
+            parts.append((name + "=" + values).where(values != "", ""))
+        if not parts:
+            return [], list(df.index)
+        fields = _join(parts, ",")
+
+    lines = key + " " + fields
+    if time_column is not None:
+        stamps = _timestamps(df[time_column])
+        lines = _join([lines, stamps], " ")
+    valid = fields != ""
+    return lines[valid].tolist(), list(df.index[~valid])
+
+
+def encode_points(points: list, measurement: str | None = None) -> tuple:
+    """Encode point dicts (``measurement``, ``tags``, ``fields``, ``time``) to lines."""
+    if not points:
+        return [], []
+    df = pd.json_normalize(points)
+    tags = [c for c in df.columns if c.startswith("tags.")]
+    fields = [c for c in df.columns if c.startswith("fields.")]
+    df = df.rename(columns={c: c.split(".", 1)[1] for c in tags + fields})
+    for column in fields:
+        # Points missing a field widen its column (ints to float, bools to
+        # object); restore the type of the values as given, as single writes see it.
+        name = column.split(".", 1)[1]
+        values = [point.get("fields", {}).get(name) for point in points]
+        kind = pd.api.types.infer_dtype(values, skipna=True)
+        if kind in ("integer", "boolean"):
+            df[name] = pd.array(values, dtype="Int64" if kind == "integer" else "boolean")
+    if "measurement" in df.columns:
+        df["_measurement"] = df["measurement"].fillna(measurement or "")
+        measurement = None
+    if "time" in df.columns:
+        df["time"] = pd.to_datetime(df["time"], utc=True)
+    return encode_frame(
+        df,
+        measurement=measurement,
+        tag_columns=[c.split(".", 1)[1] for c in tags],
+        field_columns=[c.split(".", 1)[1] for c in fields],
+        time_column="time" if "time" in df.columns else None,
+    )
+
+
+def read_lines(path: str) -> tuple:
+    """Read a line-protocol file, returning ``(valid_lines, rejected_lines)``."""
+    valid, rejected = [], []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            (valid if _VALID_LINE.match(line) else rejected).append(line)
+    return valid, rejected
+
+
+__all__ = ["encode_frame", "encode_points", "read_lines"]
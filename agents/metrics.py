@@ -0,0 +1,309 @@
+"""Timing and size metrics for tools, model calls, queries and turns.
+
+Every tool function is wrapped with ``@instrument`` where it is defined, and
+``TieredSwarm`` and the query path report model calls, handoffs, InfluxDB
+queries and record conversion here. Each observation
+
+- is added to a process-wide registry, rendered in the Prometheus text
+  format by ``metrics_text()`` (served at ``GET /metrics`` by ``server.py``)
+  and summarized by ``metrics_snapshot()``;
+- is added to the totals of the running turn, if any (see ``turn``);
+- is logged as one JSON object per line on the ``agents.metrics`` logger at
+  INFO level. ``METRICS_LOG`` names a file to append these lines to, or
+  ``"-"`` for standard error.
+
+``turn(profile=True)`` also runs the turn under cProfile and saves the
+statistics to ``METRICS_PROFILE_DIR``.
+"""
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+try:
+    from config import METRICS_LOG, METRICS_PROFILE_DIR
+except ImportError:  # pragma: no cover - fallback for runtime usage
+    METRICS_LOG = os.getenv("METRICS_LOG", "")
+    METRICS_PROFILE_DIR = os.getenv("METRICS_PROFILE_DIR", "profiles")
+
+logger = logging.getLogger(__name__)
+
+if METRICS_LOG:
+    _handler = logging.StreamHandler() if METRICS_LOG == "-" else logging.FileHandler(METRICS_LOG)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+_HELP = {
+    "agents_tool_seconds": ("summary", "Wall time of tool calls"),
+    "agents_tool_calls_total": ("counter", "Tool calls by outcome"),
+    "agents_tool_rows_total": ("counter", "Rows or items returned by tools"),
+    "agents_llm_seconds": ("summary", "Wall time of model completions"),
+    "agents_llm_tokens_total": ("counter", "Prompt and completion tokens"),
+    "agents_handoffs_total": ("counter", "Handoffs between agents"),
+    "agents_influx_query_seconds": ("summary", "Time to fetch and decode InfluxDB query results"),
+    "agents_influx_rows_total": ("counter", "Rows returned by InfluxDB"),
+    "agents_influx_bytes_total": ("counter", "In-memory bytes of decoded InfluxDB results"),
+    "agents_influx_cache_hits_total": ("counter", "Queries answered from the query cache"),
+    "agents_convert_seconds": ("summary", "Time to convert query results to DataFrames"),
+    "agents_convert_rows_total": ("counter", "Rows converted to DataFrames"),
+    "agents_render_seconds": ("summary", "Time from plot request to finished file"),
+    "agents_turn_seconds": ("summary", "Wall time of user turns"),
+}
+
+
+class Metrics:
+    """Thread-safe registry of counters and summaries (count and sum) with labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            count, total = self._values.get(key, (0, 0.0))
+            self._values[key] = (count + 1, total + value)
+
+    def snapshot(self) -> dict:
+        """Return ``{name: [{"labels": ..., "value" | "count"/"sum": ...}]}``."""
+        with self._lock:
+            items = sorted(self._values.items())
+        out = {}
+        for (name, labels), value in items:
+            entry = {"labels": dict(labels)}
+            if isinstance(value, tuple):
+                entry.update(count=value[0], sum=round(value[1], 6))
+            else:
+                entry["value"] = value
+            out.setdefault(name, []).append(entry)
+        return out
+
+    def render(self) -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, entries in self.snapshot().items():
+            kind, text = _HELP.get(name, ("untyped", name))
+            lines += [f"# HELP {name} {text}", f"# TYPE {name} {kind}"]
+            for entry in entries:
+                labels = ",".join(f'{k}="{_escape(v)}"' for k, v in entry["labels"].items())
+                labels = f"{{{labels}}}" if labels else ""
+                if "value" in entry:
+                    lines.append(f"{name}{labels} {entry['value']}")
+                else:
+                    lines.append(f"{name}_count{labels} {entry['count']}")
+                    lines.append(f"{name}_sum{labels} {entry['sum']}")
+        return "".join(f"{line}\n" for line in lines)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = Metrics()
+
+
+class Turn:
+    """Totals of one user turn, filled in by the observations made during it."""
+
+    __slots__ = ("fields", "totals", "handoffs", "started", "seconds", "profile_path")
+
+    def __init__(self, **fields):
+        self.fields = fields
+        self.totals = {}
+        self.handoffs = []
+        self.started = time.perf_counter()
+        self.seconds = None
+        self.profile_path = None
+
+    def add(self, **values) -> None:
+        for key, value in values.items():
+            if value:
+                self.totals[key] = self.totals.get(key, 0) + value
+
+    def summary(self) -> dict:
+        return {
+            **self.fields,
+            "seconds": round(self.seconds if self.seconds is not None else time.perf_counter() - self.started, 4),
+            **{k: round(v, 4) if isinstance(v, float) else v for k, v in sorted(self.totals.items())},
+            "handoffs": self.handoffs,
+            **({"profile": self.profile_path} if self.profile_path else {}),
+        }
+
+
+_turn = ContextVar("metrics_turn", default=None)
+
+
+def current_turn() -> Turn | None:
+    return _turn.get()
+
+
+def _log(event: str, **fields) -> None:
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({"event": event, "ts": round(time.time(), 3), **fields}, default=str))
+
+
+@contextmanager
+def turn(profile: bool = False, **fields):
+    """Collect the observations of one turn; log its totals when it ends."""
+    current = Turn(**fields)
+    token = _turn.set(current)
+    profiler = None
+    if profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield current
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(METRICS_PROFILE_DIR, exist_ok=True)
+            current.profile_path = os.path.join(
+                METRICS_PROFILE_DIR, f"turn_{time.strftime('%Y%m%d_%H%M%S')}_{id(current):x}.prof"
+            )
+            profiler.dump_stats(current.profile_path)
+        _turn.reset(token)
+        current.seconds = time.perf_counter() - current.started
+        metrics.observe("agents_turn_seconds", current.seconds)
+        _log("turn", **current.summary())
+
+
+def _rows(result):
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    shape = getattr(result, "shape", None)
+    if shape:
+        return shape[0]
+    if isinstance(result, dict):
+        for key in ("records", "rows"):
+            if isinstance(result.get(key), int):
+                return result[key]
+        if "result" in result:
+            return _rows(result["result"])
+    return None
+
+
+def record_tool(tool: str, seconds: float, rows=None, error: str | None = None) -> None:
+    metrics.observe("agents_tool_seconds", seconds, tool=tool)
+    metrics.inc("agents_tool_calls_total", tool=tool, status="error" if error else "ok")
+    if rows:
+        metrics.inc("agents_tool_rows_total", rows, tool=tool)
+    current = _turn.get()
+    if current is not None:
+        current.add(tool_calls=1, tool_seconds=seconds)
+    _log("tool", tool=tool, seconds=round(seconds, 4), rows=rows, error=error)
+
+
+def record_llm(agent: str, model: str, seconds: float, tokens_in=None, tokens_out=None) -> None:
+    metrics.observe("agents_llm_seconds", seconds, agent=agent, model=model)
+    if tokens_in:
+        metrics.inc("agents_llm_tokens_total", tokens_in, model=model, direction="in")
+    if tokens_out:
+        metrics.inc("agents_llm_tokens_total", tokens_out, model=model, direction="out")
+    current = _turn.get()
+    if current is not None:
+        current.add(llm_calls=1, llm_seconds=seconds, tokens_in=tokens_in, tokens_out=tokens_out)
+    _log("llm", agent=agent, model=model, seconds=round(seconds, 4), tokens_in=tokens_in, tokens_out=tokens_out)
+
+
+def record_handoff(source: str, target: str) -> None:
+    metrics.inc("agents_handoffs_total", source=source, target=target)
+    current = _turn.get()
+    if current is not None:
+        current.handoffs.append(f"{source} -> {target}")
+    _log("handoff", source=source, target=target)
+
+
+def record_query(seconds: float, rows: int, size: int, output: str, parts: int = 1) -> None:
+    metrics.observe("agents_influx_query_seconds", seconds, output=output)
+    metrics.inc("agents_influx_rows_total", rows)
+    metrics.inc("agents_influx_bytes_total", size)
+    current = _turn.get()
+    if current is not None:
+        current.add(influx_queries=1, influx_seconds=seconds, influx_rows=rows, influx_bytes=size)
+    _log("influx_query", seconds=round(seconds, 4), rows=rows, bytes=size, output=output, parts=parts)
+
+
+def record_cache_hit() -> None:
+    metrics.inc("agents_influx_cache_hits_total")
+    current = _turn.get()
+    if current is not None:
+        current.add(influx_cache_hits=1)
+
+
+def record_conversion(seconds: float, rows: int) -> None:
+    metrics.observe("agents_convert_seconds", seconds)
+    metrics.inc("agents_convert_rows_total", rows)
+    current = _turn.get()
+    if current is not None:
+        current.add(convert_seconds=seconds, rows_converted=rows)
+    _log("convert", seconds=round(seconds, 4), rows=rows)
+
+
+def record_render(seconds: float, plot_type: str, status: str) -> None:
+    metrics.observe("agents_render_seconds", seconds, plot_type=plot_type, status=status)
+    _log("render", seconds=round(seconds, 4), plot_type=plot_type, status=status)
+
+
+def instrument(func):
+    """Record the wall time, result size and failures of every call of ``func``."""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as exc:
+            record_tool(name, time.perf_counter() - started, error=type(exc).__name__)
+            raise
+        record_tool(name, time.perf_counter() - started, rows=_rows(result))
+        return result
+
+    return wrapper
+
+
+def metrics_text() -> str:
+    """Return all metrics in the Prometheus text format."""
+    return metrics.render()
+
+
+def metrics_snapshot() -> dict:
+    """Return all metrics as a dict of labelled counts and sums."""
+    return metrics.snapshot()
+
+
+def dump_metrics(path: str) -> str:
+    """Write the Prometheus text of all metrics to ``path``."""
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(metrics.render())
+    return path
+
+
+__all__ = [
+    "Metrics",
+    "Turn",
+    "metrics",
+    "turn",
+    "current_turn",
+    "instrument",
+    "metrics_text",
+    "metrics_snapshot",
+    "dump_metrics",
+]
@@ -0,0 +1,124 @@
+"""Rendering of stored datasets to image files.
+
+``render`` draws with matplotlib's headless Agg backend through
+object-oriented ``Figure`` objects, so it holds no global pyplot state and
+can run in threads or in the worker processes of ``agents/render_pool.py``.
+matplotlib is imported by the first ``render`` call.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from .decimate import decimate
+
+# Scatter plots with more points are drawn as rasterized markers.
+DENSE_SCATTER_POINTS = 10_000
+
+# Directory plot files are written to.
+PLOT_DIR = "plots"
+
+
+def _plot_line(ax, x, y, width_px: int, method: str, **kwargs) -> None:
+    """Plot ``y`` against ``x`` after decimating it to the axes' pixel width."""
+    keep = decimate(x, y, width_px, method)
+    ax.plot(np.asarray(x)[keep], np.asarray(y)[keep], **kwargs)
+
+
+def infer_plot_type(df: pd.DataFrame) -> str:
+    """Pick a plot type from the column types of ``df``."""
+    numeric_cols = df.select_dtypes(include="number").columns
+    if len(numeric_cols) >= 2:
+        return "scatter"
+    if len(numeric_cols):
+        return "hist"
+    return "bar"
+
+
+def render(df: pd.DataFrame, plot_type: str, filepath: str, decimation: str = "lttb") -> str:
+    """Draw ``df`` as a ``plot_type`` chart, save it to ``filepath`` and return the path."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    numeric_cols = df.select_dtypes(include="number").columns.tolist()
+    categorical_cols = df.select_dtypes(include=["object", "category"]).columns.tolist()
+
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    width_px = int(fig.get_figwidth() * fig.dpi)
+    if plot_type == "scatter":
+        x, y = numeric_cols[:2]
+        if len(df) > DENSE_SCATTER_POINTS:
+            ax.plot(df[x], df[y], linestyle="none", marker=".", markersize=1, rasterized=True)
+        else:
+            ax.scatter(df[x], df[y])
+        ax.set_xlabel(x)
+        ax.set_ylabel(y)
+        ax.set_title(f"Scatter plot of {y} vs {x}")
+    elif plot_type == "line":
+        if len(numeric_cols) >= 2:
+            x, y = numeric_cols[:2]
+            _plot_line(ax, df[x], df[y], width_px, decimation)
+            ax.set_xlabel(x)
+            ax.set_ylabel(y)
+            ax.set_title(f"Line plot of {y} vs {x}")
+        else:
+            col = numeric_cols[0]
+            time_cols = df.select_dtypes(include=["datetime", "datetimetz"]).columns.tolist()
+            if time_cols:
+                x = time_cols[0]
+                times = df[x].dt.tz_convert(None) if df[x].dt.tz is not None else df[x]
+                _plot_line(ax, times, df[col], width_px, decimation)
+                ax.set_xlabel(x)
+            else:
+                _plot_line(ax, np.arange(len(df)), df[col], width_px, decimation)
+                ax.set_xlabel("index")
+            ax.set_ylabel(col)
+            ax.set_title(f"Line plot of {col}")
+    elif plot_type == "bar":
+        if categorical_cols and numeric_cols:
+            x = categorical_cols[0]
+            y = numeric_cols[0]
+            ax.bar(df[x].astype(str), df[y])
+            ax.set_xlabel(x)
+            ax.set_ylabel(y)
+            ax.set_title(f"Bar chart of {y} by {x}")
+        else:
+            positions = np.arange(len(df))
+            width = 0.8 / max(len(numeric_cols), 1)
+            for i, col in enumerate(numeric_cols):
+                ax.bar(positions + i * width, df[col], width=width, label=col)
+            ax.legend()
+            ax.set_title("Bar chart of dataset")
+    elif plot_type == "hist":
+        col = numeric_cols[0]
+        ax.hist(df[col].dropna(), bins=10)
+        ax.set_xlabel(col)
+        ax.set_title(f"Histogram of {col}")
+    elif plot_type == "pie":
+        if categorical_cols and numeric_cols:
+            labels = df[categorical_cols[0]].astype(str)
+            sizes = df[numeric_cols[0]]
+            ax.pie(sizes, labels=labels, autopct="%1.1f%%")
+            ax.set_title(f"Pie chart of {numeric_cols[0]} by {categorical_cols[0]}")
+        else:
+            raise ValueError(
+                "Pie chart requires at least one categorical and one numeric column."
+            )
+    else:
+        for col in numeric_cols:
+            _plot_line(ax, np.arange(len(df)), df[col], width_px, decimation, label=col)
+        ax.legend()
+        ax.set_title("Default plot of dataset")
+
+    fig.tight_layout()
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fig.savefig(filepath)
+    return filepath
+
+
+__all__ = ["DENSE_SCATTER_POINTS", "PLOT_DIR", "infer_plot_type", "render"]
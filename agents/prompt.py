@@ -0,0 +1,60 @@
+"""Asking the user for input, from the terminal, a batch record or the caller of a turn.
+
+Kept free of heavy imports so that ``main.py`` can show its first prompt
+before the agents are loaded.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .metrics import instrument
+
+# Answers ask_user with a callable instead of the terminal (batch runs).
+_answerer = ContextVar("answerer", default=None)
+
+
+class QuestionForUser(Exception):
+    """Ends a turn at ``ask_user`` so that its caller can put ``question`` to the user."""
+
+    def __init__(self, question: str):
+        super().__init__(question)
+        self.question = question
+
+
+@instrument
+def ask_user(question: str) -> str:
+    """Prompt the user for additional information."""
+    answerer = _answerer.get()
+    if answerer is not None:
+        return answerer(question)
+    return input(f"{question}\n> ")
+
+
+@contextmanager
+def use_answers(answerer):
+    """Answer ``ask_user`` with ``answerer(question)`` within the block (per thread/task)."""
+    token = _answerer.set(answerer)
+    try:
+        yield answerer
+    finally:
+        _answerer.reset(token)
+
+
+def _defer(question: str) -> str:
+    raise QuestionForUser(question)
+
+
+@contextmanager
+def defer_questions():
+    """Within the block, ``ask_user`` raises ``QuestionForUser`` instead of reading the terminal.
+
+    An answerer installed by ``use_answers`` still takes precedence.
+    """
+    if _answerer.get() is not None:
+        yield
+        return
+    with use_answers(_defer):
+        yield
+
+
+__all__ = ["ask_user", "use_answers", "defer_questions", "QuestionForUser"]
@@ -0,0 +1,160 @@
+"""Result cache for Flux queries.
+
+Entries are keyed by the normalized query text after the bucket and
+measurement placeholders have been rewritten. Queries whose ``range()`` ends
+at the current time (``range(start: -1h)``) expire after ``QUERY_CACHE_TTL``
+seconds, while queries over a range that lies completely in the past are
+kept for ``QUERY_CACHE_HISTORICAL_TTL`` seconds. Writes and deletes invalidate
+the entries of the affected bucket whose time range overlaps the change.
+Empty results are never cached so freshly written series show up at once.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from . import flux
+from .data_store import estimate_size
+
+try:
+    from config import (
+        QUERY_CACHE_TTL,
+        QUERY_CACHE_HISTORICAL_TTL,
+        QUERY_CACHE_MAX_ENTRIES,
+        QUERY_CACHE_MAX_BYTES,
+    )
+except ImportError:  # pragma: no cover - fallback for runtime usage
+    QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "60"))
+    QUERY_CACHE_HISTORICAL_TTL = float(os.getenv("QUERY_CACHE_HISTORICAL_TTL", "3600"))
+    QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "128"))
+    QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def _shallow_copy(value):
+    if isinstance(value, (list, dict)):
+        return type(value)(value)
+    copy = getattr(value, "copy", None)
+    return copy(deep=False) if callable(copy) else value
+
+
+class _Entry:
+    __slots__ = ("value", "bucket", "start", "stop", "expires", "size")
+
+    def __init__(self, value, bucket, start, stop, expires, size):
+        self.value = value
+        self.bucket = bucket
+        self.start = start
+        self.stop = stop
+        self.expires = expires
+        self.size = size
+
+
+class QueryCache:
+    """Bounded TTL cache for query results with bucket/time-range invalidation."""
+
+    def __init__(
+        self,
+        ttl: float = QUERY_CACHE_TTL,
+        historical_ttl: float = QUERY_CACHE_HISTORICAL_TTL,
+        max_entries: int = QUERY_CACHE_MAX_ENTRIES,
+        max_bytes: int = QUERY_CACHE_MAX_BYTES,
+    ):
+        self.ttl = ttl
+        self.historical_ttl = historical_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    @staticmethod
+    def key(query: str, *scope) -> tuple:
+        """Return the cache key for ``query`` within ``scope`` (server, output, ...)."""
+        return (*scope, flux.normalize(query))
+
+    def get(self, key: tuple):
+        """Return a cached result for ``key`` or ``None``."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= time.monotonic():
+                self._remove(key)
+                self._counters["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return _shallow_copy(entry.value)
+
+    def put(self, key: tuple, query: str, value) -> None:
+        """Cache ``value`` for ``key``; ``query`` supplies the bucket and range."""
+        if not self.enabled or value is None or len(value) == 0:
+            return
+        now = flux.now_ns()
+        start, stop, relative = flux.query_range(query, now)
+        ttl = self.ttl if relative or stop is None or stop > now else max(self.ttl, self.historical_ttl)
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        # A relative range keeps moving forward, so it overlaps any later write.
+        stop = None if relative else stop
+        entry = _Entry(value, flux.query_bucket(query), start, stop, time.monotonic() + ttl, size)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+            self._counters["stores"] += 1
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._counters["evictions"] += 1
+
+    def invalidate(self, bucket: str | None = None, start: int | None = None, stop: int | None = None) -> int:
+        """Drop entries for ``bucket`` (all buckets if ``None``) overlapping ``start``..``stop`` ns."""
+        with self._lock:
+            doomed = [
+                key
+                for key, entry in self._entries.items()
+                if (bucket is None or entry.bucket in (None, bucket))
+                and (start is None or entry.stop is None or entry.stop >= start)
+                and (stop is None or entry.start is None or entry.start <= stop)
+            ]
+            for key in doomed:
+                self._remove(key)
+            self._counters["invalidations"] += len(doomed)
+            return len(doomed)
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current size of the cache."""
+        with self._lock:
+            return {**self._counters, "entries": len(self._entries), "bytes": self._bytes}
+
+    def _remove(self, key: tuple) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+
+query_cache = QueryCache()
+
+
+def query_cache_stats() -> dict:
+    """Return hit, miss and invalidation metrics of the query result cache."""
+    return query_cache.stats()
+
+
+__all__ = ["QueryCache", "query_cache", "query_cache_stats"]
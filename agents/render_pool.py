@@ -0,0 +1,276 @@
+"""Background plot rendering in a pool of worker processes.
+
+``visualize_data`` hands each chart to ``RenderPool.submit``, which returns
+the plot's file path at once as its handle and renders in a worker process,
+so the conversation continues while matplotlib runs. The dataset is written
+once to a shared memory block in the Arrow IPC stream format; every chart of
+that dataset rendered at the same time reads the block instead of receiving
+a pickled copy, and the block is freed when its last chart is done.
+
+Requests are keyed by a content hash of the data and the plot spec: asking
+for the same chart of the same data again returns the pending or finished
+handle instead of rendering twice. ``plot_status`` and ``wait_for_plot``
+report on a handle.
+
+The pool starts on first use with the ``spawn`` start method, since forking
+a process that runs threads is unsafe. Without ``pyarrow``, or with
+``RENDER_WORKERS = 0``, plots are rendered in the calling thread, as are
+datasets Arrow cannot convert (such as object columns of mixed types).
+"""
+
+import atexit
+import hashlib
+import importlib.util
+import json
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .metrics import instrument, record_render
+from .plotting import PLOT_DIR, render
+
+try:
+    from config import RENDER_WORKERS, RENDER_BACKGROUND
+except ImportError:  # pragma: no cover - fallback for runtime usage
+    RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+    RENDER_BACKGROUND = os.getenv("RENDER_BACKGROUND", "true").lower() == "true"
+
+
+def fingerprint(df: pd.DataFrame) -> str:
+    """Return a content hash of the columns, types and values of ``df``."""
+    digest = hashlib.blake2b(digest_size=32)
+    digest.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode())
+    for _, column in df.items():
+        if isinstance(column.dtype, np.dtype) and column.dtype.kind in "biufcmM":
+            digest.update(np.ascontiguousarray(column.to_numpy()).view(np.uint8))
+        else:
+            digest.update(pd.util.hash_pandas_object(column, index=False).to_numpy())
+    return digest.hexdigest()
+
+
+def _render_shared(block: str, size: int, plot_type: str, filepath: str, decimation: str) -> str:
+    """Worker side: read the dataset from shared memory and render it."""
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401
+
+    shm = shared_memory.SharedMemory(name=block)
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(shm.buf)[:size]).read_all()
+        df = table.to_pandas()
+        del table
+        render(df, plot_type, filepath, decimation)
+        del df
+    finally:
+        try:
+            shm.close()
+        except BufferError:  # a view is still alive; released with the process
+            pass
+    return filepath
+
+
+class _Block:
+    __slots__ = ("shm", "size", "refs")
+
+    def __init__(self, df: pd.DataFrame):
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        mock = pa.MockOutputStream()
+        with pa.ipc.new_stream(mock, table.schema) as writer:
+            writer.write_table(table)
+        self.size = mock.size()
+        self.shm = shared_memory.SharedMemory(create=True, size=max(self.size, 1))
+        sink = pa.FixedSizeBufferWriter(pa.py_buffer(self.shm.buf))
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        self.refs = 0
+
+    def free(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+
+class _Job:
+    __slots__ = ("key", "path", "plot_type", "status", "error", "submitted", "seconds", "done")
+
+    def __init__(self, key: str, path: str, plot_type: str):
+        self.key = key
+        self.path = path
+        self.plot_type = plot_type
+        self.status = "pending"
+        self.error = None
+        self.submitted = time.perf_counter()
+        self.seconds = None
+        self.done = threading.Event()
+
+    def describe(self) -> dict:
+        info = {"handle": self.path, "status": self.status}
+        if self.seconds is not None:
+            info["seconds"] = round(self.seconds, 3)
+        if self.error:
+            info["error"] = self.error
+        return info
+
+
+class RenderPool:
+    """Deduplicating render queue backed by a process pool."""
+
+    def __init__(self, workers: int = RENDER_WORKERS, directory: str = PLOT_DIR):
+        self.workers = workers
+        self.directory = directory
+        self._executor = None
+        # Reentrant: a fingerprint's weakref callback may run during garbage
+        # collection on a thread that already holds the lock.
+        self._lock = threading.RLock()
+        self._jobs = {}
+        self._blocks = {}
+        # Stored frames are shared and never modified in place, so each is
+        # hashed once; entries go away with their frame.
+        self._fingerprints = {}
+        self._stats = {"submitted": 0, "deduplicated": 0, "rendered": 0, "failed": 0}
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            atexit.register(self.close)
+        return self._executor
+
+    def submit(self, df: pd.DataFrame, plot_type: str, filename: str | None = None,
+               decimation: str = "lttb") -> str:
+        """Queue a ``plot_type`` chart of ``df`` and return its handle (the file path)."""
+        data_key = self._fingerprint(df)
+        key = hashlib.sha256(json.dumps([data_key, plot_type, decimation, filename]).encode()).hexdigest()
+        path = os.path.join(self.directory, filename or f"plot_{plot_type}_{key[:16]}.png")
+        inline = self.workers <= 0 or importlib.util.find_spec("pyarrow") is None
+        with self._lock:
+            job = self._jobs.get(path)
+            if job is not None and job.key == key and (
+                job.status == "pending" or (job.status == "done" and os.path.exists(path))
+            ):
+                self._stats["deduplicated"] += 1
+                return path
+            self._stats["submitted"] += 1
+            if not inline:
+                block = self._blocks.get(data_key)
+                if block is None:
+                    try:
+                        block = self._blocks[data_key] = _Block(df)
+                    except (TypeError, ValueError):  # Arrow cannot convert a column, e.g. mixed types
+                        inline = True
+            job = self._jobs[path] = _Job(key, path, plot_type)
+            if not inline:
+                block.refs += 1
+                args = (block.shm.name, block.size, plot_type, os.path.abspath(path), decimation)
+                try:
+                    future = self._pool().submit(_render_shared, *args)
+                except BrokenProcessPool:
+                    self._executor = None
+                    future = self._pool().submit(_render_shared, *args)
+        if inline:
+            try:
+                render(df, plot_type, path, decimation)
+            except Exception as exc:
+                self._finish(job, None, exc)
+                raise
+            self._finish(job, None, None)
+        else:
+            future.add_done_callback(lambda f: self._finish(job, data_key, f.exception()))
+        return path
+
+    def _fingerprint(self, df: pd.DataFrame) -> str:
+        key = id(df)
+        with self._lock:
+            cached = self._fingerprints.get(key)
+            if cached is not None and cached[0]() is df:
+                return cached[1]
+        # Hashed outside the lock; a concurrent submission of the same frame
+        # computes the same key, and the first one stored is kept.
+        data_key = fingerprint(df)
+
+        def forget(ref):
+            with self._lock:
+                if self._fingerprints.get(key, (None,))[0] is ref:
+                    del self._fingerprints[key]
+
+        with self._lock:
+            cached = self._fingerprints.get(key)
+            if cached is not None and cached[0]() is df:
+                return cached[1]
+            self._fingerprints[key] = (weakref.ref(df, forget), data_key)
+        return data_key
+
+    def _finish(self, job: _Job, data_key: str | None, error: BaseException | None) -> None:
+        with self._lock:
+            job.seconds = time.perf_counter() - job.submitted
+            job.status = "failed" if error is not None else "done"
+            job.error = f"{type(error).__name__}: {error}" if error is not None else None
+            self._stats["failed" if error is not None else "rendered"] += 1
+            block = self._blocks.get(data_key) if data_key else None
+            if block is not None:
+                block.refs -= 1
+                if block.refs <= 0:
+                    del self._blocks[data_key]
+                    block.free()
+        record_render(job.seconds, job.plot_type, job.status)
+        job.done.set()
+
+    def status(self, handle: str) -> dict:
+        with self._lock:
+            job = self._jobs.get(handle)
+            if job is not None:
+                return job.describe()
+        return {"handle": handle, "status": "done" if os.path.exists(handle) else "unknown"}
+
+    def wait(self, handle: str, timeout: float | None = None) -> dict:
+        with self._lock:
+            job = self._jobs.get(handle)
+        if job is not None:
+            job.done.wait(timeout)
+        return self.status(handle)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "pending": sum(j.status == "pending" for j in self._jobs.values()),
+                "shared_bytes": sum(b.size for b in self._blocks.values()),
+            }
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+render_pool = RenderPool()
+
+
+@instrument
+def plot_status(handle: str) -> dict:
+    """Report whether the plot ``handle`` returned by visualize_data is pending, done or failed."""
+    return render_pool.status(handle)
+
+
+@instrument
+def wait_for_plot(handle: str, timeout: float = 60.0) -> dict:
+    """Wait up to ``timeout`` seconds for the plot ``handle`` to finish and report its status."""
+    return render_pool.wait(handle, timeout)
+
+
+def render_stats() -> dict:
+    """Return counts of rendered, deduplicated, failed and pending plots."""
+    return render_pool.stats()
+
+
+__all__ = ["RenderPool", "fingerprint", "render_pool", "plot_status", "wait_for_plot", "render_stats"]
@@ -0,0 +1,216 @@
+"""Rule-based fast path in front of the triage agent.
+
+Requests such as "list buckets", "list fields of cpu" or "plot the last 6
+hours of temperature" are recognized with anchored patterns and answered by
+calling the tools directly, or handed straight to the agent that owns them,
+without the triage round-trip to the model. Anything that does not match a
+rule exactly, or whose handler declines, goes through ``triage_agent`` as
+before. Hit rate and latency per turn are recorded; the latency saved by a
+fast-path turn is estimated from the average duration of model turns.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import deque
+
+from . import common, metrics
+from .database_manager import (
+    influxDB_agent,
+    influx_list_buckets,
+    influx_list_fields,
+    influx_list_measurements,
+    influx_list_tags,
+    influx_query_store,
+    get_current_time,
+)
+from .data_specialist_agent import data_specialist_agent, visualize_data
+from .triage_agent import triage_agent
+
+try:
+    from config import ROUTER_ENABLED
+except ImportError:  # pragma: no cover - fallback for runtime usage
+    ROUTER_ENABLED = os.getenv("ROUTER_ENABLED", "true").lower() == "true"
+
+# Horizontal pixels requested from the server for fast-path plots.
+PLOT_WIDTH = 640
+
+_UNITS = {"m": "m", "min": "m", "minute": "m", "h": "h", "hour": "h", "d": "d", "day": "d"}
+_LIST = r"^(?:please\s+)?(?:list|show)(?:\s+me)?(?:\s+all)?(?:\s+the)?\s+"
+_OF = r"(?:\s+(?:of|in|for)(?:\s+measurement)?\s+(?P<measurement>[\w.-]+))?"
+
+
+class Route:
+    """A pattern and the handler answering the requests it matches.
+
+    ``handler`` receives the match groups and returns the reply text, or
+    ``None`` to leave the request to the triage agent. Routes with an
+    ``agent`` instead hand the request to that agent directly.
+    """
+
+    __slots__ = ("name", "pattern", "handler", "agent")
+
+    def __init__(self, name: str, pattern: str, handler=None, agent=None):
+        self.name = name
+        self.pattern = re.compile(pattern, re.IGNORECASE)
+        self.handler = handler
+        self.agent = agent
+
+
+def _bulleted(title: str, items: list) -> str:
+    if not items:
+        return f"No {title.lower()} found."
+    return f"{title}:\n" + "\n".join(f"- {item}" for item in items)
+
+
+def _fields(measurement=None):
+    return _bulleted(f"Fields of {measurement}" if measurement else "Fields", influx_list_fields(measurement))
+
+
+def _tags(measurement=None):
+    return _bulleted(f"Tags of {measurement}" if measurement else "Tags", influx_list_tags(measurement))
+
+
+def _plot(n, unit, field):
+    if field not in influx_list_fields():
+        return None
+    window = f"{int(n)}{_UNITS[unit.lower().rstrip('s')]}"
+    handle = f"last_{window}_{field}"
+    query = f'|> range(start: -{window}) |> filter(fn: (r) => r._field == "{field}")'
+    status = influx_query_store(query, handle=handle, plot_width=PLOT_WIDTH, shape="wide")
+    if not status.get("records"):
+        return f"No data for {field} in the last {window}."
+    path = visualize_data(handle, plot_type="line", background=False)
+    return f"Plotted {status['records']} points of {field} over the last {window} to {path} (dataset '{handle}')."
+
+
+ROUTES = [
+    Route("list_buckets", _LIST + r"buckets\??$", lambda: _bulleted("Buckets", influx_list_buckets())),
+    Route("list_measurements", _LIST + r"measurements\??$",
+          lambda: _bulleted("Measurements", influx_list_measurements())),
+    Route("list_fields", _LIST + r"fields" + _OF + r"\??$", _fields),
+    Route("list_tags", _LIST + r"tags" + _OF + r"\??$", _tags),
+    Route("plot_last",
+          r"^(?:please\s+)?(?:plot|chart|graph)(?:\s+the)?\s+(?:last|past)\s+(?P<n>\d+)\s*"
+          r"(?P<unit>m|mins?|minutes?|h|hours?|d|days?)\s+of\s+(?P<field>[\w.-]+)$",
+          _plot),
+    Route("current_time", r"^what(?:'s| is) the (?:current )?(?:utc )?time\??$",
+          lambda: f"The current UTC time is {get_current_time()}."),
+    Route("database", r"^(?:run|execute)\s+(?:this\s+)?flux\b|^(?:write|delete)\s+(?:a\s+)?(?:point|points|data)\b",
+          agent=influxDB_agent),
+    Route("data", r"^(?:describe|summari[sz]e)\s+(?:the\s+)?(?:dataset|data)\b", agent=data_specialist_agent),
+]
+
+
+class FastRouter:
+    """Dispatch requests matching a route and keep hit-rate and latency statistics."""
+
+    def __init__(self, routes: list | None = None, history: int = 100):
+        self.routes = ROUTES if routes is None else routes
+        self._lock = threading.Lock()
+        self._turns = deque(maxlen=history)
+        self._stats = {"turns": 0, "hits": 0, "misses": 0, "declined": 0, "errors": 0,
+                       "llm_seconds": 0.0, "fast_seconds": 0.0, "saved_seconds": 0.0}
+
+    def match(self, message: str):
+        """Return ``(route, groups)`` for the first route matching ``message``."""
+        text = " ".join(message.split())
+        for route in self.routes:
+            found = route.pattern.match(text)
+            if found:
+                return route, {k: v for k, v in found.groupdict().items() if v is not None}
+        return None, {}
+
+    def run(self, message: str, client=None, debug: bool = False, history: list | None = None,
+            max_turns: int | None = None, profile: bool = False) -> str:
+        """Answer ``message`` on the fast path if possible, otherwise via triage.
+
+        ``history`` holds the earlier messages of the conversation; it is sent
+        to the model and extended with this turn's messages. ``max_turns``
+        caps the model round-trips of the turn. The turn's timings are logged
+        by ``agents.metrics``; ``profile`` also captures it with cProfile.
+        """
+        with metrics.turn(profile=profile) as current:
+            reply, route_name = self._run(message, client, debug, history, max_turns)
+            current.fields["route"] = route_name or "triage"
+        return reply
+
+    def _run(self, message, client, debug, history, max_turns):
+        started = time.perf_counter()
+        route, groups = self.match(message) if ROUTER_ENABLED else (None, {})
+        reply, agent = None, triage_agent
+        if route is not None and route.agent is not None:
+            agent = route.agent
+        elif route is not None:
+            reply = self._answer(route, groups)
+        hit = route is not None and (route.agent is not None or reply is not None)
+        user = {"role": "user", "content": message}
+        if reply is None:
+            limits = {} if max_turns is None else {"max_turns": max_turns}
+            response = (client or common.client).run(
+                agent=agent, messages=[*(history or []), user], debug=debug, **limits
+            )
+            reply = response.messages[-1]["content"]
+            turn = [user, *response.messages]
+        else:
+            turn = [user, {"role": "assistant", "content": reply}]
+        if history is not None:
+            history.extend(turn)
+        route_name = route.name if hit else None
+        self._record(route_name, time.perf_counter() - started)
+        return reply, route_name
+
+    def _answer(self, route: Route, groups: dict):
+        try:
+            reply = route.handler(**groups)
+        except Exception:  # the model gets a chance to explain the failure
+            reply, key = None, "errors"
+        else:
+            key = "declined" if reply is None else None
+        if key is not None:
+            with self._lock:
+                self._stats[key] += 1
+        return reply
+
+    def _record(self, route_name: str | None, seconds: float) -> None:
+        with self._lock:
+            stats = self._stats
+            stats["turns"] += 1
+            saved = 0.0
+            if route_name is None:
+                stats["misses"] += 1
+                stats["llm_seconds"] += seconds
+            else:
+                stats["hits"] += 1
+                stats["fast_seconds"] += seconds
+                if stats["misses"]:
+                    saved = max(stats["llm_seconds"] / stats["misses"] - seconds, 0.0)
+                stats["saved_seconds"] += saved
+            self._turns.append({"route": route_name, "seconds": round(seconds, 4), "saved_seconds": round(saved, 4)})
+
+    def stats(self) -> dict:
+        """Return hit rate, latency totals and the most recent turns."""
+        with self._lock:
+            turns = self._stats["turns"]
+            return {
+                **self._stats,
+                "hit_rate": self._stats["hits"] / turns if turns else 0.0,
+                "recent": list(self._turns),
+            }
+
+
+router = FastRouter()
+
+
+def run_turn(message: str, debug: bool = False, profile: bool = False) -> str:
+    """Handle one user request through the fast-path router."""
+    return router.run(message, debug=debug, profile=profile)
+
+
+def router_stats() -> dict:
+    """Return the fast-path router's hit rate and latency statistics."""
+    return router.stats()
+
+
+__all__ = ["Route", "FastRouter", "ROUTES", "router", "run_turn", "router_stats"]
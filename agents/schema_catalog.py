@@ -0,0 +1,102 @@
+"""Memoized schema metadata (buckets, measurements, field and tag keys).
+
+Schema lookups such as ``schema.fieldKeys`` scan the bucket and can take
+seconds, yet the agent repeats them many times per conversation. The catalog
+keeps each answer for ``SCHEMA_CACHE_TTL`` seconds, lets concurrent callers
+of the same lookup share a single round-trip, and drops entries when a write
+adds a measurement, field or tag it has not seen. Empty answers are never
+kept so a freshly created series shows up on the next lookup.
+"""
+
+import os
+import threading
+import time
+
+try:
+    from config import SCHEMA_CACHE_TTL, SCHEMA_PREFETCH
+except ImportError:  # pragma: no cover - fallback for runtime usage
+    SCHEMA_CACHE_TTL = float(os.getenv("SCHEMA_CACHE_TTL", "300"))
+    SCHEMA_PREFETCH = os.getenv("SCHEMA_PREFETCH", "true").lower() == "true"
+
+
+class SchemaCatalog:
+    """TTL memo of schema lookups keyed by ``(kind, bucket, *scope)``."""
+
+    def __init__(self, ttl: float = SCHEMA_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._loading = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def peek(self, key: tuple):
+        """Return the cached value for ``key`` without loading it, or ``None``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                return None
+            return list(entry[0])
+
+    def get(self, key: tuple, loader):
+        """Return the value for ``key``, calling ``loader()`` on a miss.
+
+        Callers that miss while another thread is loading the same key wait
+        for that load instead of issuing their own query.
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] >= time.monotonic():
+                    self._stats["hits"] += 1
+                    return list(entry[0])
+                pending = self._loading.get(key)
+                if pending is None:
+                    self._stats["misses"] += 1
+                    pending = self._loading[key] = threading.Event()
+                    break
+            # If the other load fails or finds nothing, the next pass loads again.
+            pending.wait()
+        try:
+            value = list(loader())
+            if value and self.ttl > 0:
+                with self._lock:
+                    self._entries[key] = (value, time.monotonic() + self.ttl)
+            return list(value)
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            pending.set()
+
+    def invalidate(self, bucket: str | None = None, measurement: str | None = None, kinds: tuple | None = None) -> int:
+        """Drop entries of ``bucket`` (all buckets if ``None``), optionally limited
+        to one ``measurement`` and to the given ``kinds``. Returns the count dropped."""
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if (bucket is None or key[1] == bucket)
+                and (measurement is None or len(key) < 3 or key[2] == measurement)
+                and (kinds is None or key[0] in kinds)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self._stats["invalidations"] += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "ttl": self.ttl}
+
+
+schema_catalog = SchemaCatalog()
+
+
+def schema_cache_stats() -> dict:
+    """Return hit/miss/invalidation counters of the schema catalog."""
+    return schema_catalog.stats()
+
+
+__all__ = ["SchemaCatalog", "schema_catalog", "schema_cache_stats", "SCHEMA_PREFETCH"]
@@ -0,0 +1,122 @@
+"""Isolated conversations for serving many users from one process.
+
+Every session has its own dataset store and message history. A turn runs
+with the session's store made active through ``use_store``, so the agents'
+tools read and write only that session's datasets, while the pooled InfluxDB
+client, the query cache and the schema catalog stay shared. Turns of one
+session run one after another; idle sessions expire after
+``SESSION_IDLE_SECONDS``. A turn that calls ``ask_user`` ends there and
+replies with the question, so the next message of the session answers it.
+"""
+
+import os
+import threading
+import time
+import uuid
+
+from .data_store import DATA_STORE_COMPACT, DATA_STORE_SPILL_DIR, DataStore, use_store
+from .prompt import QuestionForUser, defer_questions
+from .router import router
+
+try:
+    from config import SESSION_STORE_MAX_BYTES, SESSION_IDLE_SECONDS, MAX_SESSIONS
+except ImportError:  # pragma: no cover - fallback for runtime usage
+    SESSION_STORE_MAX_BYTES = int(os.getenv("SESSION_STORE_MAX_BYTES", str(128 * 1024 * 1024)))
+    SESSION_IDLE_SECONDS = float(os.getenv("SESSION_IDLE_SECONDS", "1800"))
+    MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "256"))
+
+
+class Session:
+    """One conversation: its dataset store, message history and turn lock."""
+
+    __slots__ = ("id", "store", "history", "lock", "created", "last_used", "turns")
+
+    def __init__(self, session_id: str, store: DataStore):
+        self.id = session_id
+        self.store = store
+        self.history = []
+        self.lock = threading.Lock()
+        self.created = self.last_used = time.monotonic()
+        self.turns = 0
+
+    def describe(self) -> dict:
+        return {
+            "session_id": self.id,
+            "turns": self.turns,
+            "messages": len(self.history),
+            "datasets": self.store.describe(),
+            "idle_seconds": round(time.monotonic() - self.last_used, 1),
+        }
+
+
+class SessionManager:
+    """Create, look up and expire sessions and run their turns."""
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, idle_seconds: float = SESSION_IDLE_SECONDS,
+                 store_max_bytes: int = SESSION_STORE_MAX_BYTES):
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self.store_max_bytes = store_max_bytes
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def create(self) -> Session:
+        """Start a session with an empty dataset store."""
+        self.expire()
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                raise RuntimeError(f"Too many sessions (limit {self.max_sessions}).")
+            store = DataStore(
+                max_bytes=self.store_max_bytes,
+                spill_dir=DATA_STORE_SPILL_DIR,
+                compact=DATA_STORE_COMPACT,
+            )
+            session = Session(uuid.uuid4().hex, store)
+            self._sessions[session.id] = session
+            return session
+
+    def get(self, session_id: str) -> Session | None:
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def close(self, session_id: str) -> bool:
+        """End a session and free its datasets."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is not None:
+            session.store.clear()
+        return session is not None
+
+    def expire(self) -> int:
+        """Close sessions idle for longer than ``idle_seconds``."""
+        cutoff = time.monotonic() - self.idle_seconds
+        with self._lock:
+            idle = [s.id for s in self._sessions.values() if s.last_used < cutoff and not s.lock.locked()]
+        return sum(self.close(session_id) for session_id in idle)
+
+    def run_turn(self, session: Session, message: str, client=None, max_turns: int | None = None,
+                 profile: bool = False) -> str:
+        """Answer ``message`` within ``session`` (blocking; call from a worker thread)."""
+        with session.lock, use_store(session.store), defer_questions():
+            session.last_used = time.monotonic()
+            try:
+                reply = router.run(message, client=client, history=session.history, max_turns=max_turns,
+                                   profile=profile)
+            except QuestionForUser as asked:
+                reply = asked.question
+                session.history.extend([{"role": "user", "content": message}, {"role": "assistant", "content": reply}])
+            session.turns += 1
+            session.last_used = time.monotonic()
+            return reply
+
+    def stats(self) -> dict:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return {
+            "sessions": len(sessions),
+            "turns": sum(s.turns for s in sessions),
+            "store_bytes": sum(s.store.stats()["bytes"] for s in sessions),
+        }
+
+
+__all__ = ["Session", "SessionManager"]
@@ -0,0 +1,166 @@
+"""Token budget for the tool results sent to the model.
+
+``TieredSwarm`` passes every tool result through ``fit_to_budget`` before it
+becomes a message. A result whose text would exceed
+``TOOL_OUTPUT_MAX_TOKENS`` (estimated from a sample at four bytes per
+token) is not serialized. Tabular results (records, column dicts,
+DataFrames and lists of values) are stored in the data store and replaced
+by ``summarize``: the row count, time span, per-field statistics, tag
+values, a few sample rows and the handle of the stored data. Other results
+are truncated. Set ``TOOL_OUTPUT_MAX_TOKENS = 0`` to send every result in
+full.
+"""
+
+import itertools
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .data_store import store_cached_data
+
+try:
+    from config import TOOL_OUTPUT_MAX_TOKENS
+except ImportError:  # pragma: no cover - fallback for runtime usage
+    TOOL_OUTPUT_MAX_TOKENS = int(os.getenv("TOOL_OUTPUT_MAX_TOKENS", "2000"))
+
+BYTES_PER_TOKEN = 4
+SAMPLE_ROWS = 5
+MAX_FIELDS = 50
+MAX_TAG_VALUES = 5
+PERCENTILES = (0.05, 0.5, 0.95)
+
+_SIZE_SAMPLE = 100
+_TIME_COLUMNS = ("_time", "time")
+_META_COLUMNS = {"result", "table"}
+_STAT_NAMES = {"5%": "p5", "50%": "p50", "95%": "p95"}
+_handles = itertools.count(1)
+
+
+def _is_columns(data) -> bool:
+    """Whether ``data`` is a dict of equally long columns (``output="columns"``)."""
+    if not isinstance(data, dict) or not data:
+        return False
+    columns = list(data.values())
+    if not all(isinstance(c, (list, tuple, np.ndarray, pd.Series, pd.Index, pd.api.extensions.ExtensionArray))
+               for c in columns):
+        return False
+    return len({len(c) for c in columns}) == 1
+
+
+def _as_frame(data) -> pd.DataFrame | None:
+    """Return tabular ``data`` as a DataFrame, or ``None`` if it is not tabular."""
+    if isinstance(data, pd.DataFrame):
+        return data
+    if _is_columns(data):
+        return pd.DataFrame(data)
+    if isinstance(data, (list, tuple)) and data:
+        if all(isinstance(item, dict) for item in data[:_SIZE_SAMPLE]):
+            return pd.DataFrame.from_records(data)
+        if all(not isinstance(item, (dict, list, tuple)) for item in data[:_SIZE_SAMPLE]):
+            return pd.DataFrame({"value": list(data)})
+    return None
+
+
+def estimate_tokens(data) -> int:
+    """Estimate the tokens of ``data`` as text, extrapolating from a sample of rows."""
+    if isinstance(data, pd.DataFrame) or _is_columns(data):
+        frame = _as_frame(data)
+        if frame.empty:
+            return len(str(list(frame.columns))) // BYTES_PER_TOKEN
+        sample = frame.iloc[:_SIZE_SAMPLE]
+        size = len(sample.to_json(orient="records", date_format="iso")) * len(frame) / len(sample)
+    elif isinstance(data, (list, tuple)) and len(data) > _SIZE_SAMPLE:
+        size = len(str(data[:_SIZE_SAMPLE])) * len(data) / _SIZE_SAMPLE
+    else:
+        size = len(str(data))
+    return int(size // BYTES_PER_TOKEN)
+
+
+def _number(value):
+    value = float(value)
+    return None if np.isnan(value) else round(value, 6)
+
+
+def _time_span(df: pd.DataFrame) -> dict | None:
+    column = next((c for c in _TIME_COLUMNS if c in df.columns), None)
+    if column is None or df.empty:
+        return None
+    times = pd.to_datetime(df[column], utc=True, errors="coerce")
+    start, end = times.min(), times.max()
+    if pd.isna(start):
+        return None
+    return {"column": column, "start": start.isoformat(), "end": end.isoformat()}
+
+
+def _field_stats(df: pd.DataFrame) -> pd.DataFrame | None:
+    """Per-field statistics: grouped by ``_field`` for long results, per column otherwise."""
+    if "_field" in df.columns and "_value" in df.columns:
+        values = pd.to_numeric(df["_value"], errors="coerce")
+        if values.notna().any():
+            return values.groupby(df["_field"], observed=True).describe(percentiles=list(PERCENTILES))
+        return None
+    numeric = df.select_dtypes(include="number").drop(columns=list(_META_COLUMNS), errors="ignore")
+    if numeric.empty:
+        return None
+    return numeric.describe(percentiles=list(PERCENTILES)).T
+
+
+def summarize(df: pd.DataFrame, handle: str) -> dict:
+    """Describe ``df`` in a size independent of its row count."""
+    summary = {"handle": handle, "rows": len(df), "columns": [str(c) for c in df.columns]}
+    span = _time_span(df)
+    if span is not None:
+        summary["time_span"] = span
+    stats = _field_stats(df)
+    if stats is not None and len(stats):
+        summary["fields"] = {
+            str(name): {_STAT_NAMES.get(k, k): _number(v) for k, v in row.items()}
+            for name, row in stats.head(MAX_FIELDS).iterrows()
+        }
+        if len(stats) > MAX_FIELDS:
+            summary["fields_omitted"] = len(stats) - MAX_FIELDS
+    tags = {}
+    for column in df.columns:
+        if column in _META_COLUMNS or column in _TIME_COLUMNS or column == "_value":
+            continue
+        series = df[column]
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+            continue
+        values = series.dropna().unique()
+        tags[str(column)] = {"distinct": len(values), "values": [str(v) for v in values[:MAX_TAG_VALUES]]}
+    if tags:
+        summary["tags"] = tags
+    if len(df):
+        rows = np.unique(np.linspace(0, len(df) - 1, min(SAMPLE_ROWS, len(df))).astype(int))
+        summary["sample"] = json.loads(df.iloc[rows].to_json(orient="records", date_format="iso"))
+    return summary
+
+
+def fit_to_budget(result, tool: str | None = None, budget: int | None = None):
+    """Return ``result``, or a summary of it if its text would exceed ``budget`` tokens."""
+    budget = TOOL_OUTPUT_MAX_TOKENS if budget is None else budget
+    if not budget or budget <= 0 or isinstance(result, str) and len(result) <= budget * BYTES_PER_TOKEN:
+        return result
+    if isinstance(result, dict) and "result" in result and _as_frame(result["result"]) is not None:
+        # Downsampled queries wrap their rows: keep the description, fit the rows.
+        inner = fit_to_budget(result["result"], tool, budget)
+        return result if inner is result["result"] else {**result, "result": inner}
+    tokens = estimate_tokens(result)
+    if tokens <= budget:
+        return result
+    frame = _as_frame(result)
+    if frame is None:
+        text, limit = str(result), budget * BYTES_PER_TOKEN
+        return f"{text[:limit]} ... [truncated {len(text) - limit} characters; ask for less data]"
+    handle = f"{tool or 'result'}_{next(_handles)}"
+    store_cached_data(frame, handle)
+    return {
+        "status": "summarized",
+        "reason": f"about {tokens} tokens, over the budget of {budget}; the full result is stored",
+        **summarize(frame, handle),
+    }
+
+
+__all__ = ["TOOL_OUTPUT_MAX_TOKENS", "estimate_tokens", "summarize", "fit_to_budget"]
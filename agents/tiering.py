@@ -0,0 +1,130 @@
+"""Per-agent model tiers with escalation on failed tool calls.
+
+Each agent runs on the model of its tier: a small ``fast`` model for triage
+and clarification, the ``standard`` model for Flux generation and analysis.
+``TieredSwarm`` times every completion and, when a tool call fails (the
+model names an unknown tool, its arguments do not parse as JSON or the tool
+raises), answers the call with the error and switches the rest of the run
+to the ``escalation`` tier. Tool results over the token budget reach the
+model as summaries (see ``agents.summaries``).
+"""
+
+import json
+import logging
+import threading
+import time
+
+from swarm import Agent, Response, Swarm
+from swarm.types import Result
+
+from .metrics import record_handoff, record_llm
+from .prompt import QuestionForUser
+from .summaries import fit_to_budget
+
+logger = logging.getLogger(__name__)
+
+
+class TieredSwarm(Swarm):
+    """Swarm client that escalates to a larger model after tool-call failures."""
+
+    def __init__(self, client=None, escalation_model: str | None = None, max_concurrent: int | None = None):
+        super().__init__(client)
+        self.escalation_model = escalation_model
+        # Bounds the completions in flight across all threads and sessions.
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._escalations = 0
+
+    @property
+    def escalated(self) -> bool:
+        return getattr(self._local, "escalated", False)
+
+    def run(self, agent, messages, *args, **kwargs):
+        self._local.escalated = False
+        return super().run(agent, messages, *args, **kwargs)
+
+    def get_chat_completion(self, agent, history, context_variables, model_override, stream, debug):
+        if self.escalated and self.escalation_model and not model_override:
+            model_override = self.escalation_model
+        model = model_override or agent.model
+        self._local.agent = agent.name
+        if self._slots is not None:
+            self._slots.acquire()
+        started = time.perf_counter()
+        completion = None
+        try:
+            completion = super().get_chat_completion(agent, history, context_variables, model_override, stream, debug)
+            return completion
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+            seconds = time.perf_counter() - started
+            self._record(agent.name, model, seconds)
+            usage = getattr(completion, "usage", None)
+            record_llm(agent.name, model, seconds,
+                       getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None))
+            logger.info("completion agent=%s model=%s seconds=%.3f escalated=%s",
+                        agent.name, model, seconds, self.escalated)
+
+    def handle_tool_calls(self, tool_calls, functions, context_variables, debug):
+        """Run each tool call on its own so that one failure does not lose the others."""
+        combined = Response(messages=[], agent=None, context_variables={})
+        for tool_call in tool_calls:
+            name = tool_call.function.name
+            self._local.tool = name
+            try:
+                partial = super().handle_tool_calls([tool_call], functions, context_variables, debug)
+            except QuestionForUser:  # ends the turn; not a failure of the model
+                raise
+            except Exception as exc:  # reported back to the model, which retries
+                kind = "unparsable arguments" if isinstance(exc, json.JSONDecodeError) else type(exc).__name__
+                self._escalate(name, kind)
+                combined.messages.append({
+                    "role": "tool",
+                    "tool_call_id": tool_call.id,
+                    "tool_name": name,
+                    "content": f"Error: {name} failed ({kind}): {exc}",
+                })
+                continue
+            if any(str(m.get("content", "")).startswith(f"Error: Tool {name} not found") for m in partial.messages):
+                self._escalate(name, "unknown tool")
+            combined.messages.extend(partial.messages)
+            combined.context_variables.update(partial.context_variables)
+            if partial.agent:
+                record_handoff(getattr(self._local, "agent", None), partial.agent.name)
+                combined.agent = partial.agent
+        return combined
+
+    def handle_function_result(self, result, debug):
+        if not isinstance(result, (Agent, Result)):
+            result = fit_to_budget(result, getattr(self._local, "tool", None))
+        return super().handle_function_result(result, debug)
+
+    def _escalate(self, tool: str, reason: str) -> None:
+        if not self.escalated:
+            logger.info("escalating agent=%s to model=%s after %s in %s",
+                        getattr(self._local, "agent", None), self.escalation_model, reason, tool)
+            with self._lock:
+                self._escalations += 1
+        self._local.escalated = True
+
+    def _record(self, agent: str, model: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._calls.setdefault((agent, model), {"calls": 0, "seconds": 0.0})
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+
+    def stats(self) -> dict:
+        """Return call counts and latency per agent and model, plus escalations."""
+        with self._lock:
+            calls = [
+                {"agent": agent, "model": model, "calls": e["calls"],
+                 "seconds": round(e["seconds"], 3), "mean_seconds": round(e["seconds"] / e["calls"], 3)}
+                for (agent, model), e in self._calls.items()
+            ]
+            return {"calls": calls, "escalations": self._escalations}
+
+
+__all__ = ["TieredSwarm"]
@@ -1,25 +1,30 @@
 from swarm import Agent
-from .common import MODEL_NAME_1
+from .common import model_for
 from .database_manager import influxDB_agent
 from .data_specialist_agent import data_specialist_agent
 from .clarifying_agent import clarifying_agent
+from .metrics import instrument
 
 
+@instrument
 def transfer_back_to_triage():
     """Call this function if a user is asking about a topic that is not handled by the current agent."""
     return triage_agent
 
 
+@instrument
 def transfer_to_database_manager():
     """Transfer the conversation to the InfluxDB management agent."""
     return influxDB_agent
 
 
+@instrument
 def transfer_to_data_specialist():
     """Transfer the conversation to the Data Specialist agent."""
     return data_specialist_agent
 
 
+@instrument
 def transfer_to_clarifying_agent():
     """Transfer the conversation to the Clarifying agent."""
     return clarifying_agent
@@ -33,7 +38,7 @@ triage_agent = Agent(
         "Always use the database manager agent to fetch data before sending the conversation to the data specialist. "
         "Only transfer to the data specialist if data has been successfully retrieved. If no data is returned, inform the user instead."
     ),
-    model=MODEL_NAME_1,
+    model=model_for("triage"),
 )
 
 triage_agent.functions = [
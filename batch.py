@@ -0,0 +1,164 @@
+"""Run a JSONL file of requests through the agents without a terminal.
+
+Each input line is one request::
+
+    {"id": "daily-cpu", "content": "Plot the last 24 hours of usage_user", "answers": ["cpu-total"]}
+
+``id`` (or ``request_id``) names the request and ``content`` (or ``message``
+or ``body``) is the user message. ``ask_user`` is answered from ``answers``:
+a list is consumed in order, a mapping answers questions containing one of
+its keys. Once the answers run out the clarifying agent is told there are no
+further requests.
+
+Requests run on ``--workers`` threads, each in its own session with its own
+dataset store and history. Every finished request is appended to the output
+JSONL at once with its reply, the plot files it produced and its timing, so
+a rerun after a crash skips the requests already answered::
+
+    python batch.py reports.jsonl --output results.jsonl --workers 8
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from agents import close_clients, wait_for_plot
+from agents.clarifying_agent import use_answers
+from agents.sessions import SessionManager
+
+try:
+    from config import BATCH_WORKERS, BATCH_MAX_TURNS
+except ImportError:  # pragma: no cover - fallback for runtime usage
+    BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+    BATCH_MAX_TURNS = int(os.getenv("BATCH_MAX_TURNS", "20"))
+
+NO_FURTHER_REQUESTS = "No further requests."
+
+_PLOT_PATH = re.compile(r"[\w./\\-]+\.png\b")
+
+
+class Answers:
+    """Answer ``ask_user`` questions from a request record."""
+
+    def __init__(self, answers=None):
+        self._answers = answers if isinstance(answers, dict) else list(answers or [])
+        self.asked = []
+
+    def __call__(self, question: str) -> str:
+        if isinstance(self._answers, dict):
+            lowered = question.lower()
+            answer = next((v for k, v in self._answers.items() if k.lower() in lowered), NO_FURTHER_REQUESTS)
+        else:
+            answer = self._answers.pop(0) if self._answers else NO_FURTHER_REQUESTS
+        self.asked.append({"question": question, "answer": answer})
+        return answer
+
+
+def read_requests(path: str) -> list:
+    """Return the request records of ``path``, numbering those without an id."""
+    requests = []
+    with open(path, encoding="utf-8") as handle:
+        for number, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            record["id"] = str(record.get("id") or record.get("request_id") or f"line-{number}")
+            requests.append(record)
+    return requests
+
+
+def completed_ids(path: str) -> set:
+    """Return the ids already answered successfully in the output file ``path``."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                result = json.loads(line)
+            except ValueError:  # a line cut short by a crash
+                continue
+            if result.get("status") == "ok":
+                done.add(result["id"])
+    return done
+
+
+def _plots(messages: list) -> list:
+    paths = []
+    for message in messages:
+        for path in _PLOT_PATH.findall(str(message.get("content") or "")):
+            if path not in paths and wait_for_plot(path)["status"] == "done":
+                paths.append(path)
+    return paths
+
+
+def run_request(record: dict, sessions: SessionManager, client=None, max_turns: int = BATCH_MAX_TURNS) -> dict:
+    """Answer one request record in a fresh session and return its result."""
+    content = record.get("content") or record.get("message") or record.get("body") or ""
+    answers = Answers(record.get("answers"))
+    session = sessions.create()
+    started = time.perf_counter()
+    result = {"id": record["id"]}
+    try:
+        with use_answers(answers):
+            reply = sessions.run_turn(session, content, client=client, max_turns=max_turns,
+                                      profile=bool(record.get("profile")))
+        result.update(status="ok", reply=reply, plots=_plots(session.history))
+    except Exception as exc:  # recorded, the rest of the batch continues
+        result.update(status="error", error=f"{type(exc).__name__}: {exc}")
+    finally:
+        sessions.close(session.id)
+    result.update(
+        questions=answers.asked,
+        seconds=round(time.perf_counter() - started, 3),
+        finished=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    )
+    return result
+
+
+def run_batch(input_path: str, output_path: str, workers: int = BATCH_WORKERS, client=None,
+              max_turns: int = BATCH_MAX_TURNS) -> dict:
+    """Answer every request of ``input_path`` not yet answered in ``output_path``.
+
+    Results are appended to ``output_path`` as they finish. Returns counts
+    and the wall time of the run.
+    """
+    requests = read_requests(input_path)
+    done = completed_ids(output_path)
+    pending = [r for r in requests if r["id"] not in done]
+    sessions = SessionManager(max_sessions=max(workers, 1))
+    summary = {"requests": len(requests), "skipped": len(requests) - len(pending), "ok": 0, "error": 0}
+    lock = threading.Lock()
+    started = time.perf_counter()
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_request, record, sessions, client, max_turns) for record in pending]
+        for future in as_completed(futures):
+            result = future.result()
+            with lock:
+                out.write(json.dumps(result, default=str) + "\n")
+                out.flush()
+                os.fsync(out.fileno())
+                summary[result["status"]] += 1
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a JSONL file of requests through the agents")
+    parser.add_argument("input", help="JSONL file with one request per line")
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSONL file the results are appended to")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--max-turns", type=int, default=BATCH_MAX_TURNS, help="model round-trips per request")
+    args = parser.parse_args()
+    try:
+        print(json.dumps(run_batch(args.input, args.output, args.workers, max_turns=args.max_turns)))
+    finally:
+        close_clients()
+
+
+if __name__ == "__main__":
+    main()
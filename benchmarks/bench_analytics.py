@@ -0,0 +1,96 @@
+"""Benchmark the data specialist's analysis tools on multi-million-row datasets.
+
+Run from the repository root::
+
+    python benchmarks/bench_analytics.py --sizes 1000000 5000000 --series 20
+
+Each size is a long-format dataset (``_time``, ``_value``, ``_field``,
+``host``) of ``--series`` series at one point per second, stored once. Each
+line of output is a JSON object with the tool, row count, fastest time in
+seconds and rows per second.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.data_specialist_agent import (  # noqa: E402
+    aggregate_by_tag,
+    correlate_series,
+    detect_anomalies,
+    rate_data,
+    resample_data,
+    rolling_data,
+)
+from agents.data_store import DataStore, store_cached_data, use_store  # noqa: E402
+
+CASES = [
+    ("resample_data", lambda: resample_data("1m", handle="bench")),
+    ("rolling_data_rows", lambda: rolling_data("60", handle="bench")),
+    ("rolling_data_time", lambda: rolling_data("5m", handle="bench")),
+    ("rate_data", lambda: rate_data("1s", handle="bench")),
+    ("detect_anomalies_zscore", lambda: detect_anomalies("zscore", handle="bench")),
+    ("detect_anomalies_iqr", lambda: detect_anomalies("iqr", handle="bench")),
+    ("correlate_series", lambda: correlate_series(handle="bench")),
+    ("aggregate_by_tag", lambda: aggregate_by_tag(["host"], handle="bench")),
+]
+
+
+def _dataset(rows: int, series: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    length = rows // series
+    times = pd.date_range("2024-01-01", periods=length, freq="s", tz="UTC")
+    phase = np.repeat(np.arange(series), length)
+    values = np.sin(np.tile(np.arange(length), series) / 600 + phase) + rng.normal(0, 0.1, length * series)
+    return pd.DataFrame({
+        "_time": np.tile(times, series),
+        "_value": values,
+        "_field": pd.Categorical(["value"] * (length * series)),
+        "host": pd.Categorical(np.repeat([f"h{i}" for i in range(series)], length)),
+    })
+
+
+def run(sizes, series: int, repeat: int) -> list:
+    results = []
+    for rows in sizes:
+        # A store large enough for the dataset and every result of this size.
+        with use_store(DataStore(max_bytes=1 << 40)):
+            df = _dataset(rows, series)
+            store_cached_data(df, "bench")
+            for name, call in CASES:
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    call()
+                    timings.append(time.perf_counter() - start)
+                best = min(timings)
+                results.append({
+                    "benchmark": "analytics",
+                    "tool": name,
+                    "rows": len(df),
+                    "series": series,
+                    "seconds": round(best, 4),
+                    "rows_per_second": round(len(df) / best),
+                })
+                print(json.dumps(results[-1]), flush=True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**6, 5 * 10**6])
+    parser.add_argument("--series", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.series, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
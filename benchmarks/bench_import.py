@@ -0,0 +1,81 @@
+"""Measure the import cost of the agents package with ``python -X importtime``.
+
+Run from the repository root::
+
+    python benchmarks/bench_import.py --budget-ms 20
+
+Each statement runs in a fresh interpreter ``--repeat`` times. Prints one
+JSON object per statement with the fastest import time (without the
+interpreter's own startup imports), the slowest modules and which heavy
+dependencies were loaded. Exits with status 1 when ``import agents`` loads a
+heavy dependency or exceeds ``--budget-ms``.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+HEAVY = ["pandas", "numpy", "matplotlib", "influxdb_client", "openai", "swarm", "pyarrow"]
+
+STATEMENTS = [
+    "import agents",
+    "import main",
+    "from agents import run_turn",
+]
+
+
+def measure(statement: str, startup: frozenset = frozenset()) -> dict:
+    """Import ``statement`` in a fresh interpreter and parse its ``-X importtime`` report.
+
+    Modules named in ``startup`` (those imported by the bare interpreter) are
+    left out of the total.
+    """
+    probe = f"{statement}; import sys; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, _, fields = line.partition(":")
+        own, cumulative, name = fields.split("|")
+        # Top-level imports only; nested ones are part of their cumulative time.
+        if not name[1:].startswith(" ") and name.strip() not in startup:
+            modules[name.strip()] = int(cumulative) / 1000
+    loaded = result.stdout.strip()
+    return {"total_ms": sum(modules.values()), "modules": modules, "heavy": loaded.split(",") if loaded else []}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=20.0, help="allowed time for 'import agents'")
+    parser.add_argument("--top", type=int, default=5, help="slowest top-level imports to list")
+    args = parser.parse_args()
+
+    startup = frozenset(measure("pass")["modules"])
+    failed = False
+    for statement in STATEMENTS:
+        runs = [measure(statement, startup) for _ in range(args.repeat)]
+        best = min(runs, key=lambda r: r["total_ms"])
+        slowest = sorted(best["modules"].items(), key=lambda item: -item[1])[: args.top]
+        print(json.dumps({
+            "benchmark": "import_time",
+            "statement": statement,
+            "total_ms": round(best["total_ms"], 1),
+            "slowest": {name: round(ms, 1) for name, ms in slowest},
+            "heavy_modules": best["heavy"],
+        }))
+        if statement == "import agents" and (best["heavy"] or best["total_ms"] > args.budget_ms):
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
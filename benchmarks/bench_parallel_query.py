@@ -0,0 +1,70 @@
+"""Benchmark ``influx_query`` with parallel time-range fan-out.
+
+Starts the stand-in InfluxDB server in a separate process and compares the
+single-request path (``parallel=1``) with several fan-out widths::
+
+    python benchmarks/bench_parallel_query.py --range 6h --series 10 --row-cost-us 2
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+sys.path[:0] = [HERE, os.path.dirname(HERE)]
+
+from influx_stub import spawn  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--range", default="6h", help="relative range queried, e.g. 6h")
+    parser.add_argument("--series", type=int, default=10)
+    parser.add_argument("--interval", default="1s")
+    parser.add_argument("--row-cost-us", type=float, default=2.0)
+    parser.add_argument("--parallel", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--output", default="columns", choices=["records", "columns", "dataframe"])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    process, url = spawn(
+        "--series", str(args.series),
+        "--interval", args.interval,
+        "--row-cost-us", str(args.row_cost_us),
+    )
+    try:
+        os.environ.update({
+            "INFLUX_URL": url,
+            "INFLUX_TOKEN": "bench",
+            "INFLUX_ORG": "bench",
+            "INFLUX_BUCKET": "bench",
+            "MEASUREMENT": "m",
+            "INFLUX_MAX_CONCURRENT_QUERIES": str(max(args.parallel)),
+        })
+        # Imported only now: the connection settings are read at import time.
+        from agents.database_manager import influx_query
+
+        query = f'from(bucket: "bench") |> range(start: -{args.range})'
+        for parallel in args.parallel:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                result = influx_query(query, output=args.output, use_cache=False, parallel=parallel)
+                timings.append(time.perf_counter() - start)
+            rows = len(result) if args.output != "columns" else len(next(iter(result.values()), []))
+            print(json.dumps({
+                "benchmark": "influx_query_parallel",
+                "output": args.output,
+                "parallel": parallel,
+                "rows": rows,
+                "seconds": min(timings),
+            }))
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark several charts of one dataset rendered inline and in the render pool.
+
+Run from the repository root::
+
+    python benchmarks/bench_render_pool.py --points 1000000 --workers 4
+
+Prints the wall time of rendering line, scatter, histogram and default plots
+one after another in this process and through ``RenderPool`` (with warm
+workers), as JSON objects.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.plotting import render  # noqa: E402
+from agents.render_pool import RenderPool  # noqa: E402
+
+PLOT_TYPES = ["line", "scatter", "hist", "default"]
+
+
+def _dataset(points: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    x = np.arange(points, dtype=np.float64)
+    return pd.DataFrame({"x": x, "y": np.sin(x / 500) + rng.normal(0, 0.1, points)})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    df = _dataset(args.points)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        started = time.perf_counter()
+        for plot_type in PLOT_TYPES:
+            render(df, plot_type, os.path.join(workdir, f"inline_{plot_type}.png"))
+        inline = time.perf_counter() - started
+
+        pool = RenderPool(workers=args.workers, directory=workdir)
+        try:
+            warmup = [pool.submit(df.head(n + 3), "hist") for n in range(args.workers)]  # starts the workers
+            for handle in warmup:
+                pool.wait(handle, timeout=120)
+            started = time.perf_counter()
+            handles = [pool.submit(df, plot_type) for plot_type in PLOT_TYPES]
+            returned = time.perf_counter() - started
+            statuses = [pool.wait(handle, timeout=600)["status"] for handle in handles]
+            background = time.perf_counter() - started
+        finally:
+            pool.close()
+
+    for mode, seconds in (("inline", inline), ("pool", background)):
+        print(json.dumps({
+            "benchmark": "render_pool",
+            "mode": mode,
+            "points": args.points,
+            "charts": len(PLOT_TYPES),
+            "seconds": round(seconds, 4),
+            **({"handles_returned_seconds": round(returned, 4), "statuses": statuses} if mode == "pool" else {}),
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Load-test the session server with a scripted model and a stand-in InfluxDB.
+
+Starts ``benchmarks/influx_stub.py`` in a separate process and ``AgentServer``
+in this one, with a fake OpenAI client whose completions take ``--llm-ms``.
+Each simulated user opens a session and sends ``--turns`` requests; every
+turn goes triage -> database agent -> ``influx_query_store`` -> answer, so it
+makes three completions and one InfluxDB query. Prints sessions/sec and the
+p50/p99 turn latency::
+
+    python benchmarks/bench_sessions.py --sessions 64 --concurrency 16 --llm-ms 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+sys.path[:0] = [HERE, os.path.dirname(HERE)]
+
+from influx_stub import spawn  # noqa: E402
+from llm_stub import ScriptedOpenAI, store_script  # noqa: E402
+
+
+async def _request(host, port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, content = raw.partition(b"\r\n\r\n")
+    status = int(head.split()[1])
+    if status >= 400:
+        raise RuntimeError(f"{method} {path} -> {status}: {content.decode()}")
+    return json.loads(content)
+
+
+async def _user(host, port, turns, latencies):
+    session = (await _request(host, port, "POST", "/sessions"))["session_id"]
+    for n in range(turns):
+        started = time.perf_counter()
+        await _request(host, port, "POST", f"/sessions/{session}/messages",
+                       {"content": f"Store the recent data of host h{n}"})
+        latencies.append(time.perf_counter() - started)
+    await _request(host, port, "DELETE", f"/sessions/{session}")
+
+
+async def _load(server, sessions, concurrency, turns):
+    ready = asyncio.get_running_loop().create_future()
+    serving = asyncio.create_task(server.serve("127.0.0.1", 0, ready=ready.set_result))
+    host, port = await ready
+    latencies = []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def limited():
+        async with gate:
+            await _user(host, port, turns, latencies)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(limited() for _ in range(sessions)))
+    elapsed = time.perf_counter() - started
+    stats = await _request(host, port, "GET", "/stats")
+    serving.cancel()
+    return elapsed, latencies, stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16, help="users active at the same time")
+    parser.add_argument("--turns", type=int, default=3, help="turns per session")
+    parser.add_argument("--llm-ms", type=float, default=50.0, help="latency of each fake completion")
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument("--range", default="5m", help="relative range each turn queries")
+    parser.add_argument("--series", type=int, default=10)
+    parser.add_argument("--row-cost-us", type=float, default=1.0)
+    args = parser.parse_args()
+
+    process, url = spawn("--series", str(args.series), "--row-cost-us", str(args.row_cost_us))
+    try:
+        os.environ.update({
+            "INFLUX_URL": url,
+            "INFLUX_TOKEN": "bench",
+            "INFLUX_ORG": "bench",
+            "INFLUX_BUCKET": "bench",
+            "MEASUREMENT": "m",
+            "ROUTER_ENABLED": "false",
+        })
+        # Imported only now: the connection settings are read at import time.
+        from agents.tiering import TieredSwarm
+        from server import AgentServer
+
+        llm = ScriptedOpenAI(store_script(f"-{args.range}", hosts=10), args.llm_ms / 1000)
+        server = AgentServer(
+            max_turns=args.concurrency,
+            llm_client=TieredSwarm(llm, max_concurrent=args.llm_concurrency),
+        )
+        try:
+            elapsed, latencies, stats = asyncio.run(_load(server, args.sessions, args.concurrency, args.turns))
+        finally:
+            server.close()
+        print(json.dumps({
+            "benchmark": "sessions",
+            "sessions": args.sessions,
+            "concurrency": args.concurrency,
+            "turns": len(latencies),
+            "completions": llm.completions.calls,
+            "influx_pool": stats["influx"],
+            "seconds": round(elapsed, 3),
+            "sessions_per_second": round(args.sessions / elapsed, 2),
+            "turn_p50_seconds": round(float(np.percentile(latencies, 50)), 4),
+            "turn_p99_seconds": round(float(np.percentile(latencies, 99)), 4),
+        }))
+    finally:
+        process.terminate()
+
+
+if __name__ == "__main__":
+    main()
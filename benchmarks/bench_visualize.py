@@ -0,0 +1,77 @@
+"""Benchmark ``visualize_data`` render time against the number of points.
+
+Run from the repository root::
+
+    python benchmarks/bench_visualize.py --sizes 1000 100000 1000000
+
+Each line of output is a JSON object with the plot type, decimation method,
+point count and render time in seconds.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.data_specialist_agent import visualize_data  # noqa: E402
+from agents.data_store import store_cached_data  # noqa: E402
+
+CASES = [
+    ("line", "lttb"),
+    ("line", "minmax"),
+    ("line", "none"),
+    ("scatter", "none"),
+]
+
+
+def _dataset(points: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    x = np.arange(points, dtype=np.float64)
+    y = np.sin(x / 500) + rng.normal(0, 0.1, points)
+    return pd.DataFrame({"x": x, "y": y})
+
+
+def run(sizes, repeat: int) -> list:
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            for points in sizes:
+                store_cached_data(_dataset(points), "bench")
+                for plot_type, method in CASES:
+                    timings = []
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        visualize_data("bench", plot_type=plot_type, filename="bench.png", decimation=method)
+                        timings.append(time.perf_counter() - start)
+                    results.append({
+                        "benchmark": "visualize_data",
+                        "plot_type": plot_type,
+                        "decimation": method,
+                        "points": points,
+                        "seconds": min(timings),
+                    })
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**3, 10**4, 10**5, 10**6])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    for result in run(args.sizes, args.repeat):
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
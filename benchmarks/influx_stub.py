@@ -0,0 +1,183 @@
+"""Local stand-in for the InfluxDB v2 HTTP API used by the benchmarks.
+
+It answers ``/api/v2/query`` with annotated CSV for synthetic series covering
+the query's ``range()`` and accepts ``/api/v2/write`` (optionally gzip
+compressed), counting the received lines. ``--row-cost-us`` models the time
+the server spends scanning each row, which is what parallel queries overlap.
+
+Run standalone to print the URL and serve until interrupted::
+
+    python benchmarks/influx_stub.py --series 10 --interval 1s
+"""
+
+import argparse
+import gzip
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+_ANNOTATIONS = (
+    "#datatype,string,long,dateTime:RFC3339,dateTime:RFC3339,dateTime:RFC3339,double,string,string,string\r\n"
+    "#group,false,false,true,true,false,false,true,true,true\r\n"
+    "#default,_result,,,,,,,,\r\n"
+    ",result,table,_start,_stop,_time,_value,_field,_measurement,host\r\n"
+)
+
+
+def _rfc3339(ns) -> np.ndarray:
+    return np.datetime_as_string(np.asarray(ns, dtype="datetime64[ns]"), unit="s", timezone="UTC")
+
+
+def render_csv(start: int, stop: int, series: int, interval: int, measurement: str = "m") -> tuple:
+    """Return ``(csv_text, rows)`` for ``series`` synthetic series in ``[start, stop)``."""
+    first = -(-start // interval) * interval
+    times = np.arange(first, stop, interval, dtype=np.int64)
+    if not len(times):
+        return "", 0
+    stamps = _rfc3339(times)
+    bounds = f"{_rfc3339(start)},{_rfc3339(stop)}"
+    chunks = [_ANNOTATIONS]
+    for table in range(series):
+        values = np.char.mod("%.3f", np.sin(times / (interval * 600.0) + table))
+        prefix = f",,{table},{bounds},"
+        suffix = f",value,{measurement},h{table}\r\n"
+        chunks.append("".join(prefix + t + "," + v + suffix for t, v in zip(stamps, values)))
+    return "".join(chunks) + "\r\n", len(times) * series
+
+
+class StubInflux:
+    """Threaded stand-in InfluxDB server."""
+
+    def __init__(self, series: int = 10, interval: str = "1s", row_cost_us: float = 0.0,
+                 latency_ms: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        # Imported here so that spawning the stub does not import the agents
+        # package (and its configuration) into the benchmark process early.
+        sys.path.insert(0, ROOT)
+        from agents.flux import parse_duration
+
+        self.series = series
+        self.interval = parse_duration(interval)
+        self.row_cost = row_cost_us / 1e6
+        self.latency = latency_ms / 1000
+        self.stats = {"queries": 0, "rows": 0, "writes": 0, "lines_written": 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        from agents.flux import query_range
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _body(self) -> bytes:
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                return body
+
+            def _reply(self, status: int, body: bytes = b"", content_type: str = "application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.startswith(("/ping", "/health")):
+                    self._reply(200, b'{"status": "pass"}')
+                else:
+                    self._reply(404)
+
+            def do_POST(self):
+                body = self._body()
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if self.path.startswith("/api/v2/query"):
+                    query = json.loads(body or b"{}").get("query", "")
+                    start, stop, _ = query_range(query)
+                    if start is None or stop is None:
+                        self._reply(400, b'{"message": "range() with a resolvable start is required"}')
+                        return
+                    text, rows = render_csv(start, stop, stub.series, stub.interval)
+                    if stub.row_cost:
+                        time.sleep(rows * stub.row_cost)
+                    with stub._lock:
+                        stub.stats["queries"] += 1
+                        stub.stats["rows"] += rows
+                    self._reply(200, text.encode(), "text/csv; charset=utf-8")
+                elif self.path.startswith("/api/v2/write"):
+                    lines = body.count(b"\n") + 1 if body else 0
+                    with stub._lock:
+                        stub.stats["writes"] += 1
+                        stub.stats["lines_written"] += lines
+                    self._reply(204)
+                else:
+                    self._reply(404)
+
+        return Handler
+
+    def start(self) -> "StubInflux":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def spawn(*args: str) -> tuple:
+    """Start the stub in a separate process and return ``(process, url)``."""
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), *args],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    url = process.stdout.readline().strip()
+    return process, url
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stand-in InfluxDB v2 HTTP server")
+    parser.add_argument("--series", type=int, default=10)
+    parser.add_argument("--interval", default="1s")
+    parser.add_argument("--row-cost-us", type=float, default=0.0)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=0)
+    args = parser.parse_args()
+    stub = StubInflux(args.series, args.interval, args.row_cost_us, args.latency_ms, port=args.port)
+    print(stub.url, flush=True)
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
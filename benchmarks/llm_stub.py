@@ -0,0 +1,193 @@
+"""Scripted stand-in for the OpenAI chat-completions API used by the benchmarks.
+
+A script decides each reply from the conversation so far: the first
+completion of a turn answers the user message, every later one answers the
+result of the tool called last. Tool-call ids are numbered, so the same
+script against the same data produces the same conversation. Two scripts
+are provided:
+
+- ``store``: triage -> ``transfer_to_database_manager`` ->
+  ``influx_query_store`` -> answer (three completions, one query)
+- ``plot``: as ``store``, then ``transfer_to_data_specialist`` ->
+  ``visualize_data`` -> ``wait_for_plot`` -> answer (six completions)
+
+``ScriptedOpenAI`` is an in-process client; ``StubLLM`` serves the same
+script at ``/v1/chat/completions`` for the real ``openai.OpenAI`` client.
+Run standalone to print the base URL and serve until interrupted::
+
+    python benchmarks/llm_stub.py --script plot --start -1h --latency-ms 50
+"""
+
+import argparse
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _turn(messages: list) -> int:
+    return sum(m["role"] == "user" for m in messages)
+
+
+def store_script(start: str, stop: str | None = None, hosts: int | None = None) -> dict:
+    """Steps of the ``store`` script, keyed by the tool answered (``None``: the user).
+
+    The query covers ``range(start: start, stop: stop)``; with ``hosts`` each
+    turn filters on one of ``hosts`` series in turn.
+    """
+    flux_range = f"start: {start}" + (f", stop: {stop}" if stop else "")
+
+    def query(messages):
+        turn = _turn(messages)
+        flux_query = f"|> range({flux_range})"
+        if hosts:
+            flux_query += f' |> filter(fn: (r) => r.host == "h{turn % hosts}")'
+        return "influx_query_store", {"flux_query": flux_query, "handle": f"turn_{turn}"}
+
+    return {
+        None: lambda messages: ("transfer_to_database_manager", {}),
+        "transfer_to_database_manager": query,
+    }
+
+
+def plot_script(start: str, stop: str | None = None, hosts: int | None = None) -> dict:
+    """Steps of the ``plot`` script: store the data, then plot it and wait for the file."""
+    return {
+        **store_script(start, stop, hosts),
+        "influx_query_store": lambda messages: ("transfer_to_data_specialist", {}),
+        "transfer_to_data_specialist": lambda messages: (
+            "visualize_data", {"handle": f"turn_{_turn(messages)}", "plot_type": "line"}
+        ),
+        "visualize_data": lambda messages: ("wait_for_plot", {"handle": messages[-1]["content"]}),
+    }
+
+
+SCRIPTS = {"store": store_script, "plot": plot_script}
+
+
+class ScriptedCompletions:
+    """Scripted stand-in for ``client.chat.completions`` of the OpenAI SDK."""
+
+    def __init__(self, script: dict, latency: float = 0.0):
+        self.script = script
+        self.latency = latency
+        self.calls = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def reply(self, model: str, messages: list) -> dict:
+        """Return the next completion of the conversation ``messages`` as a dict."""
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+            call_id = next(self._ids)
+        last = messages[-1]
+        step = self.script.get(None if last["role"] == "user" else last.get("tool_name"))
+        call = step(messages) if step and last["role"] in ("user", "tool") else None
+        message = {"role": "assistant", "content": None if call else f"Done: {str(last.get('content'))[:200]}"}
+        if call:
+            message["tool_calls"] = [{
+                "id": f"call_{call_id:06d}",
+                "type": "function",
+                "function": {"name": call[0], "arguments": json.dumps(call[1])},
+            }]
+        return {
+            "id": f"bench-{call_id}", "object": "chat.completion", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "finish_reason": "tool_calls" if call else "stop", "message": message}],
+        }
+
+    def create(self, model, messages, **kwargs):
+        from openai.types.chat import ChatCompletion
+
+        return ChatCompletion.model_validate(self.reply(model, messages))
+
+
+class ScriptedOpenAI:
+    """In-process client exposing ``chat.completions`` like ``openai.OpenAI``."""
+
+    def __init__(self, script: dict, latency: float = 0.0):
+        self.completions = ScriptedCompletions(script, latency)
+        self.chat = self
+
+
+class StubLLM:
+    """Threaded HTTP server answering ``/v1/chat/completions`` from a script."""
+
+    def __init__(self, script: dict, latency_ms: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.completions = ScriptedCompletions(script, latency_ms / 1000)
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Base URL for ``openai.OpenAI(base_url=...)``."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _handler(self):
+        completions = self.completions
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    body, status = b'{"error": {"message": "not found"}}', 404
+                else:
+                    request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                    body, status = json.dumps(completions.reply(request.get("model", ""), request["messages"])).encode(), 200
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def client(self):
+        """Return an ``openai.OpenAI`` client talking to this server."""
+        from openai import OpenAI
+
+        return OpenAI(base_url=self.url, api_key="bench", max_retries=0)
+
+    def start(self) -> "StubLLM":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scripted stand-in OpenAI chat-completions server")
+    parser.add_argument("--script", default="plot", choices=sorted(SCRIPTS))
+    parser.add_argument("--start", default="-1h", help="start of the range the scripted queries fetch")
+    parser.add_argument("--stop", default=None)
+    parser.add_argument("--hosts", type=int, default=None, help="filter each turn on one of this many hosts")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=0)
+    args = parser.parse_args()
+    stub = StubLLM(SCRIPTS[args.script](args.start, args.stop, args.hosts), args.latency_ms, port=args.port)
+    print(stub.url, flush=True)
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
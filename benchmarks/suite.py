@@ -0,0 +1,226 @@
+"""Reproducible benchmark suite against a stand-in InfluxDB and a scripted model.
+
+Starts ``benchmarks/influx_stub.py`` in a separate process and
+``benchmarks/llm_stub.py`` in this one, then times each case at every size
+(total points, spread over ``--series`` series at one point per second):
+
+- ``query_records``, ``query_columns``, ``query_dataframe``: ``influx_query``
+  fetching and converting the points (``records`` only up to
+  ``--max-records``, since every row becomes a dict)
+- ``filter_data``: a value threshold and a tag list on the stored points
+- ``visualize_data``: a line plot rendered in this process
+- ``write_points``: ``influx_write_points`` of the stored points
+- ``turn``: a full triage -> query -> plot turn through the real OpenAI
+  client and ``TieredSwarm`` (six completions)
+
+Queries use a fixed time range, so every run fetches the same data. Caches
+are cleared before each repetition and the fastest one is reported. Each
+result is printed as a JSON line; ``--output`` also saves them with the
+environment, and ``--compare`` prints the speedup of each case over a saved
+run::
+
+    python benchmarks/suite.py --sizes 1000 100000 --output baseline.json
+    python benchmarks/suite.py --sizes 1000 100000 --compare baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from importlib import metadata
+
+import pandas as pd
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path[:0] = [HERE, ROOT]
+
+from influx_stub import spawn  # noqa: E402
+from llm_stub import StubLLM, plot_script  # noqa: E402
+
+START = pd.Timestamp("2024-01-01T00:00:00Z")
+CASES = [
+    "query_records",
+    "query_columns",
+    "query_dataframe",
+    "filter_data",
+    "visualize_data",
+    "write_points",
+    "turn",
+]
+
+
+def _range(points: int, series: int) -> tuple:
+    stop = START + pd.Timedelta(seconds=max(points // series, 1))
+    return START.strftime("%Y-%m-%dT%H:%M:%SZ"), stop.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _timed(run, repeat: int, setup=None) -> tuple:
+    """Return the fastest of ``repeat`` calls of ``run`` and its last result."""
+    timings, result = [], None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def run_size(points: int, args, llm: StubLLM) -> list:
+    """Run every selected case at ``points`` points and return the results."""
+    import agents
+    from agents.plotting import PLOT_DIR
+    from agents.query_cache import query_cache
+    from agents.sessions import SessionManager
+    from agents.tiering import TieredSwarm
+
+    start, stop = _range(points, args.series)
+    query = f"|> range(start: {start}, stop: {stop})"
+    frame = agents.influx_query(query, output="dataframe", use_cache=False)
+    agents.store_cached_data(frame, "bench")
+    rows = len(frame)
+
+    cases = {
+        "query_records": lambda: agents.influx_query(query, use_cache=False),
+        "query_columns": lambda: agents.influx_query(query, output="columns", use_cache=False),
+        "query_dataframe": lambda: agents.influx_query(query, output="dataframe", use_cache=False),
+        "filter_data": lambda: agents.filter_data(
+            {"_value": "_value > 0", "host": ["h1", "h2"]}, handle="bench", pushdown_to_server=False
+        ),
+        "visualize_data": lambda: agents.visualize_data("bench", plot_type="line", background=False),
+        "write_points": lambda: agents.influx_write_points(handle="bench", tag_columns=["host"]),
+    }
+
+    sessions = SessionManager()
+    swarm = TieredSwarm(llm.client())
+    llm.completions.script = plot_script(start, stop)
+
+    def turn():
+        session = sessions.create()
+        try:
+            return sessions.run_turn(session, "Plot all the data", client=swarm, max_turns=args.max_turns)
+        finally:
+            sessions.close(session.id)
+
+    def fresh():
+        query_cache.clear()
+        shutil.rmtree(PLOT_DIR, ignore_errors=True)
+
+    cases["turn"] = turn
+
+    results = []
+    for case in args.cases:
+        if case == "query_records" and points > args.max_records:
+            continue
+        calls = llm.completions.calls
+        seconds, _ = _timed(cases[case], args.repeat, setup=fresh)
+        result = {
+            "benchmark": "suite",
+            "case": case,
+            "points": points,
+            "series": args.series,
+            "rows": rows,
+            "seconds": round(seconds, 6),
+            "points_per_second": round(rows / seconds, 1) if seconds else None,
+        }
+        if case == "turn":
+            result["completions"] = (llm.completions.calls - calls) // args.repeat
+        results.append(result)
+        print(json.dumps(result), flush=True)
+    agents.drop_cached_data("bench")
+    return results
+
+
+def environment(args) -> dict:
+    """Describe the interpreter, packages, machine and settings of this run."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    packages = {}
+    for name in ("pandas", "numpy", "pyarrow", "matplotlib", "influxdb-client", "openai"):
+        try:
+            packages[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            packages[name] = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "packages": packages,
+        "settings": {"series": args.series, "repeat": args.repeat, "row_cost_us": args.row_cost_us},
+    }
+
+
+def compare(results: list, baseline_path: str) -> None:
+    """Print the speedup of each result over the same case and size in ``baseline_path``."""
+    with open(baseline_path, encoding="utf-8") as handle:
+        baseline = {(r["case"], r["points"]): r for r in json.load(handle)["results"]}
+    for result in results:
+        before = baseline.get((result["case"], result["points"]))
+        if before is None or not result["seconds"]:
+            continue
+        print(json.dumps({
+            "benchmark": "suite_compare",
+            "case": result["case"],
+            "points": result["points"],
+            "baseline_seconds": before["seconds"],
+            "seconds": result["seconds"],
+            "speedup": round(before["seconds"] / result["seconds"], 3),
+        }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**3, 10**4, 10**5, 10**6, 10**7])
+    parser.add_argument("--cases", nargs="+", default=CASES, choices=CASES)
+    parser.add_argument("--series", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-records", type=int, default=10**6, help="largest size for query_records")
+    parser.add_argument("--max-turns", type=int, default=20, help="messages a turn may add (Swarm's max_turns)")
+    parser.add_argument("--row-cost-us", type=float, default=0.0, help="stub server time per returned row")
+    parser.add_argument("--output", help="save the results and environment as JSON")
+    parser.add_argument("--compare", help="JSON file saved by --output to compare against")
+    args = parser.parse_args()
+
+    process, url = spawn("--series", str(args.series), "--row-cost-us", str(args.row_cost_us))
+    workdir = tempfile.mkdtemp(prefix="bench-suite-")
+    cwd = os.getcwd()
+    results = []
+    try:
+        os.environ.update({
+            "INFLUX_URL": url,
+            "INFLUX_TOKEN": "bench",
+            "INFLUX_ORG": "bench",
+            "INFLUX_BUCKET": "bench",
+            "MEASUREMENT": "m",
+            "ROUTER_ENABLED": "false",
+        })
+        os.chdir(workdir)
+        with StubLLM(plot_script("-1h")) as llm:
+            for points in args.sizes:
+                results += run_size(points, args, llm)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+        process.terminate()
+        process.wait()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump({"environment": environment(args), "results": results}, handle, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
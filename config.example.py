@@ -11,6 +11,57 @@ INFLUX_ORG = "example-org"
 INFLUX_BUCKET = "example-bucket"
 MEASUREMENT = "full"
 
+# InfluxDB connection pool
+INFLUX_POOL_SIZE = 10
+INFLUX_TIMEOUT_MS = 30000
+INFLUX_RETRIES = 3
+INFLUX_RETRY_BACKOFF = 0.5
+INFLUX_ENABLE_GZIP = True
+INFLUX_MAX_CONCURRENT_QUERIES = 4  # bounds parallel sub-range queries
+
+# Bulk writes (influx_write_points)
+WRITE_BATCH_SIZE = 5000
+WRITE_BATCH_BYTES = 1024 * 1024
+WRITE_FLUSH_INTERVAL_MS = 1000
+
+# Query result cache (TTLs in seconds, 0 disables the cache)
+QUERY_CACHE_TTL = 60
+QUERY_CACHE_HISTORICAL_TTL = 3600
+QUERY_CACHE_MAX_ENTRIES = 128
+QUERY_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Schema catalog (buckets, measurements, fields, tags)
+SCHEMA_CACHE_TTL = 300  # seconds, 0 disables the catalog
+SCHEMA_PREFETCH = True  # load the default measurement's schema at startup
+SCHEMA_LOOKBACK = "30d"  # range scanned by influx_field_types
+
+# How far incremental refreshes reach back for late-arriving points
+INCREMENTAL_OVERLAP = "1m"
+
+# Dataset store
+DATA_STORE_MAX_BYTES = 512 * 1024 * 1024
+DATA_STORE_SPILL_DIR = ""  # e.g. ".data_spill" to spill evicted datasets to disk
+DATA_STORE_COMPACT = True  # keep datasets as typed, downcast columns
+
+# On-disk dataset cache used by influx_query_store(persist=True); needs pyarrow
+DATASET_CACHE_DIR = ".dataset_cache"
+DATASET_CACHE_MAX_BYTES = 2 * 1024**3
+
+# Plot rendering: visualize_data returns a handle and renders in worker processes
+RENDER_BACKGROUND = True
+RENDER_WORKERS = 2  # 0 renders in the calling thread
+
+# Tool results larger than this many tokens (about 4 bytes each) are stored in
+# the data store and reach the model as a summary with a handle; 0 disables
+TOOL_OUTPUT_MAX_TOKENS = 2000
+
+# Instrumentation: JSON metric lines go to this file ("-" for stderr, "" to disable)
+METRICS_LOG = ""
+METRICS_PROFILE_DIR = "profiles"  # cProfile output of turns run with profile=True
+
+# Answer common requests ("list buckets", "plot last 6 hours of temp") without triage
+ROUTER_ENABLED = True
+
 # Model configuration
 LLM_PROVIDER = ""  # "openai" or "ollama"
 
@@ -20,6 +71,27 @@ OPENAI_MODEL_NAME_1 = "gpt-4o"
 OPENAI_MODEL_NAME_2 = OPENAI_MODEL_NAME_1
 OPENAI_MODEL_NAME_3 = OPENAI_MODEL_NAME_1
 
+# Model tiers: MODEL_NAME_2 is the "fast" tier, MODEL_NAME_1 "standard" and
+# MODEL_NAME_3 "heavy". Agents not listed use their default tier.
+AGENT_MODEL_TIERS = {
+    "triage": "fast",
+    "clarifying": "fast",
+    "database": "standard",
+    "data_specialist": "standard",
+}
+ESCALATION_TIER = "heavy"  # used for the rest of a turn after a failed tool call
+LLM_MAX_CONCURRENT = 4  # completions in flight across all sessions
+
+# Session server (server.py)
+SERVER_MAX_CONCURRENT_TURNS = 16
+MAX_SESSIONS = 256
+SESSION_IDLE_SECONDS = 1800
+SESSION_STORE_MAX_BYTES = 128 * 1024 * 1024  # dataset store of each session
+
+# Batch runner (batch.py)
+BATCH_WORKERS = 4
+BATCH_MAX_TURNS = 20  # model round-trips per request
+
 # Ollama settings
 OLLAMA_BASE_URL = "http://localhost:11434/v1"
 OLLAMA_MODEL_NAME_1 = "qwen3:8b"
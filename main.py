@@ -1,19 +1,35 @@
-"""Interactive script to analyse data using the triage agent."""
+"""Interactive script to analyse data using the triage agent.
 
-from agents import client, triage_agent, ask_user
+Start a request with ``/profile`` to capture that turn with cProfile.
+"""
+
+import threading
+
+import agents
+from agents.prompt import ask_user
+from agents.schema_catalog import SCHEMA_PREFETCH
+
+
+def _warm_up() -> None:
+    """Load the agents (and prefetch the schema) while the user types the first request."""
+    agents.run_turn  # noqa: B018 - resolving the name imports the router and all agents
+    if SCHEMA_PREFETCH:
+        agents.prefetch_schema()
 
 
 def main() -> None:
     """Run the triage agent in a loop and keep asking for new requests."""
-    user_message = ask_user("What would you like to do?")
-    while user_message.strip():
-        response = client.run(
-            agent=triage_agent,
-            messages=[{"role": "user", "content": user_message}],
-            debug=True,
-        )
-        print(response.messages[-1]["content"])
-        user_message = ask_user("Anything else I can help with? (Leave blank to exit)")
+    threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
+    try:
+        user_message = ask_user("What would you like to do?")
+        while user_message.strip():
+            profile = user_message.startswith("/profile ")
+            if profile:
+                user_message = user_message[len("/profile "):]
+            print(agents.run_turn(user_message, debug=True, profile=profile))
+            user_message = ask_user("Anything else I can help with? (Leave blank to exit)")
+    finally:
+        agents.close_clients()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,189 @@
+"""Serve many concurrent conversations over HTTP.
+
+Run with ``python server.py --port 8080`` and talk JSON:
+
+- ``POST /sessions`` starts a session and returns its ``session_id``
+- ``POST /sessions/<id>/messages`` with ``{"content": "..."}`` runs a turn
+  and returns ``{"reply": ..., "seconds": ...}``
+- ``GET /sessions/<id>`` describes the session and its datasets
+- ``DELETE /sessions/<id>`` ends it
+- ``GET /stats`` reports sessions, router, model, InfluxDB pool and render statistics
+- ``GET /metrics`` returns tool, model, query and turn metrics in the
+  Prometheus text format
+
+A message may set ``"profile": true`` to capture its turn with cProfile.
+A turn in which an agent asks the user a question ends there and replies
+with the question; the next message of the session is taken as the answer.
+
+The event loop only parses requests; turns run in a thread pool of
+``SERVER_MAX_CONCURRENT_TURNS`` workers. Model completions and InfluxDB
+queries are further bounded by ``LLM_MAX_CONCURRENT`` and
+``INFLUX_MAX_CONCURRENT_QUERIES`` across all sessions.
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from agents import client_stats, close_clients, metrics_text, model_stats, render_stats, router_stats
+from agents.sessions import SessionManager
+
+try:
+    from config import SERVER_MAX_CONCURRENT_TURNS
+except ImportError:  # pragma: no cover - fallback for runtime usage
+    SERVER_MAX_CONCURRENT_TURNS = int(os.getenv("SERVER_MAX_CONCURRENT_TURNS", "16"))
+
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class AgentServer:
+    """Minimal asyncio HTTP/1.1 front end for a ``SessionManager``."""
+
+    def __init__(self, sessions: SessionManager | None = None, max_turns: int = SERVER_MAX_CONCURRENT_TURNS,
+                 llm_client=None):
+        self.sessions = sessions or SessionManager()
+        self.llm_client = llm_client
+        self._pool = ThreadPoolExecutor(max_workers=max_turns, thread_name_prefix="turn")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, body, keep_alive = request
+                try:
+                    status, payload = await self.dispatch(method, path, body)
+                except HttpError as exc:
+                    status, payload = exc.status, {"error": str(exc)}
+                except Exception as exc:  # reported to the caller, the server keeps running
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(exc).__name__}: {exc}"}
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise ConnectionError("malformed request line")
+        headers = {}
+        while True:
+            header = await reader.readline()
+            if header in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = header.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise ConnectionError("request body too large")
+        body = await reader.readexactly(length) if length else b""
+        keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+        return method.upper(), target.split("?", 1)[0].rstrip("/"), body, keep_alive
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status: HTTPStatus, payload, keep_alive: bool) -> None:
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(payload, default=str).encode(), "application/json"
+        writer.write(
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+            + body
+        )
+
+    async def dispatch(self, method: str, path: str, body: bytes):
+        parts = [p for p in path.split("/") if p]
+        if parts == ["stats"] and method == "GET":
+            return HTTPStatus.OK, self.stats()
+        if parts == ["metrics"] and method == "GET":
+            return HTTPStatus.OK, metrics_text()
+        if parts == ["sessions"] and method == "POST":
+            try:
+                session = self.sessions.create()
+            except RuntimeError as exc:
+                raise HttpError(HTTPStatus.SERVICE_UNAVAILABLE, str(exc))
+            return HTTPStatus.CREATED, {"session_id": session.id}
+        if len(parts) >= 2 and parts[0] == "sessions":
+            session = self.sessions.get(parts[1])
+            if session is None:
+                raise HttpError(HTTPStatus.NOT_FOUND, f"Unknown session {parts[1]}")
+            if len(parts) == 2 and method == "GET":
+                return HTTPStatus.OK, session.describe()
+            if len(parts) == 2 and method == "DELETE":
+                self.sessions.close(session.id)
+                return HTTPStatus.OK, {"status": "closed", "session_id": session.id}
+            if parts[2:] == ["messages"] and method == "POST":
+                try:
+                    request = json.loads(body or b"{}")
+                    content = request["content"]
+                except (ValueError, KeyError, TypeError):
+                    raise HttpError(HTTPStatus.BAD_REQUEST, 'Expected a JSON body {"content": "..."}')
+                started = time.perf_counter()
+                loop = asyncio.get_running_loop()
+                turn = functools.partial(
+                    self.sessions.run_turn, session, content, self.llm_client, profile=bool(request.get("profile"))
+                )
+                reply = await loop.run_in_executor(self._pool, turn)
+                return HTTPStatus.OK, {"reply": reply, "seconds": round(time.perf_counter() - started, 4)}
+        raise HttpError(HTTPStatus.NOT_FOUND, f"No route for {method} {path}")
+
+    def stats(self) -> dict:
+        return {
+            **self.sessions.stats(),
+            "router": {k: v for k, v in router_stats().items() if k != "recent"},
+            "models": model_stats(),
+            "influx": client_stats(),
+            "render": render_stats(),
+        }
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080, ready=None) -> None:
+        server = await asyncio.start_server(self.handle, host, port)
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[:2])
+        async with server:
+            await server.serve_forever()
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve concurrent agent sessions over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    server = AgentServer()
+    try:
+        asyncio.run(server.serve(args.host, args.port, ready=lambda addr: print(f"http://{addr[0]}:{addr[1]}", flush=True)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        close_clients()
+
+
+if __name__ == "__main__":
+    main()
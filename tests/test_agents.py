@@ -174,3 +174,1172 @@ def test_head_cached_data_returns_subset():
     agents.store_cached_data([{'num': i} for i in range(20)])
     subset = agents.head_cached_data(5)
     assert subset['num'] == list(range(5))
+
+
+def test_influx_client_is_reused_between_calls():
+    with patch('agents.database_manager.InfluxDBClient') as mock_client_cls:
+        mock_client = MagicMock()
+        mock_client.query_api.return_value.query.return_value = []
+        mock_client_cls.return_value = mock_client
+
+        import agents
+        importlib.reload(agents)
+
+        agents.influx_list_measurements()
+        agents.influx_list_fields('my_measure')
+
+        assert mock_client_cls.call_count == 1
+        assert agents.client_stats()['reused'] >= 1
+
+
+def test_close_clients_closes_pooled_client():
+    with patch('agents.database_manager.InfluxDBClient') as mock_client_cls:
+        mock_client = MagicMock()
+        mock_client.query_api.return_value.query.return_value = []
+        mock_client_cls.return_value = mock_client
+
+        import agents
+        importlib.reload(agents)
+
+        agents.influx_list_measurements()
+        agents.close_clients()
+
+        mock_client.close.assert_called_once()
+        assert agents.client_stats()['open'] == 0
+
+
+def _annotated_csv(values):
+    rows = [
+        ['#datatype', 'string', 'long', 'dateTime:RFC3339', 'double', 'string', 'string'],
+        ['#group', 'false', 'false', 'false', 'false', 'true', 'true'],
+        ['#default', '_result', '', '', '', '', ''],
+        ['', 'result', 'table', '_time', '_value', '_field', 'host'],
+    ]
+    for i, value in enumerate(values):
+        rows.append(['', '', '0', f'2024-01-01T00:00:{i:02d}Z', str(value), 'temp', f'h{i % 2}'])
+    return rows
+
+
+def test_influx_query_columns_streams_typed_arrays():
+    with patch('agents.database_manager.InfluxDBClient') as mock_client_cls:
+        mock_client = MagicMock()
+        mock_query_api = MagicMock()
+        mock_query_api.query_csv.return_value = iter(_annotated_csv([1.5, 2.5, 3.5]))
+        mock_client.query_api.return_value = mock_query_api
+        mock_client_cls.return_value = mock_client
+
+        import agents
+        importlib.reload(agents)
+
+        columns = agents.influx_query('|> range(start: -1h)', output='columns')
+
+        assert columns['_value'].dtype == 'float64'
+        assert list(columns['_value']) == [1.5, 2.5, 3.5]
+        assert columns['_time'].dtype == 'datetime64[ns]'
+        assert columns['_time'].view('int64')[0] == 1704067200 * 10**9
+        assert list(columns['host'].categories) == ['h0', 'h1']
+        assert list(columns['result']) == ['_result'] * 3
+        mock_query_api.query.assert_not_called()
+
+
+def test_read_columns_merges_chunks():
+    from agents.columnar import read_columns
+
+    columns = read_columns(iter(_annotated_csv(range(7))), chunk_size=3)
+
+    assert list(columns['_value']) == list(range(7))
+    assert list(columns['host']) == ['h0', 'h1'] * 3 + ['h0']
+
+
+def test_store_keeps_named_datasets_side_by_side():
+    import agents
+    importlib.reload(agents)
+
+    agents.store_cached_data([{'num': 1}], handle='first')
+    agents.store_cached_data([{'num': 2}, {'num': 3}], handle='second')
+
+    assert agents.get_cached_data('first') == [{'num': 1}]
+    assert agents.head_cached_data(1, handle='second') == {'num': [2]}
+
+
+def test_data_store_evicts_least_recently_used(tmp_path):
+    from agents.data_store import DataStore, estimate_size
+
+    data = [{'num': i} for i in range(100)]
+    store = DataStore(max_bytes=int(estimate_size(data) * 2.5), spill_dir=str(tmp_path))
+    store.put('a', data)
+    store.put('b', list(data))
+    store.get('a')
+    store.put('c', list(data))
+
+    stats = store.stats()
+    assert stats['evictions'] == 1
+    assert stats['spills'] == 1
+    assert store.get('b') == data
+    assert store.stats()['reloads'] == 1
+    assert store.get('missing') is None
+    assert store.stats()['misses'] == 1
+
+
+def test_filter_data_works_on_handles():
+    import agents
+    importlib.reload(agents)
+
+    agents.store_cached_data([{'num': i, 'name': f'n{i}'} for i in range(10)], handle='nums')
+    summary = agents.filter_data({'num': 'num >= 7'}, handle='nums', result_handle='big')
+
+    assert summary['handle'] == 'big'
+    assert summary['rows'] == 3
+    assert agents.list_data_fields('big') == ['num', 'name']
+    assert agents.head_cached_data(handle='big')['num'] == [7, 8, 9]
+
+
+def test_visualize_data_reads_stored_dataset(tmp_path, monkeypatch):
+    import agents
+    importlib.reload(agents)
+    monkeypatch.chdir(tmp_path)
+
+    agents.store_cached_data({'x': [1, 2, 3], 'y': [2, 4, 6]}, handle='xy')
+    path = agents.visualize_data('xy', plot_type='line')
+
+    assert agents.wait_for_plot(path)['status'] == 'done'
+    assert os.path.exists(tmp_path / path)
+
+
+def _record(value):
+    record = MagicMock()
+    record.values = {'_value': value}
+    record.get_value.return_value = value
+    record.get_time.return_value = None
+    table = MagicMock()
+    table.records = [record]
+    return table
+
+
+def test_influx_query_serves_repeated_query_from_cache():
+    with patch('agents.database_manager.InfluxDBClient') as mock_client_cls:
+        mock_client = MagicMock()
+        mock_query_api = MagicMock()
+        mock_query_api.query.return_value = [_record(1.0)]
+        mock_client.query_api.return_value = mock_query_api
+        mock_client_cls.return_value = mock_client
+
+        import agents
+        importlib.reload(agents)
+
+        first = agents.influx_query('|> range(start: -3h)  |> last()')
+        second = agents.influx_query('|>   range(start: -3h)\n  |> last()')
+
+        assert first == second
+        assert mock_query_api.query.call_count == 1
+
+        agents.influx_write_point({'v': 1.0})
+        agents.influx_query('|> range(start: -3h) |> last()')
+        assert mock_query_api.query.call_count == 2
+
+
+def test_query_cache_keeps_historical_ranges_on_recent_writes():
+    from agents.query_cache import QueryCache
+
+    cache = QueryCache(ttl=60, historical_ttl=3600)
+    query = 'from(bucket: "b") |> range(start: 2020-01-01T00:00:00Z, stop: 2020-01-02T00:00:00Z)'
+    key = cache.key(query)
+    cache.put(key, query, [1])
+
+    assert cache.invalidate('b', start=1704067200 * 10**9) == 0
+    assert cache.get(key) == [1]
+    assert cache.invalidate('b') == 1
+    assert cache.get(key) is None
+    assert cache.stats()['hits'] == 1
+
+
+def test_query_range_parses_function_call_arguments():
+    from agents import flux
+
+    now = flux.resolve_time('2024-01-01T12:00:00Z')
+    query = 'from(bucket: "b") |> range(start: -1h, stop: now()) |> filter(fn: (r) => r.tag == "range(x)")'
+    assert flux.query_range(query, now) == (now - 3600 * 10**9, now, True)
+    assert flux.find_range(query).group('stop') == 'now()'
+    assert flux.replace_range(query, 'A', 'B') == (
+        'from(bucket: "b") |> range(start: A, stop: B) |> filter(fn: (r) => r.tag == "range(x)")'
+    )
+
+    nested = '|> range(start: date.sub(d: 2h, from: now()), stop: date.truncate(t: now(), unit: 1h))'
+    match = flux.find_range(nested)
+    assert match.group('start') == 'date.sub(d: 2h, from: now())'
+    assert match.group('stop') == 'date.truncate(t: now(), unit: 1h)'
+    assert flux.replace_range(nested, '-1h') == '|> range(start: -1h)'
+    assert flux.normalize(query) != flux.normalize(query.replace('-1h', '-2h'))
+
+
+def _series_csv(points):
+    rows = [
+        ['#datatype', 'string', 'long', 'dateTime:RFC3339', 'double', 'string'],
+        ['#group', 'false', 'false', 'false', 'false', 'true'],
+        ['#default', '_result', '', '', '', ''],
+        ['', 'result', 'table', '_time', '_value', '_field'],
+    ]
+    from agents.flux import format_time
+    rows += [['', '', '0', format_time(t), str(v), field] for t, v, field in ((*p, 'temp')[:3] for p in points)]
+    return rows
+
+
+def test_influx_query_store_incremental_fetches_only_delta():
+    from agents.flux import now_ns
+
+    now = now_ns()
+    minute = 60 * 10**9
+    with patch('agents.database_manager.InfluxDBClient') as mock_client_cls:
+        mock_client = MagicMock()
+        mock_query_api = MagicMock()
+        mock_query_api.query_csv.side_effect = [
+            iter(_series_csv([(now - 30 * minute, 1.0), (now - 20 * minute, 2.0)])),
+            iter(_series_csv([(now - 20 * minute, 2.5), (now - 5 * minute, 3.0)])),
+        ]
+        mock_client.query_api.return_value = mock_query_api
+        mock_client_cls.return_value = mock_client
+
+        import agents
+        importlib.reload(agents)
+
+        query = '|> range(start: -1h)'
+        first = agents.influx_query_store(query, handle='inc', incremental=True)
+        second = agents.influx_query_store(query, handle='inc', incremental=True, overlap='1m')
+
+        assert first['mode'] == 'full'
+        assert second['mode'] == 'incremental'
+        assert second['new_rows'] == 1
+        delta_query = mock_query_api.query_csv.call_args.args[0]
+        assert 'range(start: -1h)' not in delta_query
+        assert agents.head_cached_data(handle='inc')['_value'] == [1.0, 2.5, 3.0]
+
+
+def test_influx_query_store_incremental_skips_stalled_series():
+    from agents import flux
+
+    now = flux.now_ns()
+    minute = 60 * 10**9
+    with patch('agents.database_manager.InfluxDBClient') as mock_client_cls:
+        mock_client = MagicMock()
+        mock_query_api = MagicMock()
+        mock_query_api.query_csv.side_effect = [
+            iter(_series_csv([(now - 50 * minute, 7.0, 'stalled'), (now - 20 * minute, 2.0, 'temp')])),
+            iter(_series_csv([(now - 5 * minute, 3.0, 'temp')])),
+        ]
+        mock_client.query_api.return_value = mock_query_api
+        mock_client_cls.return_value = mock_client
+
+        import agents
+        importlib.reload(agents)
+
+        query = '|> range(start: -1h, stop: now())'
+        agents.influx_query_store(query, handle='stalled', incremental=True)
+        second = agents.influx_query_store(query, handle='stalled', incremental=True, overlap='1m')
+
+        assert second['mode'] == 'incremental'
+        assert second['new_rows'] == 1
+        delta_query = mock_query_api.query_csv.call_args.args[0]
+        start, stop, _ = flux.query_range(delta_query)
+        assert start == now - 21 * minute
+        assert 'stop: now())' in delta_query
+        assert sorted(agents.head_cached_data(handle='stalled')['_value']) == [2.0, 3.0, 7.0]
+
+
+def test_influx_query_downsamples_to_point_budget():
+    with patch('agents.database_manager.InfluxDBClient') as mock_client_cls:
+        mock_client = MagicMock()
+        mock_query_api = MagicMock()
+        mock_query_api.query.return_value = []
+        mock_client.query_api.return_value = mock_query_api
+        mock_client_cls.return_value = mock_client
+
+        import agents
+        importlib.reload(agents)
+
+        response = agents.influx_query('|> range(start: -30d)', max_points=800, fn='max')
+
+        called_query = mock_query_api.query.call_args.kwargs['query']
+        assert 'aggregateWindow(every: 1h, fn: max, createEmpty: false)' in called_query
+        assert response['downsampling']['every'] == '1h'
+        assert response['result'] == []
+
+        response = agents.influx_query('|> range(start: -30d, stop: now())', max_points=800, fn='max')
+        called_query = mock_query_api.query.call_args.kwargs['query']
+        assert 'range(start: -30d, stop: now())' in called_query
+        assert 'aggregateWindow(every: 1h, fn: max, createEmpty: false)' in called_query
+        assert response['downsampling']['applied']
+
+        response = agents.influx_query('|> range(start: -30d) |> mean()', max_points=800)
+        assert not response['downsampling']['applied']
+        assert 'aggregateWindow' not in mock_query_api.query.call_args.kwargs['query']
+
+
+def test_decimation_keeps_shape():
+    import numpy as np
+    from agents.decimate import decimate, lttb, minmax
+
+    y = np.sin(np.linspace(0, 20, 100_000))
+    y[54_321] = 5.0
+    x = np.arange(len(y))
+
+    picked = lttb(x, y, 500)
+    assert len(picked) == 500
+    assert picked[0] == 0 and picked[-1] == len(y) - 1
+    assert 54_321 in picked
+
+    envelope = minmax(y, 200)
+    assert 54_321 in envelope
+    assert y[envelope].min() == y.min()
+    assert list(decimate(x[:10], y[:10], 500)) == list(range(10))
+
+
+def test_influx_write_points_sends_line_protocol_batches(tmp_path):
+    with patch('agents.database_manager.InfluxDBClient') as mock_client_cls:
+        mock_client = MagicMock()
+        mock_write_api = MagicMock()
+        mock_client.write_api.return_value = mock_write_api
+        mock_client_cls.return_value = mock_client
+
+        import agents
+        importlib.reload(agents)
+
+        report = agents.influx_write_points(points=[
+            {'tags': {'host': 'a'}, 'fields': {'temp': 21.5}, 'time': '2024-01-01T00:00:00Z'},
+            {'tags': {'host': 'b'}, 'fields': {'temp': 22.0}},
+            {'tags': {'host': 'c'}, 'fields': {'temp': None}},
+        ])
+
+        lines = mock_write_api.write.call_args.kwargs['record']
+        assert lines == [
+            'default_measure,host=a temp=21.5 1704067200000000000',
+            'default_measure,host=b temp=22.0',
+        ]
+        assert mock_client.write_api.call_args.kwargs['write_options'].batch_size >= 1
+        mock_write_api.close.assert_called_once()
+        assert report['points'] == 2
+        assert report['rejected'] == 1
+
+        path = tmp_path / 'points.lp'
+        path.write_text('cpu,host=a usage=1.5 1\nnot valid\n# comment\ncpu usage=2i\n')
+        report = agents.influx_write_points(path=str(path))
+        assert mock_write_api.write.call_args.kwargs['record'] == ['cpu,host=a usage=1.5 1', 'cpu usage=2i']
+        assert report['rejected_samples'] == ['not valid']
+
+
+def test_encode_points_keeps_field_types_across_field_sets():
+    from agents.line_protocol import encode_points
+
+    lines, rejected = encode_points([
+        {'measurement': 'm', 'fields': {'count': 1, 'ok': True}},
+        {'measurement': 'm', 'fields': {'load': 2}},
+        {'measurement': 'm', 'fields': {'count': 3, 'temp': 20.5, 'ok': False}},
+    ])
+
+    assert lines == ['m count=1i,ok=true', 'm load=2i', 'm count=3i,ok=false,temp=20.5']
+    assert rejected == []
+
+
+def test_split_range_aligns_to_windows():
+    from agents import flux
+
+    query = ('from(bucket: "b") |> range(start: 2024-01-01T00:00:00Z, stop: 2024-01-01T01:00:00Z)'
+             ' |> aggregateWindow(every: 7m, fn: mean)')
+    parts = flux.split_range(query, 3)
+
+    assert len(parts) == 3
+    ranges = [flux.query_range(part)[:2] for part in parts]
+    assert ranges[0][0] == flux.resolve_time('2024-01-01T00:00:00Z')
+    assert ranges[-1][1] == flux.resolve_time('2024-01-01T01:00:00Z')
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    assert all(stop % flux.parse_duration('7m') == 0 for _, stop in ranges[:-1])
+    assert flux.can_split(query)
+    assert not flux.can_split('from(bucket: "b") |> range(start: -1h) |> mean()')
+    a = 'a = from(bucket: "a") |> range(start: -1h)\n'
+    b = 'b = from(bucket: "b") |> range(start: -1h)\n'
+    assert not flux.can_split(a + b + 'join(tables: {a: a, b: b}, on: ["_time"])')
+    assert not flux.can_split(a + b + 'union(tables: [a, b])')
+    assert not flux.can_split('from(bucket: "b") |> range(start: -1h) |> range(start: -2h)')
+    assert flux.can_split('from(bucket: "b") |> range(start: -1h) |> filter(fn: (r) => r.kind == "join(")')
+
+
+def test_influx_query_parallel_concatenates_sub_ranges():
+    from agents import flux
+
+    def query_csv(query, org=None):
+        start = flux.query_range(query)[0]
+        offset = (start - flux.resolve_time('2024-01-01T00:00:00Z')) // 10**9
+        return iter(_annotated_csv([float(offset)]))
+
+    with patch('agents.database_manager.InfluxDBClient') as mock_client_cls:
+        mock_client = MagicMock()
+        mock_query_api = MagicMock()
+        mock_query_api.query_csv.side_effect = query_csv
+        mock_client.query_api.return_value = mock_query_api
+        mock_client_cls.return_value = mock_client
+
+        import agents
+        importlib.reload(agents)
+
+        columns = agents.influx_query(
+            'from(bucket: "b") |> range(start: 2024-01-01T00:00:00Z, stop: 2024-01-01T00:04:00Z)',
+            measurement='m', output='columns', use_cache=False, parallel=4,
+        )
+
+        assert mock_query_api.query_csv.call_count == 4
+        assert list(columns['_value']) == [0.0, 60.0, 120.0, 180.0]
+        assert list(columns['host'].categories) == ['h0']
+
+
+def test_influx_query_parallel_splits_ranges_that_stop_at_now():
+    from agents import flux
+
+    sent = []
+
+    def query_csv(query, org=None):
+        sent.append(query)
+        return iter(_annotated_csv([float(len(sent))]))
+
+    with patch('agents.database_manager.InfluxDBClient') as mock_client_cls:
+        mock_client = MagicMock()
+        mock_query_api = MagicMock()
+        mock_query_api.query_csv.side_effect = query_csv
+        mock_client.query_api.return_value = mock_query_api
+        mock_client_cls.return_value = mock_client
+
+        import agents
+        importlib.reload(agents)
+
+        columns = agents.influx_query(
+            'from(bucket: "b") |> range(start: -4h, stop: now())',
+            measurement='m', output='columns', use_cache=False, parallel=4,
+        )
+
+        assert mock_query_api.query_csv.call_count == 4
+        assert len(columns['_value']) == 4
+        ranges = [flux.query_range(query)[:2] for query in sent]
+        assert all(query.count('range(') == 1 and 'now()' not in query for query in sent)
+        assert all(a[1] == b[0] for a, b in zip(sorted(ranges), sorted(ranges)[1:]))
+        first, last = min(ranges)[0], max(ranges)[1]
+        assert last - first == flux.parse_duration('4h')
+
+
+def test_influx_query_parallel_orders_rows_by_series_then_time():
+    from datetime import datetime, timezone
+    from agents import flux
+    from agents.database_manager import _merge_parts
+
+    def query_csv(query, org=None):
+        minute = (flux.query_range(query)[0] - flux.resolve_time('2024-01-01T00:00:00Z')) // (60 * 10**9)
+        rows = _annotated_csv([])
+        rows += [['', '', '0', f'2024-01-01T00:{minute:02d}:00Z', str(minute), 'temp', host] for host in ('h0', 'h1')]
+        return iter(rows)
+
+    with patch('agents.database_manager.InfluxDBClient') as mock_client_cls:
+        mock_client = MagicMock()
+        mock_query_api = MagicMock()
+        mock_query_api.query_csv.side_effect = query_csv
+        mock_client.query_api.return_value = mock_query_api
+        mock_client_cls.return_value = mock_client
+
+        import agents
+        importlib.reload(agents)
+
+        columns = agents.influx_query(
+            'from(bucket: "b") |> range(start: 2024-01-01T00:00:00Z, stop: 2024-01-01T00:03:00Z)',
+            output='columns', use_cache=False, parallel=3,
+        )
+
+        assert list(columns['host']) == ['h0', 'h0', 'h0', 'h1', 'h1', 'h1']
+        assert list(columns['_value']) == [0.0, 1.0, 2.0, 0.0, 1.0, 2.0]
+
+    def record(minute, host):
+        return {'result': '_result', 'table': 0, '_time': datetime(2024, 1, 1, 0, minute, tzinfo=timezone.utc),
+                '_value': float(minute), 'host': host}
+
+    merged = _merge_parts([[record(0, 'h0'), record(0, 'h1')], [record(1, 'h0'), record(1, 'h1')]], 'records')
+    assert [(r['host'], r['_value']) for r in merged] == [('h0', 0.0), ('h0', 1.0), ('h1', 0.0), ('h1', 1.0)]
+
+
+def _schema_result(values):
+    records = []
+    for value in values:
+        record = MagicMock()
+        record.get_value.return_value = value
+        records.append(record)
+    table = MagicMock()
+    table.records = records
+    return [table]
+
+
+def test_schema_lookups_are_memoized_until_a_new_field_is_written():
+    with patch('agents.database_manager.InfluxDBClient') as mock_client_cls:
+        mock_client = MagicMock()
+        mock_query_api = MagicMock()
+        mock_query_api.query.return_value = _schema_result(['temp', 'hum'])
+        mock_client.query_api.return_value = mock_query_api
+        mock_client_cls.return_value = mock_client
+
+        import agents
+        importlib.reload(agents)
+        from agents.schema_catalog import schema_catalog
+        schema_catalog.clear()
+
+        assert agents.influx_list_fields('catalog_m') == ['temp', 'hum']
+        assert agents.influx_list_fields('catalog_m') == ['temp', 'hum']
+        assert mock_query_api.query.call_count == 1
+        assert 'InfluxDB' in agents.influxDB_agent.instructions({})
+
+        agents.influx_write_point({'temp': 1.0}, measurement='catalog_m')
+        agents.influx_list_fields('catalog_m')
+        assert mock_query_api.query.call_count == 1
+
+        agents.influx_write_point({'pressure': 1.0}, measurement='catalog_m')
+        agents.influx_list_fields('catalog_m')
+        assert mock_query_api.query.call_count == 2
+        assert agents.schema_cache_stats()['hits'] >= 2
+
+
+def test_compile_filters_builds_single_mask():
+    import pandas as pd
+    from agents.filter_engine import apply_filters, compile_filters
+
+    df = pd.DataFrame({
+        'x': range(10),
+        'host': pd.Categorical([f'h{i % 3}' for i in range(10)]),
+    })
+    conditions = compile_filters({'x': '2 < x <= 8', 'host': "host in ['h0', 'h1']", 'odd': 'x % 2 == 1'})
+
+    assert [c.op for c in conditions] == ['>', '<=', 'in', 'eval']
+    assert list(apply_filters(df, conditions)['x']) == [3, 7]
+
+
+def test_filter_data_pushes_predicates_into_stored_query():
+    import pandas as pd
+    from agents import flux
+
+    with patch('agents.database_manager.InfluxDBClient') as mock_client_cls:
+        mock_client = MagicMock()
+        mock_query_api = MagicMock()
+        mock_query_api.query_csv.return_value = iter(_annotated_csv([5.0, 6.0, 1.0]))
+        mock_client.query_api.return_value = mock_query_api
+        mock_client_cls.return_value = mock_client
+
+        import agents
+        importlib.reload(agents)
+
+        query = ('from(bucket: "b") |> range(start: 2024-01-01T00:00:00Z, stop: 2024-01-02T00:00:00Z) '
+                 '|> filter(fn: (r) => r._measurement == "m")')
+        frame = pd.DataFrame({
+            '_time': pd.to_datetime(['2024-01-01T00:00:00Z'], utc=True),
+            '_value': [1.0],
+            'host': ['h0'],
+        })
+        agents.store_cached_data(frame, handle='pushed', meta={'query': flux.normalize(query)})
+
+        summary = agents.filter_data(
+            {'host': "host == 'h0'", '_value': '_value > 2', '_time': "_time < '2024-01-01T12:00:00Z'"},
+            handle='pushed',
+        )
+
+        sent = mock_query_api.query_csv.call_args.args[0]
+        assert 'r["host"] == "h0" and r._value > 2' in sent
+        assert 'stop: 2024-01-01T12:00:00Z' in sent
+        assert len(summary['pushed_down']) == 3
+        assert summary['rows'] == 1
+        assert agents.head_cached_data(handle='pushed_filtered')['_value'] == [5.0]
+
+
+def test_filter_data_pushes_down_on_records_datasets():
+    from datetime import datetime, timezone
+
+    def table(*points):
+        records = []
+        for hour, value in points:
+            time = datetime(2024, 1, 1, hour, tzinfo=timezone.utc)
+            record = MagicMock()
+            record.values = {'result': '_result', 'table': 0, '_time': time, '_value': value,
+                             '_field': 'temp', '_measurement': 'm', 'host': 'h0'}
+            record.get_value.return_value = value
+            record.get_time.return_value = time
+            records.append(record)
+        result = MagicMock()
+        result.records = records
+        return [result]
+
+    with patch('agents.database_manager.InfluxDBClient') as mock_client_cls:
+        mock_client = MagicMock()
+        mock_query_api = MagicMock()
+        mock_query_api.query.side_effect = [
+            table((1, 1.0), (2, 4.0), (3, 5.0)),
+            table((2, 4.0), (3, 5.0)),
+            table((3, 5.0)),
+        ]
+        mock_client.query_api.return_value = mock_query_api
+        mock_client_cls.return_value = mock_client
+
+        import agents
+        importlib.reload(agents)
+
+        agents.influx_query_store('|> range(start: 2024-01-01T00:00:00Z, stop: 2024-01-01T12:00:00Z)', handle='rec')
+        columns = agents.list_data_fields('rec')
+
+        by_value = agents.filter_data({'value': 'value > 3'}, handle='rec')
+        by_time = agents.filter_data({'time': "time >= '2024-01-01T03:00:00Z'"}, handle='rec')
+
+        assert 'r._value > 3' in mock_query_api.query.call_args_list[1].kwargs['query']
+        assert 'start: 2024-01-01T03:00:00Z' in mock_query_api.query.call_args_list[2].kwargs['query']
+        assert len(by_value['pushed_down']) == len(by_time['pushed_down']) == 1
+        assert agents.head_cached_data(handle='rec_filtered')['value'] == [5.0]
+        assert by_time['rows'] == 1 and by_value['rows'] == 2
+        assert by_value['columns'] == by_time['columns'] == len(columns)
+
+
+def test_pushdown_rewrites_ranges_that_stop_at_now():
+    import pandas as pd
+    from agents import flux
+    from agents.filter_engine import compile_filters, pushdown
+
+    now = flux.resolve_time('2024-01-02T00:00:00Z')
+    query = 'from(bucket: "b") |> range(start: -1d, stop: now()) |> filter(fn: (r) => r._measurement == "m")'
+    frame = pd.DataFrame({'_time': pd.to_datetime(['2024-01-01T18:00:00Z'], utc=True), '_value': [1.0]})
+
+    pushed_query, pushed = pushdown(
+        query, compile_filters({'_time': "_time >= '2024-01-01T12:00:00Z'", '_value': '_value > 2'}), frame, now
+    )
+
+    assert len(pushed) == 2
+    assert pushed_query == (
+        'from(bucket: "b") |> range(start: 2024-01-01T12:00:00Z, stop: 2024-01-02T00:00:00Z) '
+        '|> filter(fn: (r) => r._measurement == "m")\n  |> filter(fn: (r) => r._value > 2)'
+    )
+
+
+def test_influx_query_wide_shape_pivots_on_server():
+    rows = [
+        ['#datatype', 'string', 'long', 'dateTime:RFC3339', 'string', 'double', 'long'],
+        ['#group', 'false', 'false', 'false', 'true', 'false', 'false'],
+        ['#default', '_result', '', '', '', '', ''],
+        ['', 'result', 'table', '_time', 'host', 'temp', 'count'],
+        ['', '', '0', '2024-01-01T00:00:00Z', 'h0', '1.5', '3'],
+        ['', '', '0', '2024-01-01T00:00:10Z', 'h0', '2.5', '4'],
+    ]
+    with patch('agents.database_manager.InfluxDBClient') as mock_client_cls:
+        mock_client = MagicMock()
+        mock_query_api = MagicMock()
+        mock_query_api.query_csv.return_value = iter(rows)
+        mock_client.query_api.return_value = mock_query_api
+        mock_client_cls.return_value = mock_client
+
+        import agents
+        importlib.reload(agents)
+
+        frame = agents.influx_query('|> range(start: -1h)', output='dataframe', shape='wide', use_cache=False)
+
+        sent = mock_query_api.query_csv.call_args.args[0]
+        assert 'pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")' in sent
+        assert 'drop(columns: ["_start", "_stop"])' in sent
+        assert list(frame.columns) == ['_time', 'host', 'temp', 'count']
+        assert str(frame['temp'].dtype) == 'float64'
+        assert str(frame['count'].dtype) == 'int64'
+
+
+def test_store_keeps_compact_columns_and_reports_savings():
+    from datetime import datetime, timedelta, timezone
+    import pandas as pd
+    import agents
+    importlib.reload(agents)
+
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    records = [
+        {'_time': start + timedelta(seconds=i), 'host': f'h{i % 4}', 'count': i % 100, 'value': i / 2}
+        for i in range(1000)
+    ]
+    status = agents.store_cached_data(records, handle='compact')
+    frame = agents.data_store.get_dataframe('compact')
+
+    assert str(frame['_time'].dtype) == 'datetime64[ns, UTC]'
+    assert isinstance(frame['host'].dtype, pd.CategoricalDtype)
+    assert frame['count'].dtype == 'int8'
+    assert frame['value'].dtype == 'float32'
+    assert status['saved_bytes'] > 0
+    assert agents.list_cached_data()[-1]['saved_bytes'] == status['saved_bytes']
+    assert agents.head_cached_data(2, handle='compact')['count'] == [0, 1]
+    assert agents.get_cached_data('compact')[3] == records[3]
+
+
+def test_influx_query_store_persists_and_reloads_from_disk(tmp_path, monkeypatch):
+    import numpy as np
+    import pyarrow as pa
+    from agents.dataset_cache import dataset_cache
+
+    monkeypatch.setattr(dataset_cache, 'directory', str(tmp_path))
+    loaded = []
+    load = dataset_cache.load
+    monkeypatch.setattr(dataset_cache, 'load', lambda query: loaded.append(load(query)) or loaded[-1])
+    with patch('agents.database_manager.InfluxDBClient') as mock_client_cls:
+        mock_client = MagicMock()
+        mock_query_api = MagicMock()
+        mock_query_api.query.return_value = [_record(1.5)]
+        mock_client.query_api.return_value = mock_query_api
+        mock_client_cls.return_value = mock_client
+
+        import agents
+        importlib.reload(agents)
+
+        query = '|> range(start: 2024-01-01T00:00:00Z, stop: 2024-01-02T00:00:00Z)'
+        first = agents.influx_query_store(query, handle='disk', persist=True)
+        agents.drop_cached_data('disk')
+        second = agents.influx_query_store(query, handle='disk', persist=True)
+
+        path = first['persisted']['path']
+        metadata = pa.ipc.open_file(pa.memory_map(path)).schema.metadata[b'agents.dataset']
+        assert b'2024-01-01T00:00:00Z' in metadata
+        assert second['mode'] == 'disk'
+        assert mock_query_api.query.call_count == 1
+        assert agents.head_cached_data(handle='disk')['_value'] == [1.5]
+        restored, stored = loaded[-1][0], agents.data_store.get_dataframe('disk')
+        assert all(np.shares_memory(restored[c].to_numpy(), stored[c].to_numpy())
+                   for c in restored.columns if restored[c].dtype.kind in 'biufM')
+
+
+def test_router_answers_known_intents_without_triage():
+    from agents.router import FastRouter
+    from swarm import Response
+
+    with patch('agents.database_manager.InfluxDBClient') as mock_client_cls:
+        bucket = MagicMock()
+        bucket.name = 'fast_bucket'
+        mock_client = MagicMock()
+        mock_client.buckets_api.return_value.find_buckets.return_value.buckets = [bucket]
+        mock_client_cls.return_value = mock_client
+
+        import agents
+        importlib.reload(agents)
+        agents.schema_catalog.schema_catalog.clear()
+
+        llm = MagicMock()
+        llm.run.return_value = Response(messages=[{'role': 'assistant', 'content': 'from triage'}])
+        router = FastRouter()
+
+        assert router.run('List all buckets', client=llm) == 'Buckets:\n- fast_bucket'
+        llm.run.assert_not_called()
+
+        assert router.run('Compare yesterday with last week', client=llm) == 'from triage'
+        assert llm.run.call_args.kwargs['agent'] is agents.triage_agent
+
+        assert router.match('plot the last 6 hours of temperature')[1] == {'n': '6', 'unit': 'hours', 'field': 'temperature'}
+        stats = router.stats()
+        assert stats['hits'] == 1 and stats['misses'] == 1
+        assert stats['hit_rate'] == 0.5
+        assert stats['recent'][0]['route'] == 'list_buckets'
+
+
+def test_tiered_swarm_escalates_after_unparsable_tool_call():
+    from types import SimpleNamespace
+    from swarm import Agent
+    from agents.tiering import TieredSwarm
+
+    def completion(content=None, tool_calls=None):
+        message = SimpleNamespace(content=content, tool_calls=tool_calls)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    bad_call = SimpleNamespace(id='1', function=SimpleNamespace(name='lookup', arguments='{not json'))
+    llm = MagicMock()
+    llm.chat.completions.create.side_effect = [completion(tool_calls=[bad_call]), completion('done')]
+
+    def lookup(key: str):
+        return key
+
+    swarm = TieredSwarm(llm, escalation_model='big-model')
+    agent = Agent(name='Worker', model='small-model', functions=[lookup])
+    response = swarm.run(agent=agent, messages=[{'role': 'user', 'content': 'hi'}])
+
+    models = [c.kwargs['model'] for c in llm.chat.completions.create.call_args_list]
+    assert models == ['small-model', 'big-model']
+    assert response.messages[1]['content'].startswith('Error: lookup failed (unparsable arguments)')
+    stats = swarm.stats()
+    assert stats['escalations'] == 1
+    assert {c['model'] for c in stats['calls']} == {'small-model', 'big-model'}
+
+
+def test_agents_use_model_tiers():
+    import agents
+    importlib.reload(agents)
+    from agents import common
+
+    assert agents.triage_agent.model == common.MODEL_TIERS['fast']
+    assert agents.influxDB_agent.model == common.MODEL_TIERS['standard']
+
+
+def test_sessions_keep_separate_stores_and_histories():
+    import threading
+    from swarm import Response
+    from agents import data_store
+    from agents.sessions import SessionManager
+
+    barrier = threading.Barrier(2)
+
+    def run(agent, messages, debug=False):
+        text = messages[-1]['content']
+        barrier.wait(timeout=5)  # both turns are in flight at once
+        data_store.store_cached_data({'value': [text]}, handle='mine')
+        return Response(messages=[{'role': 'assistant', 'content': f'stored {text}'}])
+
+    llm = MagicMock()
+    llm.run.side_effect = run
+    manager = SessionManager(max_sessions=2)
+    first, second = manager.create(), manager.create()
+
+    threads = [
+        threading.Thread(target=manager.run_turn, args=(session, text, llm))
+        for session, text in ((first, 'from first'), (second, 'from second'))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert first.store.get('mine') == {'value': ['from first']}
+    assert second.store.get('mine') == {'value': ['from second']}
+    assert data_store.get_store().get('mine') is None
+    assert [m['content'] for m in first.history] == ['from first', 'stored from first']
+    assert manager.stats()['turns'] == 2
+    assert manager.close(first.id) and manager.get(first.id) is None
+
+
+def test_server_turn_replies_with_the_question_asked():
+    import asyncio
+    import json
+    from types import SimpleNamespace
+    import agents
+    importlib.reload(agents)
+    from agents.tiering import TieredSwarm
+    from server import AgentServer
+
+    def completion(content=None, name=None, arguments='{}'):
+        calls = [SimpleNamespace(id=name, function=SimpleNamespace(name=name, arguments=arguments))] if name else None
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content, tool_calls=calls))])
+
+    llm = MagicMock()
+    llm.chat.completions.create.side_effect = [
+        completion(name='transfer_to_clarifying_agent'),
+        completion(name='ask_user', arguments=json.dumps({'question': 'Which bucket?'})),
+        completion('Using bucket b.'),
+    ]
+    swarm = TieredSwarm(llm, escalation_model='big-model')
+    server = AgentServer(llm_client=swarm)
+    try:
+        session_id = asyncio.run(server.dispatch('POST', '/sessions', b''))[1]['session_id']
+        post = f'/sessions/{session_id}/messages'
+        status, payload = asyncio.run(server.dispatch('POST', post, b'{"content": "Compare the buckets"}'))
+        assert (status, payload['reply']) == (200, 'Which bucket?')
+        assert swarm.stats()['escalations'] == 0
+
+        status, payload = asyncio.run(server.dispatch('POST', post, b'{"content": "b"}'))
+        assert payload['reply'] == 'Using bucket b.'
+        sent = llm.chat.completions.create.call_args.kwargs['messages']
+        assert [m['content'] for m in sent if m['role'] in ('user', 'assistant')][:3] == [
+            'Compare the buckets', 'Which bucket?', 'b'
+        ]
+    finally:
+        server.close()
+
+
+def test_batch_answers_questions_records_plots_and_resumes(tmp_path, monkeypatch):
+    import json
+    from swarm import Response
+    import agents
+    importlib.reload(agents)
+    import batch
+    monkeypatch.chdir(tmp_path)
+
+    def run(agent, messages, debug=False, max_turns=None):
+        text = messages[-1]['content']
+        if text == 'broken':
+            raise RuntimeError('model unavailable')
+        host = agents.ask_user('Which host?')
+        agents.store_cached_data({'x': [1, 2, 3], 'y': [1, 4, 9], 'request': [text] * 3}, handle='xy')
+        path = agents.visualize_data('xy', plot_type='line')
+        return Response(messages=[{'role': 'tool', 'content': path},
+                                  {'role': 'assistant', 'content': f'{text} on {host}'}])
+
+    llm = MagicMock()
+    llm.run.side_effect = run
+    requests = tmp_path / 'requests.jsonl'
+    requests.write_text('\n'.join(json.dumps(r) for r in [
+        {'id': 'a', 'content': 'plot cpu', 'answers': ['h1']},
+        {'id': 'b', 'content': 'plot mem', 'answers': {'host': 'h2'}},
+        {'id': 'c', 'content': 'broken'},
+    ]))
+    output = tmp_path / 'results.jsonl'
+
+    summary = batch.run_batch(str(requests), str(output), workers=3, client=llm)
+    assert (summary['ok'], summary['error'], summary['skipped']) == (2, 1, 0)
+    results = {r['id']: r for r in map(json.loads, output.read_text().splitlines())}
+    assert results['a']['reply'] == 'plot cpu on h1'
+    assert results['b']['questions'] == [{'question': 'Which host?', 'answer': 'h2'}]
+    assert len(results['a']['plots']) == 1 and results['a']['plots'] != results['b']['plots']
+    assert results['c']['error'] == 'RuntimeError: model unavailable'
+
+    summary = batch.run_batch(str(requests), str(output), workers=3, client=llm)
+    assert (summary['ok'], summary['error'], summary['skipped']) == (0, 1, 2)
+
+
+def test_render_pool_renders_in_background_and_deduplicates(tmp_path, monkeypatch):
+    import pandas as pd
+    from agents.render_pool import RenderPool
+
+    monkeypatch.chdir(tmp_path)
+    pool = RenderPool(workers=2)
+    df = pd.DataFrame({'x': range(1000), 'y': [i % 7 for i in range(1000)]})
+    try:
+        line = pool.submit(df, 'line')
+        scatter = pool.submit(df, 'scatter')
+        assert pool.submit(df.copy(), 'line') == line
+        assert pool.stats()['shared_bytes'] > 0
+
+        assert pool.wait(line, timeout=60)['status'] == 'done'
+        assert pool.wait(scatter, timeout=60)['status'] == 'done'
+        assert os.path.exists(line) and os.path.exists(scatter)
+        stats = pool.stats()
+        assert (stats['submitted'], stats['deduplicated'], stats['rendered']) == (2, 1, 2)
+        assert stats['shared_bytes'] == 0
+
+        failed = pool.submit(df, 'pie')
+        status = pool.wait(failed, timeout=60)
+        assert status['status'] == 'failed' and 'Pie chart requires' in status['error']
+    finally:
+        pool.close()
+
+
+def test_render_pool_fingerprints_a_frame_once_across_threads():
+    import gc
+    import threading
+    import pandas as pd
+    from agents.render_pool import RenderPool
+
+    pool = RenderPool(workers=0)
+    df = pd.DataFrame({'x': range(100_000), 'y': ['a', 'b'] * 50_000})
+    barrier = threading.Barrier(8)
+    keys = []
+
+    def fingerprint():
+        barrier.wait(timeout=5)
+        keys.append(pool._fingerprint(df))
+
+    threads = [threading.Thread(target=fingerprint) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(keys) == 8 and len(set(keys)) == 1
+    assert list(pool._fingerprints) == [id(df)]
+    del df
+    gc.collect()
+    assert pool._fingerprints == {}
+
+
+def test_render_pool_renders_inline_what_arrow_cannot_convert(tmp_path, monkeypatch):
+    import pandas as pd
+    from agents.render_pool import RenderPool
+
+    monkeypatch.chdir(tmp_path)
+    pool = RenderPool(workers=2)
+    df = pd.DataFrame({'x': range(4), 'y': [1.0, 2.0, 3.0, 4.0], 'note': [1, 'a', 2.5, None]})
+    try:
+        path = pool.submit(df, 'line')
+
+        assert pool.status(path)['status'] == 'done'
+        assert os.path.exists(path)
+        stats = pool.stats()
+        assert (stats['rendered'], stats['pending'], stats['shared_bytes']) == (1, 0, 0)
+        assert pool._executor is None
+    finally:
+        pool.close()
+
+
+def test_importing_agents_defers_heavy_dependencies():
+    import subprocess
+
+    heavy = ['pandas', 'matplotlib', 'influxdb_client', 'openai', 'swarm']
+    probe = (
+        'import sys, agents, main; '
+        f'print([m for m in {heavy!r} if m in sys.modules]); '
+        'print(callable(agents.influx_query), agents.triage_agent.name)'
+    )
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)}
+    result = subprocess.run([sys.executable, '-c', probe], cwd=root, env=env,
+                            capture_output=True, text=True, check=True)
+
+    loaded, resolved = result.stdout.splitlines()
+    assert loaded == '[]'
+    assert resolved == 'True Triage Agent'
+
+
+def test_turn_metrics_cover_tools_queries_and_handoffs(tmp_path, monkeypatch):
+    import json
+    from swarm import Response
+
+    with patch('agents.database_manager.InfluxDBClient') as mock_client_cls:
+        record = MagicMock()
+        record.values = {'_time': '2024-01-01T00:00:00Z', '_value': 1.0}
+        table = MagicMock()
+        table.records = [record, record]
+        mock_client = MagicMock()
+        mock_client.query_api.return_value.query.return_value = [table]
+        mock_client_cls.return_value = mock_client
+
+        import agents
+        importlib.reload(agents)
+        from agents import metrics, router
+
+        metrics.metrics.reset()
+        monkeypatch.setattr(metrics, 'METRICS_PROFILE_DIR', str(tmp_path))
+        agents.query_cache.query_cache.clear()
+
+        def run(**kwargs):
+            metrics.record_handoff('Triage Agent', 'InfluxDB Manager')
+            result = agents.influx_query('from(bucket: "b") |> range(start: -1h) |> filter(fn: (r) => r._measurement == "m")')
+            return Response(messages=[{'role': 'assistant', 'content': f'{len(result)} rows'}])
+
+        llm = MagicMock()
+        llm.run.side_effect = run
+        logged = []
+        monkeypatch.setattr(metrics, '_log', lambda event, **fields: logged.append((event, fields)))
+
+        assert router.router.run('Compare yesterday with last week', client=llm, profile=True) == '2 rows'
+
+        event, summary = logged[-1]
+        assert event == 'turn' and summary['route'] == 'triage'
+        assert summary['tool_calls'] == 1 and summary['influx_rows'] == 2
+        assert summary['handoffs'] == ['Triage Agent -> InfluxDB Manager']
+        assert os.path.exists(summary['profile'])
+        json.dumps(summary)
+
+        text = agents.metrics_text()
+        assert 'agents_tool_seconds_count{tool="influx_query"} 1' in text
+        assert 'agents_influx_rows_total 2' in text
+        assert 'agents_turn_seconds_count 1' in text
+        assert agents.ask_user in agents.clarifying_agent.functions
+
+
+def test_large_tool_results_reach_the_model_as_summaries():
+    import ast
+    from types import SimpleNamespace
+    from swarm import Agent
+    from agents.tiering import TieredSwarm
+    from agents.data_store import get_dataframe, DataStore, use_store
+
+    def completion(content=None, tool_calls=None):
+        message = SimpleNamespace(content=content, tool_calls=tool_calls)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    def call(name):
+        return SimpleNamespace(id=name, function=SimpleNamespace(name=name, arguments='{}'))
+
+    def big_query():
+        return [
+            {'_time': f'2024-01-01T00:{i // 60:02d}:{i % 60:02d}Z', '_field': 'temp' if i % 2 else 'hum',
+             '_value': float(i), 'host': f'h{i % 3}'}
+            for i in range(5000)
+        ]
+
+    def small_query():
+        return [{'_value': 1.0}]
+
+    llm = MagicMock()
+    llm.chat.completions.create.side_effect = [
+        completion(tool_calls=[call('big_query'), call('small_query')]), completion('done'),
+    ]
+    agent = Agent(name='Worker', model='m', functions=[big_query, small_query])
+    with use_store(DataStore()):
+        response = TieredSwarm(llm).run(agent=agent, messages=[{'role': 'user', 'content': 'hi'}])
+        big, small = response.messages[1:3]
+
+        summary = ast.literal_eval(big['content'])
+        assert summary['status'] == 'summarized' and summary['rows'] == 5000
+        assert summary['time_span']['start'] == '2024-01-01T00:00:00+00:00'
+        assert summary['fields']['temp']['max'] == 4999.0
+        assert summary['fields']['hum']['p50'] == 2499.0
+        assert summary['tags']['host']['distinct'] == 3
+        assert len(summary['sample']) == 5
+        assert len(big['content']) < 4000
+        assert len(get_dataframe(summary['handle'])) == 5000
+        assert small['content'] == "[{'_value': 1.0}]"
+
+
+def test_analytics_tools_store_results_and_return_summaries():
+    import numpy as np
+    import pandas as pd
+    import agents
+    importlib.reload(agents)
+    from agents.data_store import DataStore, get_dataframe, store_cached_data, use_store
+
+    times = pd.date_range('2024-01-01', periods=120, freq='min', tz='UTC')
+    values = np.arange(120, dtype=float)
+    df = pd.DataFrame({
+        '_time': np.tile(times, 2),
+        '_value': np.concatenate([values, values * 2]),
+        '_field': 'requests',
+        'host': np.repeat(['a', 'b'], 120),
+    })
+    df.loc[30, '_value'] = 1000.0
+    # Stored as influx_query_store stores records, with value/time copies.
+    records = [
+        {'result': '_result', 'table': int(row['host'] == 'b'), '_time': row['_time'].to_pydatetime(),
+         '_value': row['_value'], '_field': row['_field'], '_measurement': 'web', 'host': row['host'],
+         'value': row['_value'], 'time': row['_time'].to_pydatetime()}
+        for row in df.to_dict(orient='records')
+    ]
+
+    with use_store(DataStore(compact=True)):
+        store_cached_data(records, 'counters')
+
+        summary = agents.resample_data('1h', fn='max', handle='counters')
+        assert summary['handle'] == 'counters_resampled' and summary['rows'] == 4
+        hourly = get_dataframe('counters_resampled')
+        assert hourly[hourly['host'] == 'b']['_value'].tolist() == [118.0, 238.0]
+
+        agents.rolling_data('3', handle='counters', result_handle='smooth')
+        smooth = get_dataframe('smooth')
+        assert smooth[smooth['host'] == 'b']['_value'].iloc[2] == 2.0
+
+        agents.rate_data('1m', non_negative=True, handle='counters')
+        rates = get_dataframe('counters_rate')
+        assert len(rates) == 238
+        assert rates[rates['host'] == 'b']['_value'].eq(2.0).all()
+
+        anomalies = agents.detect_anomalies(handle='counters')
+        assert anomalies['anomalies'] == 1
+        assert anomalies['strongest'][0]['_value'] == 1000.0
+
+        assert 'value' not in smooth.columns and 'value_score' not in get_dataframe('counters_anomalies').columns
+
+        correlation = agents.correlate_series(handle='counters', method='spearman')
+        assert [(p['a'], p['b']) for p in correlation['strongest_pairs']] == [
+            ('_field=requests,_measurement=web,host=a', '_field=requests,_measurement=web,host=b')
+        ]
+        assert correlation['strongest_pairs'][0]['r'] > 0.95
+
+        grouped = agents.aggregate_by_tag(['host'], fns=['max', 'count'], handle='counters')
+        assert grouped['table'] == [
+            {'host': 'a', '_value_max': 1000.0, '_value_count': 120},
+            {'host': 'b', '_value_max': 238.0, '_value_count': 120},
+        ]
+
+
+def test_model_clients_are_built_on_first_read():
+    import subprocess
+
+    probe = (
+        'import agents, agents.common as common; '
+        'print(type(common.llm_client).__name__, type(agents.client).__name__, '
+        'agents.client.client is common.llm_client)'
+    )
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path), 'LLM_PROVIDER': 'ollama'}
+    result = subprocess.run([sys.executable, '-c', probe], cwd=root, env=env,
+                            capture_output=True, text=True, timeout=60, check=True)
+    assert result.stdout.split() == ['OpenAI', 'TieredSwarm', 'True']